@@ -1,18 +1,15 @@
 """CLI commands for wallet card generator."""
 
 import sys
+import time
 import click
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Optional
-from ..templates.business_card import BusinessCardTemplate
-from ..templates.classic_blue import ClassicBlueTemplate
-from ..templates.modern_dark import ModernDarkTemplate
-from ..templates.professional_green import ProfessionalGreenTemplate
-from ..templates.elegant_purple import ElegantPurpleTemplate
-from ..templates.bold_red import BoldRedTemplate
-from ..templates.minimalist_light import MinimalistLightTemplate
+from ..templates import TEMPLATES
 from ..utils.config_loader import ConfigLoader
 from ..core.validator import Validator, ValidationError
+from ..core.profiling import Profiler
 
 
 @click.group()
@@ -60,12 +57,45 @@ def main():
     type=click.Path(exists=True),
     help="Key file for signing",
 )
-def generate(config: Optional[str], output: Optional[str], template: str, cert: Optional[str], key: Optional[str]):
+@click.option(
+    "--profile",
+    type=click.Path(file_okay=False),
+    help="Write per-stage cProfile stats, memory usage and a Chrome trace to this directory",
+)
+@click.option(
+    "--bundle",
+    type=click.Path(exists=True, file_okay=False),
+    help="Asset bundle from 'wallet-card assets build' supplying images and org defaults",
+)
+def generate(
+    config: Optional[str],
+    output: Optional[str],
+    template: str,
+    cert: Optional[str],
+    key: Optional[str],
+    profile: Optional[str],
+    bundle: Optional[str],
+):
     """Generate a wallet card from configuration."""
     try:
+        # Create template based on selection
+        template_class = TEMPLATES.get(template)
+        if not template_class:
+            click.echo(f"Unknown template: {template}", err=True)
+            sys.exit(1)
+
+        defaults = None
+        if bundle:
+            from ..core.asset_bundle import load_bundle
+
+            bundle = load_bundle(bundle)
+            if bundle.template == template_class.template_name():
+                # The bundle's organization defaults replace the generic ones
+                defaults = bundle.defaults
+
         # Load configuration
         if config:
-            user_config = ConfigLoader.load_config(config)
+            user_config = ConfigLoader.load_config(config, defaults)
         else:
             # Try to find config in current directory
             config_paths = ["config.yaml", "config.yml", "config.json", "config/example.yaml"]
@@ -77,31 +107,16 @@ def generate(config: Optional[str], output: Optional[str], template: str, cert:
 
             if found_config:
                 click.echo(f"Using configuration: {found_config}")
-                user_config = ConfigLoader.load_config(found_config)
+                user_config = ConfigLoader.load_config(found_config, defaults)
             else:
                 click.echo("No configuration file found. Using defaults.", err=True)
                 click.echo("Run 'wallet-card init-config' to create a configuration file.")
-                user_config = ConfigLoader.load_config()
+                user_config = ConfigLoader.load_config(defaults=defaults)
 
-        # Create template based on selection
-        template_classes = {
-            "classic-blue": ClassicBlueTemplate,
-            "modern-dark": ModernDarkTemplate,
-            "professional-green": ProfessionalGreenTemplate,
-            "elegant-purple": ElegantPurpleTemplate,
-            "bold-red": BoldRedTemplate,
-            "minimalist-light": MinimalistLightTemplate,
-            "business-card": BusinessCardTemplate,  # Legacy support
-        }
-        
-        template_class = template_classes.get(template)
-        if not template_class:
-            click.echo(f"Unknown template: {template}", err=True)
-            sys.exit(1)
-        
         template_instance = template_class(
             cert_file=cert,
             key_file=key,
+            bundle=bundle,
         )
 
         # Validate configuration
@@ -114,7 +129,13 @@ def generate(config: Optional[str], output: Optional[str], template: str, cert:
 
         # Generate pass
         click.echo("Generating wallet card...")
-        output_path = template_instance.generate(user_config, output)
+        if profile:
+            profiler = Profiler()
+            with profiler.activate():
+                output_path = template_instance.generate(user_config, output)
+            _report_profile(profiler, profile)
+        else:
+            output_path = template_instance.generate(user_config, output)
 
         click.echo(f"✅ Pass created: {output_path}")
         click.echo(f"   Share this file via AirDrop, email, or host it on a website.")
@@ -127,6 +148,16 @@ def generate(config: Optional[str], output: Optional[str], template: str, cert:
         sys.exit(1)
 
 
+def _report_profile(profiler: Profiler, directory: str) -> None:
+    """Write profiling artefacts and print a per-stage summary."""
+    written = profiler.write(directory)
+    click.echo("Profile (stage, wall time, peak traced memory):")
+    for stage in profiler.summary():
+        click.echo(f"  {stage['stage']:16} {stage['duration_ms']:9.2f} ms {stage['peak_kb']:10.1f} KiB")
+    click.echo(f"   Chrome trace: {written['trace']}")
+    click.echo(f"   Report: {written['report']}")
+
+
 @main.command()
 @click.argument("config_file", type=click.Path(exists=True))
 def validate(config_file: str):
@@ -198,6 +229,362 @@ def init_config(output: str, format: str):
         sys.exit(1)
 
 
+@main.command()
+@click.option("--template", "-t", "templates", multiple=True, help="Template to benchmark (repeatable; default: all)")
+@click.option("--image-size", "image_sizes", multiple=True, type=int, help="Synthetic image edge in pixels (repeatable)")
+@click.option("--repeat", type=int, default=5, show_default=True, help="Timed runs per single-pass case")
+@click.option("--batch-size", type=int, default=40, show_default=True, help="Passes per batch case (0 to skip)")
+@click.option("--workers", "workers", multiple=True, type=int, help="Worker processes for batch cases (repeatable)")
+@click.option("--quick", is_flag=True, help="Small run for smoke testing (one template, small images)")
+@click.option("--output", "-o", type=click.Path(dir_okay=False), help="Write the JSON report to this file")
+@click.option("--baseline", type=click.Path(exists=True, dir_okay=False), help="Earlier report to compare against")
+@click.option("--tolerance", type=float, default=0.2, show_default=True, help="Allowed relative regression")
+def bench(templates, image_sizes, repeat, batch_size, workers, quick, output, baseline, tolerance):
+    """Benchmark pass generation and report JSON."""
+    import json
+    from ..perf.bench import compare, run_benchmarks
+
+    unknown = [name for name in templates if name not in TEMPLATES]
+    if unknown:
+        click.echo(f"Unknown template: {', '.join(unknown)}", err=True)
+        sys.exit(1)
+
+    if quick:
+        templates = templates or ("classic-blue",)
+        image_sizes = image_sizes or (256,)
+        workers = workers or (1, 2)
+        repeat = min(repeat, 3)
+        batch_size = min(batch_size, 8)
+
+    report = run_benchmarks(
+        templates=templates or None,
+        image_sizes=image_sizes or (256, 1024, 3000),
+        repeat=repeat,
+        batch_size=batch_size,
+        workers=workers or (1, 2, 4),
+    )
+    text = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(text)
+        click.echo(f"Report written to {output}", err=True)
+    else:
+        click.echo(text)
+
+    if baseline:
+        regressions = compare(report, json.loads(Path(baseline).read_text()), tolerance)
+        if regressions:
+            click.echo("❌ Regressions against baseline:", err=True)
+            for line in regressions:
+                click.echo(f"  - {line}", err=True)
+            sys.exit(1)
+        click.echo("✅ No regressions against baseline", err=True)
+
+
+@main.command()
+@click.option("--config", "-c", type=click.Path(exists=True), help="Configuration whose assets should be warmed")
+@click.option("--template", "-t", "templates", multiple=True, help="Template to warm (repeatable; default: all)")
+@click.option("--cert", type=click.Path(exists=True), help="Certificate file for signing")
+@click.option("--key", type=click.Path(exists=True), help="Key file for signing")
+@click.option(
+    "--cache-dir",
+    type=click.Path(file_okay=False),
+    help="Cache directory (default: WALLET_CARD_WARM_CACHE or <tmp>/wallet-card-cache)",
+)
+def warm(config, templates, cert, key, cache_dir):
+    """Pre-populate the warm cache, e.g. at deploy or first boot."""
+    import os
+    import tempfile
+    from ..core import warm_cache
+
+    unknown = [name for name in templates if name not in TEMPLATES]
+    if unknown:
+        click.echo(f"Unknown template: {', '.join(unknown)}", err=True)
+        sys.exit(1)
+
+    cache = None if cache_dir else warm_cache.get_warm_cache()
+    if cache is None:
+        cache = warm_cache.WarmCache(cache_dir or os.path.join(tempfile.gettempdir(), "wallet-card-cache"))
+    warm_cache.set_warm_cache(cache)
+
+    user_config = ConfigLoader.load_config(config) if config else ConfigLoader.load_config()
+    # One in-memory generation per template renders placeholders, resized
+    # assets and parses the signer through the normal cached code paths
+    for name in templates or TEMPLATES:
+        instance = TEMPLATES[name](cert_file=cert, key_file=key)
+        try:
+            instance.generate_bytes(user_config)
+        except Exception as e:
+            click.echo(f"Error warming {name}: {e}", err=True)
+            sys.exit(1)
+        click.echo(f"Warmed {name}")
+
+    stats = cache.stats()
+    click.echo(f"✅ {stats['entries']} entries ({stats['bytes'] / 1024:.1f} KiB) in {stats['dir']}")
+
+
+@main.group()
+def assets():
+    """Build precomputed asset bundles."""
+    pass
+
+
+@assets.command("build")
+@click.option("--org", required=True, help="Organization name; also names the bundle directory")
+@click.option(
+    "--template",
+    "-t",
+    type=click.Choice(list(TEMPLATES), case_sensitive=False),
+    default="classic-blue",
+    show_default=True,
+    help="Template the bundle is built for",
+)
+@click.option("--icon", type=click.Path(exists=True, dir_okay=False), help="Source icon image")
+@click.option("--logo", type=click.Path(exists=True, dir_okay=False), help="Source logo image")
+@click.option("--photo", type=click.Path(exists=True, dir_okay=False), help="Default strip image")
+@click.option("--config", "-c", type=click.Path(exists=True), help="Configuration whose pass defaults are bundled")
+@click.option("--output", "-o", default="bundles", show_default=True, help="Directory receiving bundles")
+def build_assets(org, template, icon, logo, photo, config, output):
+    """Render an organization's images once into a versioned bundle."""
+    from ..core.asset_bundle import build_bundle
+
+    defaults = ConfigLoader.load_config(config) if config else {}
+    sources = {name: path for name, path in (("icon", icon), ("logo", logo), ("photo", photo)) if path}
+    try:
+        bundle = build_bundle(output, TEMPLATES[template].template_name(), org, sources, defaults)
+    except Exception as e:
+        click.echo(f"Error building bundle: {e}", err=True)
+        sys.exit(1)
+
+    for name, content in bundle.files.items():
+        click.echo(f"  {name:<10} {len(content):>8,} bytes  sha1 {bundle.digests[name]}")
+    click.echo(f"✅ Bundle {bundle.version} written to {bundle.path}")
+
+
+@main.command()
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--workers", "-w", type=int, help="Worker processes (default: CPU count)")
+@click.option("--cert", type=click.Path(exists=True), help="Certificate to verify raw RSA signatures against")
+@click.option("--all", "include_ok", is_flag=True, help="List passing archives in the report too")
+@click.option("--output", "-o", type=click.Path(dir_okay=False), help="Write the JSON report to this file")
+def verify(paths, workers, cert, include_ok, output):
+    """Verify .pkpass files or directories of them."""
+    import json
+    from ..core.pkpass_reader import verify_many
+
+    report = verify_many(paths, workers=workers, cert_file=cert, include_ok=include_ok)
+    text = json.dumps(report, indent=2)
+    if output:
+        Path(output).write_text(text)
+        for result in report["results"]:
+            if not result["ok"]:
+                click.echo(f"❌ {result['path']}: {'; '.join(result['errors'])}", err=True)
+    else:
+        click.echo(text)
+    click.echo(
+        f"{report['ok']}/{report['total']} passed, {report['failed']} failed "
+        f"({report['per_second']} passes/s)",
+        err=True,
+    )
+    if report["failed"]:
+        sys.exit(1)
+
+
+@main.command()
+@click.argument("roster", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--config",
+    "-c",
+    type=click.Path(exists=True),
+    help="Configuration shared by all rows; strings may use placeholders such as {first}",
+)
+@click.option(
+    "--template",
+    "-t",
+    type=click.Choice(list(TEMPLATES), case_sensitive=False),
+    default="classic-blue",
+    show_default=True,
+    help="Template style to use",
+)
+@click.option("--output", "-o", default="output", show_default=True, help="Output directory")
+@click.option(
+    "--filename",
+    default="pass-{index}.pkpass",
+    show_default=True,
+    help="Output filename pattern, filled per row ({index} is the row number)",
+)
+@click.option("--cert", type=click.Path(exists=True), help="Certificate file for signing")
+@click.option("--key", type=click.Path(exists=True), help="Key file for signing")
+@click.option(
+    "--profile",
+    type=click.Path(file_okay=False),
+    help="Write per-stage cProfile stats, memory usage and a Chrome trace to this directory",
+)
+@click.option(
+    "--result-cache",
+    type=click.Path(file_okay=False),
+    help="Result cache directory; a re-run reuses the cached passes of unchanged rows",
+)
+def batch(roster, config, template, output, filename, cert, key, profile, result_cache):
+    """Generate one pass per row of a CSV or JSONL roster."""
+    from ..core.field_template import compile_expression, has_placeholders, read_rows
+
+    if not has_placeholders(filename):
+        raise click.BadParameter("must contain a placeholder such as {index}", param_hint="--filename")
+    shared = ConfigLoader.load_config(config, builtin_defaults=False) if config else {}
+    if result_cache:
+        from ..core.result_cache import ResultCache
+
+        result_cache = ResultCache(root=result_cache)
+    instance = TEMPLATES[template](output_dir=output, cert_file=cert, key_file=key, result_cache=result_cache)
+    # Placeholders are parsed once here; each row only fills them in
+    try:
+        render = instance.compile(shared)
+        name_for = compile_expression(filename)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    profiler = Profiler() if profile else None
+    start = time.perf_counter()
+    written = failed = 0
+    with profiler.activate() if profiler else nullcontext():
+        for index, row in enumerate(read_rows(roster), 1):
+            row = {"index": index, **row}
+            name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name_for(row))
+            if not name.endswith(".pkpass"):
+                name += ".pkpass"
+            try:
+                instance.generator.generate(render(row), name)
+            except Exception as e:
+                # A bad row (invalid fields, unreadable image) never stops the roster
+                click.echo(f"Row {index}: {e}", err=True)
+                failed += 1
+                continue
+            written += 1
+    elapsed = time.perf_counter() - start
+    if profiler:
+        _report_profile(profiler, profile)
+
+    rate = round(written / elapsed, 1) if elapsed else 0.0
+    click.echo(f"✅ {written} passes written to {output} ({rate} passes/s)")
+    if failed:
+        click.echo(f"❌ {failed} rows failed", err=True)
+        sys.exit(1)
+
+
+@main.command()
+@click.argument("roster", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--output",
+    "-o",
+    default="output/badges",
+    show_default=True,
+    help="Output directory, or a .zip file to write all badges into",
+)
+@click.option("--workers", "-w", type=int, help="Worker processes (default: CPU count)")
+@click.option("--chunk-size", type=int, default=32, show_default=True, help="Badges per worker task")
+@click.option(
+    "--format", "image_format", type=click.Choice(["png", "svg"]), default="png", show_default=True, help="Badge format"
+)
+def badges(roster, output, workers, chunk_size, image_format):
+    """Render vCard QR badges for every contact in a CSV or JSONL roster."""
+    from ..core.badges import generate_badges, read_roster
+
+    report = generate_badges(
+        read_roster(roster), output, workers=workers, chunk_size=chunk_size, image_format=image_format
+    )
+    click.echo(f"✅ {report['badges']} badges written to {report['output']} ({report['per_second']} badges/s)")
+
+
+@main.command()
+@click.option(
+    "--registry",
+    "registry_path",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="PassKit registry database (<output>/.passkit/registry.sqlite3)",
+)
+@click.option("--pass-type-id", required=True, help="Pass type identifier of the updated passes")
+@click.option("--serial", "serials", multiple=True, help="Updated serial number (repeatable; default: all passes)")
+@click.option("--apns-url", envvar="WALLET_CARD_APNS_URL", required=True, help="APNs endpoint or local stand-in")
+@click.option("--cert", type=click.Path(exists=True), help="TLS client certificate for APNs")
+@click.option("--key", type=click.Path(exists=True), help="TLS client key for APNs")
+@click.option("--connections", type=int, default=4, show_default=True, help="Persistent connections")
+@click.option("--rate", type=float, help="Maximum pushes per second")
+def push(registry_path, pass_type_id, serials, apns_url, cert, key, connections, rate):
+    """Push updates to every device holding the given passes."""
+    import json
+    from ..core.pass_registry import PassRegistry
+    from ..core.push import HTTPPushTransport, PushFanout
+
+    fanout = PushFanout(
+        PassRegistry(registry_path),
+        HTTPPushTransport(apns_url, cert_file=cert, key_file=key),
+        connections=connections,
+        rate=rate,
+    )
+    report = fanout.notify(pass_type_id, serials or None)
+    report.pop("invalid_tokens")
+    click.echo(json.dumps(report, indent=2))
+    if report["failed"]:
+        sys.exit(1)
+
+
+@main.command()
+@click.option("--url", help="Test an already running server instead of starting one")
+@click.option(
+    "--server",
+    type=click.Choice(["dev", "gunicorn"], case_sensitive=False),
+    default="dev",
+    show_default=True,
+    help="Server to start when --url is not given",
+)
+@click.option("--server-workers", type=int, default=2, show_default=True, help="Gunicorn worker processes")
+@click.option("--concurrency", "-c", type=int, default=8, show_default=True, help="Concurrent clients")
+@click.option("--duration", "-d", type=float, default=30.0, show_default=True, help="Seconds to run")
+@click.option("--requests", "-n", "total", type=int, help="Stop after this many requests instead")
+@click.option(
+    "--mix",
+    default="generate=3,download=5,validate=2",
+    show_default=True,
+    help="Relative endpoint weights",
+)
+@click.option("--output", "-o", type=click.Path(dir_okay=False), help="Write the JSON report to this file")
+def loadtest(url, server, server_workers, concurrency, duration, total, mix, output):
+    """Load-test the web app and report latency percentiles."""
+    import json
+    from contextlib import nullcontext
+    from ..perf.loadtest import LoadTest, ServerProcess, format_report
+
+    try:
+        weights = {}
+        for item in mix.split(","):
+            name, _, weight = item.partition("=")
+            weights[name.strip()] = int(weight)
+    except ValueError:
+        click.echo(f"Invalid --mix: {mix}", err=True)
+        sys.exit(1)
+    unknown = set(weights) - {"generate", "download", "validate"}
+    if unknown:
+        click.echo(f"Unknown endpoint in --mix: {', '.join(sorted(unknown))}", err=True)
+        sys.exit(1)
+
+    server_context = nullcontext() if url else ServerProcess(server, workers=server_workers)
+    try:
+        with server_context as process:
+            target = url or process.url
+            click.echo(f"Load testing {target} with {concurrency} clients...", err=True)
+            report = LoadTest(target, concurrency, duration, total, weights).run()
+    except (TimeoutError, OSError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(1)
+
+    click.echo(format_report(report))
+    if output:
+        Path(output).write_text(json.dumps(report, indent=2))
+        click.echo(f"Report written to {output}", err=True)
+
+
 if __name__ == "__main__":
     main()
 
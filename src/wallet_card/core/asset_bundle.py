@@ -0,0 +1,199 @@
+"""Prebuilt asset bundles for an organization and template.
+
+A bundle is a directory holding the pass images in their final sizes,
+already encoded (and PNG-optimized), plus ``bundle.json`` recording each
+file's SHA-1, the pass defaults it was built with and a content version.
+Building one is a one-time step (``wallet-card assets build``); passes
+generated with it skip image processing and hashing for those files.
+"""
+
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from . import metrics
+from .asset_manager import AssetManager, ImageSource
+
+BUNDLE_FORMAT = 1
+MANIFEST_NAME = "bundle.json"
+
+# Pass file -> (asset type, size)
+BUNDLE_FILES = {
+    "icon.png": ("icon", AssetManager.ICON_SIZE),
+    "logo.png": ("logo", AssetManager.LOGO_SIZE),
+    "strip.png": ("photo", AssetManager.PHOTO_SIZE),
+}
+
+# pass.json keys an organization sets once for all its cards
+DEFAULT_KEYS = (
+    "passTypeIdentifier",
+    "teamIdentifier",
+    "organizationName",
+    "description",
+    "logoText",
+    "foregroundColor",
+    "backgroundColor",
+    "labelColor",
+)
+
+
+class AssetBundle:
+    """A loaded asset bundle."""
+
+    def __init__(self, path: str):
+        """Load a bundle and check its files against their digests.
+
+        Args:
+            path: Bundle directory
+
+        Raises:
+            ValueError: If the bundle is malformed or a file does not match
+                its recorded digest
+        """
+        self.path = Path(path)
+        try:
+            manifest = json.loads((self.path / MANIFEST_NAME).read_text())
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Not an asset bundle: {path} ({e})") from e
+        if manifest.get("format") != BUNDLE_FORMAT:
+            raise ValueError(f"Unsupported asset bundle format: {manifest.get('format')}")
+
+        self.version: str = manifest["version"]
+        self.template: str = manifest["template"]
+        self.org: str = manifest["org"]
+        self.defaults: Dict[str, Any] = manifest.get("defaults", {})
+        self.files: Dict[str, bytes] = {}
+        self.digests: Dict[str, str] = {}
+        for name, info in manifest["files"].items():
+            content = (self.path / name).read_bytes()
+            if hashlib.sha1(content).hexdigest() != info["sha1"]:
+                raise ValueError(f"Asset bundle file does not match its digest: {name}")
+            self.files[name] = content
+            self.digests[name] = info["sha1"]
+
+    def file_for(self, asset_type: str) -> Optional[str]:
+        """Return the pass file name holding an asset type, if bundled.
+
+        Args:
+            asset_type: "icon", "logo" or "photo"
+
+        Returns:
+            File name such as "logo.png", or None
+        """
+        for name, (kind, _) in BUNDLE_FILES.items():
+            if kind == asset_type and name in self.files:
+                return name
+        return None
+
+
+def load_bundle(path: str) -> AssetBundle:
+    """Load a bundle, reusing it while bundle.json is unchanged.
+
+    Args:
+        path: Bundle directory
+
+    Returns:
+        Loaded bundle
+
+    Raises:
+        ValueError: If the bundle is missing or malformed
+    """
+    path = os.path.abspath(path)
+    try:
+        mtime = os.stat(os.path.join(path, MANIFEST_NAME)).st_mtime_ns
+    except OSError as e:
+        raise ValueError(f"Not an asset bundle: {path} ({e})") from e
+    return _load_bundle(path, mtime)
+
+
+@lru_cache(maxsize=16)
+def _load_bundle(path: str, mtime: int) -> AssetBundle:
+    """Load a bundle (cached by path and bundle.json mtime)."""
+    return AssetBundle(path)
+
+
+metrics.register_lru_cache("asset_bundle", _load_bundle)
+
+
+def build_bundle(
+    output_dir: str,
+    template: str,
+    org: str,
+    sources: Optional[Dict[str, ImageSource]] = None,
+    defaults: Optional[Dict[str, Any]] = None,
+) -> AssetBundle:
+    """Render, optimize and digest an organization's pass images.
+
+    Args:
+        output_dir: Directory receiving the bundle; it is written to
+            ``<output_dir>/<org>/<template>/<version>``
+        template: Template name, e.g. "classic_blue"
+        org: Organization name or slug
+        sources: Source images keyed by asset type ("icon", "logo",
+            "photo"); missing ones get the standard placeholder
+        defaults: Pass defaults, e.g. the org's organizationName and
+            colours; only DEFAULT_KEYS are kept
+
+    Returns:
+        The written bundle
+    """
+    sources = sources or {}
+    manager = AssetManager(output_dir)
+    prepare = {
+        "icon": manager.prepare_icon_bytes,
+        "logo": manager.prepare_logo_bytes,
+        "photo": manager.prepare_photo_bytes,
+    }
+    files = {
+        name: _optimize_png(prepare[asset_type](sources.get(asset_type)))
+        for name, (asset_type, _) in BUNDLE_FILES.items()
+    }
+    pass_defaults = {key: value for key, value in ((defaults or {}).get("pass") or {}).items() if key in DEFAULT_KEYS}
+
+    digests = {name: hashlib.sha1(content).hexdigest() for name, content in files.items()}
+    fingerprint = json.dumps([BUNDLE_FORMAT, template, digests, pass_defaults], sort_keys=True)
+    version = hashlib.sha1(fingerprint.encode()).hexdigest()[:12]
+
+    slug = re.sub(r"[^A-Za-z0-9_-]+", "-", org).strip("-").lower() or "org"
+    path = Path(output_dir) / slug / template / version
+    path.mkdir(parents=True, exist_ok=True)
+    for name, content in files.items():
+        (path / name).write_bytes(content)
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": version,
+        "template": template,
+        "org": org,
+        "created": int(time.time()),
+        "defaults": {"pass": pass_defaults} if pass_defaults else {},
+        "files": {
+            name: {
+                "sha1": digests[name],
+                "bytes": len(content),
+                "size": list(BUNDLE_FILES[name][1]),
+            }
+            for name, content in files.items()
+        },
+    }
+    # bundle.json goes last, so a bundle is only loadable once complete
+    tmp_path = path / f".{MANIFEST_NAME}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_path, path / MANIFEST_NAME)
+    return load_bundle(str(path))
+
+
+def _optimize_png(data: bytes) -> bytes:
+    """Re-encode a PNG with Pillow's optimizer; worth it for a one-time build."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        buffer = io.BytesIO()
+        img.save(buffer, "PNG", optimize=True)
+    optimized = buffer.getvalue()
+    return optimized if len(optimized) < len(data) else data
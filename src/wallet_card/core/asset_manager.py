@@ -1,11 +1,22 @@
 """Asset management for images and QR codes."""
 
+import hashlib
+import io
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
-from PIL import Image, ImageDraw, ImageFont
-import qrcode
-from qrcode.image.pil import PilImage
+from typing import TYPE_CHECKING, BinaryIO, Optional, Tuple, Union
+from .blob_store import Blob
+from . import metrics, warm_cache
+
+# Pillow and qrcode are imported where images are rendered, so importing
+# this module (and the web app) stays cheap on cold starts
+if TYPE_CHECKING:
+    from PIL import Image
+
+# An image source: a file path, an open binary stream, raw encoded bytes or
+# a deduplicated upload from a BlobStore
+ImageSource = Union[str, Path, BinaryIO, bytes, Blob]
 
 
 class AssetManager:
@@ -55,28 +66,7 @@ class AssetManager:
             size: Image dimensions
             color: Background color
         """
-        img = Image.new("RGB", size, color)
-        draw = ImageDraw.Draw(img)
-
-        # Try to use a font, fallback to default if not available
-        try:
-            font_size = min(size) // 4
-            font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
-        except (OSError, AttributeError):
-            font = ImageFont.load_default()
-
-        text = path.stem.upper()
-        bbox = draw.textbbox((0, 0), text, font=font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-
-        position = (
-            (size[0] - text_width) // 2,
-            (size[1] - text_height) // 2,
-        )
-
-        draw.text(position, text, fill="white", font=font)
-        img.save(path, "PNG")
+        path.write_bytes(_placeholder_png(path.stem.upper(), size, color))
 
     def prepare_icon(self, icon_path: Optional[str] = None) -> Path:
         """Prepare icon image (180x180).
@@ -120,22 +110,86 @@ class AssetManager:
 
         return self.ensure_image_exists("photo.png", self.PHOTO_SIZE)
 
-    def _resize_image(
-        self, source_path: Path, target_size: Tuple[int, int], output_name: str
-    ) -> Path:
-        """Resize an image to target size.
+    def prepare_icon_bytes(self, source: Optional[ImageSource] = None) -> bytes:
+        """Prepare icon image (180x180) in memory.
 
         Args:
-            source_path: Path to source image
+            source: Optional custom icon (path, stream or bytes)
+
+        Returns:
+            PNG-encoded icon
+        """
+        return self._prepare_bytes(source, self.ICON_SIZE, "ICON")
+
+    def prepare_logo_bytes(self, source: Optional[ImageSource] = None) -> bytes:
+        """Prepare logo image (320x100) in memory.
+
+        Args:
+            source: Optional custom logo (path, stream or bytes)
+
+        Returns:
+            PNG-encoded logo
+        """
+        return self._prepare_bytes(source, self.LOGO_SIZE, "LOGO")
+
+    def prepare_photo_bytes(self, source: Optional[ImageSource] = None) -> bytes:
+        """Prepare photo image (320x320) in memory.
+
+        Args:
+            source: Optional custom photo (path, stream or bytes)
+
+        Returns:
+            PNG-encoded photo
+        """
+        return self._prepare_bytes(source, self.PHOTO_SIZE, "PHOTO")
+
+    def _prepare_bytes(
+        self, source: Optional[ImageSource], target_size: Tuple[int, int], placeholder_text: str
+    ) -> bytes:
+        """Resize a source image, or render a placeholder if there is none.
+
+        Args:
+            source: Optional image source
             target_size: Target dimensions
-            output_name: Name for output file
+            placeholder_text: Text drawn on the placeholder
 
         Returns:
-            Path to resized image
+            PNG-encoded image
         """
-        output_path = self.assets_dir / output_name
+        if isinstance(source, (str, Path)) and not Path(source).exists():
+            source = None
+        if not source:
+            return _placeholder_png(placeholder_text, target_size, "#4A90E2")
+        if isinstance(source, Blob):
+            # Resized variants are cached per upload content hash
+            return source.variant(target_size, lambda: self.render_resized(source.path, target_size))
+        if isinstance(source, (str, Path)):
+            # Configured files (e.g. org logos) are keyed by path and mtime
+            path = Path(source).resolve()
+            stat = path.stat()
+            key = (str(path), stat.st_mtime_ns, stat.st_size, target_size)
+            return warm_cache.cached("resized", key, lambda: self.render_resized(path, target_size))
+        if isinstance(source, bytes):
+            key = (hashlib.sha256(source).hexdigest(), target_size)
+            return warm_cache.cached("resized", key, lambda: self.render_resized(source, target_size))
+        return self.render_resized(source, target_size)
+
+    def render_resized(self, source: ImageSource, target_size: Tuple[int, int]) -> bytes:
+        """Resize an image to target size without touching disk.
 
-        with Image.open(source_path) as img:
+        Args:
+            source: Path, binary stream or encoded bytes of the source image
+            target_size: Target dimensions
+
+        Returns:
+            PNG-encoded resized image
+        """
+        from PIL import Image
+
+        if isinstance(source, bytes):
+            source = io.BytesIO(source)
+
+        with Image.open(source) as img:
             # Convert to RGB if necessary
             if img.mode != "RGB":
                 img = img.convert("RGB")
@@ -149,8 +203,23 @@ class AssetManager:
             paste_y = (target_size[1] - img.size[1]) // 2
             new_img.paste(img, (paste_x, paste_y))
 
-            new_img.save(output_path, "PNG")
+        return _encode_png(new_img)
+
+    def _resize_image(
+        self, source_path: Path, target_size: Tuple[int, int], output_name: str
+    ) -> Path:
+        """Resize an image to target size.
 
+        Args:
+            source_path: Path to source image
+            target_size: Target dimensions
+            output_name: Name for output file
+
+        Returns:
+            Path to resized image
+        """
+        output_path = self.assets_dir / output_name
+        output_path.write_bytes(self.render_resized(source_path, target_size))
         return output_path
 
     def generate_qr_code(
@@ -160,12 +229,49 @@ class AssetManager:
 
         Args:
             data: Data to encode in QR code
-            output_name: Name for output file
+            output_name: Name for output file; a ``.svg`` name selects
+                vector output
             size: Size of QR code image
 
         Returns:
             Path to generated QR code
         """
+        output_path = self.assets_dir / output_name
+        image_format = "svg" if output_path.suffix.lower() == ".svg" else "png"
+        output_path.write_bytes(self.render_qr_code(data, size, image_format))
+
+        return output_path
+
+    def render_qr_code(self, data: str, size: int = 200, image_format: str = "png") -> bytes:
+        """Render a QR code image in memory.
+
+        Args:
+            data: Data to encode in QR code
+            size: Size of QR code image
+            image_format: "png", or "svg" for a scalable vector image whose
+                ``size`` is only its default display size
+
+        Returns:
+            Encoded QR code
+
+        Raises:
+            ValueError: If the format is not supported
+        """
+        if image_format == "svg":
+            from .qr import qr_matrix, render_qr_svg
+
+            with metrics.stage("qr_code"):
+                return render_qr_svg(qr_matrix(data, "L"), size).encode()
+        if image_format != "png":
+            raise ValueError(f"Unsupported QR code format: {image_format}")
+        with metrics.stage("qr_code"):
+            return warm_cache.cached("qr_code", (data, size), lambda: self._render_qr_code(data, size))
+
+    def _render_qr_code(self, data: str, size: int) -> bytes:
+        """Encode and rasterize a QR code."""
+        import qrcode
+        from PIL import Image
+
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -178,10 +284,7 @@ class AssetManager:
         img = qr.make_image(fill_color="black", back_color="white")
         img = img.resize((size, size), Image.Resampling.LANCZOS)
 
-        output_path = self.assets_dir / output_name
-        img.save(output_path, "PNG")
-
-        return output_path
+        return _encode_png(img)
 
     def get_asset_path(self, filename: str) -> Optional[Path]:
         """Get path to an asset file.
@@ -195,3 +298,51 @@ class AssetManager:
         path = self.assets_dir / filename
         return path if path.exists() else None
 
+
+def _encode_png(img: "Image.Image") -> bytes:
+    """Encode an image as PNG bytes."""
+    buffer = io.BytesIO()
+    img.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=32)
+def _placeholder_png(text: str, size: Tuple[int, int], color: str) -> bytes:
+    """Render a placeholder image with centred text.
+
+    Placeholders only depend on their arguments, so the encoded PNG is
+    cached and shared between passes (and invocations, via the warm cache).
+    """
+    return warm_cache.cached(
+        "placeholder", (text, size, color), lambda: _render_placeholder(text, size, color)
+    )
+
+
+def _render_placeholder(text: str, size: Tuple[int, int], color: str) -> bytes:
+    """Draw a placeholder image."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    img = Image.new("RGB", size, color)
+    draw = ImageDraw.Draw(img)
+
+    # Try to use a font, fallback to default if not available
+    try:
+        font_size = min(size) // 4
+        font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
+    except (OSError, AttributeError):
+        font = ImageFont.load_default()
+
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+
+    position = (
+        (size[0] - text_width) // 2,
+        (size[1] - text_height) // 2,
+    )
+
+    draw.text(position, text, fill="white", font=font)
+    return _encode_png(img)
+
+
+metrics.register_lru_cache("placeholder", _placeholder_png)
@@ -0,0 +1,234 @@
+"""Pass generation for asyncio services."""
+
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple, Union
+
+from .asset_manager import ImageSource
+from .pass_generator import PassGenerator
+from .pass_store import PassStore
+
+# Derives an output filename from a config's position in generate_many
+FilenameCallback = Callable[[int, Dict[str, Any]], str]
+
+# Generators built inside worker processes, keyed by their settings
+_worker_generators: Dict[Tuple[Any, ...], PassGenerator] = {}
+
+
+def _generate_in_worker(
+    settings: Tuple[Any, ...], config: Dict[str, Any], uploads: Optional[Dict[str, ImageSource]]
+) -> bytes:
+    """Build an archive in a worker process, reusing its generator."""
+    generator = _worker_generators.get(settings)
+    if generator is None:
+        assets_dir, output_dir, cert_file, key_file, template_name = settings
+        generator = PassGenerator(
+            assets_dir=assets_dir,
+            output_dir=output_dir,
+            cert_file=cert_file,
+            key_file=key_file,
+            template_name=template_name,
+        )
+        _worker_generators[settings] = generator
+    return generator.generate_bytes(config, uploads)
+
+
+class AsyncPassGenerator:
+    """Awaitable wrapper around PassGenerator.
+
+    Archive building (image processing, hashing, zipping, signing) runs on
+    a managed thread or process pool, and output files are written from
+    the event loop's default executor, so the loop itself never blocks.
+    At most ``max_concurrency`` passes are in flight at once.
+
+    Cancelling a call drops work that has not started yet. Work already
+    running on the pool finishes, but nothing is written for it. With
+    processes, pipeline metrics are recorded in the workers and do not
+    appear in this process's /metrics. Uploads must also be bytes or
+    paths so they can be pickled.
+    """
+
+    def __init__(
+        self,
+        assets_dir: str = "assets/user",
+        output_dir: str = "output",
+        cert_file: Optional[str] = None,
+        key_file: Optional[str] = None,
+        store: Optional[PassStore] = None,
+        template_name: str = "default",
+        processes: bool = False,
+        workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        """Initialize async pass generator.
+
+        Args:
+            assets_dir: Directory containing assets
+            output_dir: Directory for output files
+            cert_file: Optional path to certificate file for signing
+            key_file: Optional path to key file for signing
+            store: Optional content-addressed store for output files
+            template_name: Template label attached to pipeline metrics
+            processes: Build archives in worker processes instead of threads
+            workers: Pool size (default: CPU count)
+            max_concurrency: Passes in flight at once (default: twice the
+                pool size, so the pool stays busy while files are written)
+        """
+        self.generator = PassGenerator(
+            assets_dir=assets_dir,
+            output_dir=output_dir,
+            cert_file=cert_file,
+            key_file=key_file,
+            store=store,
+            template_name=template_name,
+        )
+        self.processes = processes
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.workers * 2
+        self._settings = (assets_dir, output_dir, cert_file, key_file, template_name)
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncPassGenerator":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def generate(
+        self,
+        config: Dict[str, Any],
+        output_filename: Optional[str] = None,
+        uploads: Optional[Dict[str, ImageSource]] = None,
+    ) -> Path:
+        """Generate a .pkpass file from configuration.
+
+        Args:
+            config: Configuration dictionary
+            output_filename: Optional custom output filename
+            uploads: Optional in-memory images keyed by asset type
+
+        Returns:
+            Path to generated .pkpass file
+
+        Raises:
+            ValidationError: If configuration is invalid
+        """
+        async with self._limit():
+            data = await self._build(config, uploads)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.generator.save, data, config, output_filename)
+
+    async def generate_bytes(
+        self,
+        config: Dict[str, Any],
+        uploads: Optional[Dict[str, ImageSource]] = None,
+    ) -> bytes:
+        """Generate a .pkpass archive in memory.
+
+        Args:
+            config: Configuration dictionary
+            uploads: Optional in-memory images keyed by asset type
+
+        Returns:
+            Contents of the .pkpass file
+
+        Raises:
+            ValidationError: If configuration is invalid
+        """
+        async with self._limit():
+            return await self._build(config, uploads)
+
+    async def generate_many(
+        self,
+        configs: Iterable[Dict[str, Any]],
+        output_filename: Optional[FilenameCallback] = None,
+        return_exceptions: bool = False,
+    ) -> AsyncIterator[Tuple[int, Union[Path, Exception]]]:
+        """Generate passes concurrently, yielding them as they finish.
+
+        Configs are pulled from the iterable only as slots free up, so
+        large or lazy batches are never materialized. Leaving the loop
+        early cancels the passes still in flight.
+
+        Args:
+            configs: Configuration dictionaries
+            output_filename: Optional callback receiving (index, config)
+                and returning the output filename
+            return_exceptions: Yield failures instead of raising the first
+
+        Returns:
+            Async iterator over (index in configs, path or exception)
+
+        Raises:
+            ValidationError: If a configuration is invalid and
+                return_exceptions is False
+        """
+        items = enumerate(configs)
+        pending: set = set()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < self.max_concurrency:
+                    try:
+                        index, config = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    filename = output_filename(index, config) if output_filename else None
+                    pending.add(asyncio.ensure_future(self._generate_indexed(index, config, filename)))
+                if not pending:
+                    return
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, result = task.result()
+                    if isinstance(result, Exception) and not return_exceptions:
+                        raise result
+                    yield index, result
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Shut down the worker pool, waiting for running work."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, executor.shutdown)
+
+    async def _generate_indexed(
+        self, index: int, config: Dict[str, Any], filename: Optional[str]
+    ) -> Tuple[int, Union[Path, Exception]]:
+        """Generate one pass of a batch, capturing its failure."""
+        try:
+            return index, await self.generate(config, filename)
+        except Exception as e:
+            return index, e
+
+    async def _build(self, config: Dict[str, Any], uploads: Optional[Dict[str, ImageSource]]) -> bytes:
+        """Run the generation pipeline on the pool."""
+        if self.processes:
+            future = self._pool().submit(_generate_in_worker, self._settings, config, uploads)
+        else:
+            future = self._pool().submit(self.generator.generate_bytes, config, uploads)
+        # Cancelling the awaiting task also cancels the future if it has not started
+        return await asyncio.wrap_future(future)
+
+    def _pool(self) -> Executor:
+        """Return the worker pool, starting it on first use."""
+        if self._executor is None:
+            if self.processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="wallet-card-async")
+        return self._executor
+
+    def _limit(self) -> asyncio.Semaphore:
+        """Return the concurrency limit, created in the running loop."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
@@ -0,0 +1,262 @@
+"""vCard QR badges for printing in bulk.
+
+Each roster entry becomes a share card (``vcard`` layout) whose QR code
+holds the person's contact as a vCard; scanning it offers to add the
+contact. Rosters are streamed in chunks to a pool of worker processes,
+each reusing its cached fonts, QR matrices and backgrounds.
+"""
+
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .field_template import read_rows
+from .share_card import TextLine, get_share_card_renderer
+
+# Roster columns, in the order they appear on the card
+CONTACT_FIELDS = ("name", "title", "org", "email", "phone", "website", "linkedin", "github")
+
+# Alternative column names accepted in rosters
+FIELD_ALIASES = {
+    "full_name": "name",
+    "fn": "name",
+    "company": "org",
+    "organization": "org",
+    "mobile": "phone",
+    "tel": "phone",
+    "url": "website",
+}
+
+
+def escape_vcard(value: str) -> str:
+    """Escape a vCard text value (RFC 6350, section 3.4).
+
+    Args:
+        value: Raw text
+
+    Returns:
+        Text with backslashes, commas, semicolons and newlines escaped
+    """
+    return (
+        value.replace("\\", "\\\\")
+        .replace(",", "\\,")
+        .replace(";", "\\;")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+        .replace("\r", "\\n")
+    )
+
+
+def build_vcard(contact: Dict[str, str]) -> str:
+    """Build a vCard 3.0 for a contact.
+
+    Args:
+        contact: Contact fields (see CONTACT_FIELDS); empty ones are omitted
+
+    Returns:
+        vCard text with CRLF line endings
+    """
+    name = contact.get("name", "").strip()
+    parts = name.rsplit(" ", 1)
+    family, given = (parts[1], parts[0]) if len(parts) == 2 else (name, "")
+
+    lines = [
+        "BEGIN:VCARD",
+        "VERSION:3.0",
+        f"N:{escape_vcard(family)};{escape_vcard(given)};;;",
+        f"FN:{escape_vcard(name)}",
+    ]
+    properties = (
+        ("org", "ORG"),
+        ("title", "TITLE"),
+        ("email", "EMAIL;TYPE=INTERNET,WORK"),
+        ("phone", "TEL;TYPE=CELL"),
+        ("website", "URL"),
+        ("linkedin", "URL"),
+        ("github", "URL"),
+    )
+    for key, prop in properties:
+        value = contact.get(key, "").strip()
+        if value:
+            lines.append(f"{prop}:{escape_vcard(value)}")
+    lines.append("END:VCARD")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def normalize_contact(row: Dict[str, Any]) -> Dict[str, str]:
+    """Map a roster row onto CONTACT_FIELDS.
+
+    Args:
+        row: Row with case-insensitive column names, aliases allowed
+
+    Returns:
+        Contact dictionary with every field present
+    """
+    contact = dict.fromkeys(CONTACT_FIELDS, "")
+    for column, value in row.items():
+        if column is None or value is None:
+            continue
+        key = column.strip().lower().replace(" ", "_")
+        key = FIELD_ALIASES.get(key, key)
+        if key in contact:
+            contact[key] = str(value).strip()
+    return contact
+
+
+def render_badge(contact: Dict[str, str], image_format: str = "png") -> bytes:
+    """Render one contact's vCard QR badge.
+
+    Args:
+        contact: Contact fields
+        image_format: "png", or "svg" for vector output
+
+    Returns:
+        Encoded badge
+    """
+    lines: List[TextLine] = []
+    if contact.get("org"):
+        lines.append((contact["org"], "gray"))
+    for key in ("email", "phone"):
+        if contact.get(key):
+            lines.append((contact[key], "black"))
+    if contact.get("website"):
+        lines.append((contact["website"], "blue"))
+    renderer = get_share_card_renderer()
+    args = (build_vcard(contact), contact.get("name", ""), contact.get("title", ""), lines)
+    if image_format == "svg":
+        return renderer.render_svg(*args, layout="vcard").encode()
+    return renderer.render_png(*args, layout="vcard")
+
+
+def badge_filename(index: int, contact: Dict[str, str], image_format: str = "png") -> str:
+    """Derive a unique, filesystem-safe badge filename.
+
+    Args:
+        index: Position in the roster
+        contact: Contact fields
+        image_format: Image format, used as the extension
+
+    Returns:
+        Filename such as ``00042-Jane_Doe.png``
+    """
+    safe_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in contact.get("name", ""))
+    return f"{index:05d}-{safe_name[:60] or 'badge'}.{image_format}"
+
+
+def read_roster(path: str) -> Iterator[Dict[str, str]]:
+    """Stream contacts from a CSV or JSON Lines roster.
+
+    Args:
+        path: Roster file (``.csv`` with a header row, or ``.jsonl``)
+
+    Returns:
+        Iterator over normalized contacts
+    """
+    for row in read_rows(path):
+        yield normalize_contact(row)
+
+
+def _render_chunk(chunk: List[Tuple[int, Dict[str, str]]], image_format: str = "png") -> List[Tuple[str, bytes]]:
+    """Render a chunk of badges in a worker process."""
+    return [
+        (badge_filename(index, contact, image_format), render_badge(contact, image_format)) for index, contact in chunk
+    ]
+
+
+def _chunks(contacts: Iterable[Dict[str, str]], size: int) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    """Group indexed contacts into lists of ``size``."""
+    chunk: List[Tuple[int, Dict[str, str]]] = []
+    for item in enumerate(contacts, 1):
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_badges(
+    contacts: Iterable[Dict[str, str]],
+    workers: Optional[int] = None,
+    chunk_size: int = 32,
+    image_format: str = "png",
+) -> Iterator[Tuple[str, bytes]]:
+    """Render badges across worker processes, in roster order.
+
+    Only a few chunks per worker are in flight at once, so rosters of any
+    length are rendered in bounded memory.
+
+    Args:
+        contacts: Contacts to render
+        workers: Worker processes (default: CPU count; 1 renders inline)
+        chunk_size: Badges per task sent to a worker
+        image_format: "png" or "svg"
+
+    Returns:
+        Iterator over (filename, encoded badge)
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in _chunks(contacts, chunk_size):
+            yield from _render_chunk(chunk, image_format)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight: Deque[Future] = deque()
+        for chunk in _chunks(contacts, chunk_size):
+            in_flight.append(pool.submit(_render_chunk, chunk, image_format))
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def generate_badges(
+    contacts: Iterable[Dict[str, str]],
+    output: str,
+    workers: Optional[int] = None,
+    chunk_size: int = 32,
+    image_format: str = "png",
+) -> Dict[str, Any]:
+    """Render badges to a directory of images or a single zip.
+
+    Args:
+        contacts: Contacts to render
+        output: Output directory, or a path ending in ``.zip``
+        workers: Worker processes (default: CPU count)
+        chunk_size: Badges per task sent to a worker
+        image_format: "png" or "svg"
+
+    Returns:
+        Report with the badge count, output path and throughput
+    """
+    start = time.perf_counter()
+    count = 0
+    badges = iter_badges(contacts, workers, chunk_size, image_format)
+    if output.endswith(".zip"):
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        # PNGs are already compressed; storing them avoids a second deflate pass
+        compression = zipfile.ZIP_DEFLATED if image_format == "svg" else zipfile.ZIP_STORED
+        with zipfile.ZipFile(output, "w", compression) as archive:
+            for filename, data in badges:
+                archive.writestr(filename, data)
+                count += 1
+    else:
+        directory = Path(output)
+        directory.mkdir(parents=True, exist_ok=True)
+        for filename, data in badges:
+            (directory / filename).write_bytes(data)
+            count += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "badges": count,
+        "output": output,
+        "elapsed_s": round(elapsed, 2),
+        "per_second": round(count / elapsed, 1) if elapsed else 0.0,
+    }
+
@@ -0,0 +1,261 @@
+"""Deduplicating, reference-counted store for uploaded images."""
+
+import hashlib
+import io
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import BinaryIO, Callable, List, Optional, Tuple
+
+from . import metrics
+
+
+class Blob:
+    """An uploaded image held in a BlobStore."""
+
+    def __init__(self, store: "BlobStore", digest: str, size: int):
+        """Initialize blob.
+
+        Args:
+            store: Store holding the blob
+            digest: Hex SHA-256 of the content
+            size: Content size in bytes
+        """
+        self.store = store
+        self.digest = digest
+        self.size = size
+
+    @property
+    def path(self) -> Path:
+        """Path to the stored content."""
+        return self.store.path_for(self.digest)
+
+    def variant(self, size: Tuple[int, int], render: Callable[[], bytes]) -> bytes:
+        """Return a cached derived image, rendering it on first use.
+
+        Args:
+            size: Variant dimensions, part of the cache key
+            render: Produces the encoded variant when it is not cached
+
+        Returns:
+            Encoded variant
+        """
+        return self.store.variant(self.digest, size, render)
+
+    def release(self) -> None:
+        """Drop this holder's reference to the blob."""
+        self.store.release(self.digest)
+
+
+class BlobStore:
+    """Stores uploads once, keyed by the SHA-256 of their content.
+
+    Uploads are hashed while they are read; content already in the store is
+    not written again. Each ``put_stream`` takes a reference that the caller
+    drops with ``Blob.release`` once it no longer needs the file, and
+    ``collect`` deletes unreferenced blobs after a grace period. Derived
+    images (resized variants) are cached next to the blob under the same
+    key, so repeat uploads skip decoding entirely.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS blobs (
+            digest TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            refs INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS blobs_unreferenced ON blobs (refs, last_used);
+    """
+
+    def __init__(self, root: str):
+        """Initialize blob store.
+
+        Args:
+            root: Root directory of the store
+        """
+        self.root = Path(root)
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        (self.root / "variants").mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / ".blobs.sqlite3"
+        self._local = threading.local()
+        self._connect().executescript(self.SCHEMA)
+
+    def path_for(self, digest: str) -> Path:
+        """Return the object path for a digest.
+
+        Args:
+            digest: Hex SHA-256 digest
+
+        Returns:
+            Sharded object path
+        """
+        return self.root / "objects" / digest[:2] / digest
+
+    def put_stream(self, stream: BinaryIO, chunk_size: int = 64 * 1024) -> Blob:
+        """Store an upload, hashing it as it is read.
+
+        The content is buffered in memory (uploads are bounded by the app's
+        MAX_CONTENT_LENGTH) and only written if the digest is new.
+
+        Args:
+            stream: Binary stream positioned at the start of the upload
+            chunk_size: Read size in bytes
+
+        Returns:
+            Referenced blob; call ``release`` when done with it
+        """
+        digest = hashlib.sha256()
+        buffer = io.BytesIO()
+        for chunk in iter(lambda: stream.read(chunk_size), b""):
+            digest.update(chunk)
+            buffer.write(chunk)
+        return self._store(digest.hexdigest(), buffer.getvalue())
+
+    def put_bytes(self, data: bytes) -> Blob:
+        """Store in-memory content.
+
+        Args:
+            data: Content to store
+
+        Returns:
+            Referenced blob; call ``release`` when done with it
+        """
+        return self._store(hashlib.sha256(data).hexdigest(), data)
+
+    def get(self, digest: str) -> Optional[Blob]:
+        """Look up a stored blob without taking a reference.
+
+        Args:
+            digest: Hex SHA-256 digest
+
+        Returns:
+            Blob or None if not stored
+        """
+        row = self._connect().execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is None or not self.path_for(digest).exists():
+            return None
+        return Blob(self, digest, row[0])
+
+    def release(self, digest: str) -> None:
+        """Drop one reference to a blob.
+
+        Args:
+            digest: Hex SHA-256 digest
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE blobs SET refs = refs - 1, last_used = ? WHERE digest = ? AND refs > 0",
+                (time.time(), digest),
+            )
+
+    def refs(self, digest: str) -> int:
+        """Return the current reference count of a blob.
+
+        Args:
+            digest: Hex SHA-256 digest
+
+        Returns:
+            Number of outstanding references (0 if unknown)
+        """
+        row = self._connect().execute("SELECT refs FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        return row[0] if row else 0
+
+    def variant(self, digest: str, size: Tuple[int, int], render: Callable[[], bytes]) -> bytes:
+        """Return a cached derived image for a blob.
+
+        Args:
+            digest: Hex SHA-256 digest of the source blob
+            size: Variant dimensions, part of the cache key
+            render: Produces the encoded variant when it is not cached
+
+        Returns:
+            Encoded variant
+        """
+        path = self._variant_dir(digest) / f"{size[0]}x{size[1]}.png"
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            pass
+        else:
+            metrics.record_cache("image_variant", hit=True)
+            return data
+
+        metrics.record_cache("image_variant", hit=False)
+        data = render()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(path, data)
+        return data
+
+    def collect(self, grace: float = 3600.0, now: Optional[float] = None) -> List[str]:
+        """Delete blobs nobody references, with their cached variants.
+
+        Args:
+            grace: Seconds a blob must have been unreferenced before removal
+            now: Optional current time
+
+        Returns:
+            Digests of removed blobs
+        """
+        cutoff = (time.time() if now is None else now) - grace
+        conn = self._connect()
+        removed = []
+        # Hold the write lock while unlinking so a concurrent put_stream
+        # of the same content waits and then rewrites the object
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                "SELECT digest FROM blobs WHERE refs = 0 AND last_used < ?", (cutoff,)
+            ).fetchall()
+            for (digest,) in rows:
+                conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                try:
+                    self.path_for(digest).unlink()
+                except FileNotFoundError:
+                    pass
+                shutil.rmtree(self._variant_dir(digest), ignore_errors=True)
+                removed.append(digest)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return removed
+
+    def _store(self, digest: str, data: bytes) -> Blob:
+        """Reference a blob, writing its content only if it is new."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO blobs (digest, size, refs, last_used) VALUES (?, ?, 1, ?) "
+                "ON CONFLICT(digest) DO UPDATE SET refs = refs + 1, last_used = excluded.last_used",
+                (digest, len(data), time.time()),
+            )
+
+        path = self.path_for(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._write_atomic(path, data)
+        return Blob(self, digest, len(data))
+
+    def _variant_dir(self, digest: str) -> Path:
+        """Return the directory holding a blob's variants."""
+        return self.root / "variants" / digest[:2] / digest
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        """Write a file via a temporary name and rename."""
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection to the index."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.index_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
@@ -0,0 +1,198 @@
+"""Placeholder expressions in pass configurations.
+
+Any string in a configuration may contain placeholders that are filled
+from a row of personal data (a web form, a roster line)::
+
+    {first} {last}            -> "Jane Doe"
+    mailto:{email|lower}      -> "mailto:jane@example.com"
+    {title|default:Member}    -> "Member" when the row has no title
+    {{literal braces}}        -> "{literal braces}"
+
+Formatters (see FORMATTERS) are applied left to right. Missing fields are
+empty; an expression whose placeholders are all empty renders as "", so
+``mailto:{email}`` disappears rather than leaving a bare prefix.
+
+Configurations are compiled once into nested render functions; rendering
+a row then only substitutes strings and rebuilds the containers.
+"""
+
+import csv
+import json
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+from urllib.parse import quote
+
+# A compiled string or configuration: renders a row of data
+Renderer = Callable[[Mapping[str, Any]], Any]
+
+_TOKEN = re.compile(r"\{\{|\}\}|\{([^{}]*)\}")
+
+
+def _tel(value: str) -> str:
+    """Keep the characters of a phone number a tel: URL accepts."""
+    return "".join(c for c in value if c.isdigit() or c == "+")
+
+
+FORMATTERS: Dict[str, Callable[..., str]] = {
+    "upper": str.upper,
+    "lower": str.lower,
+    "title": str.title,
+    "strip": str.strip,
+    "digits": lambda value: "".join(c for c in value if c.isdigit()),
+    "tel": _tel,
+    "url": lambda value: quote(value, safe=""),
+    "default": lambda value, fallback="": value or fallback,
+}
+
+
+class Rendered(str):
+    """A string produced by rendering; never treated as an expression again.
+
+    Resolving an already personalized configuration (e.g. passing it back
+    to a template) must not re-read braces that came from the data.
+    """
+
+
+def literal(text: str) -> Rendered:
+    """Mark a string as plain text, so braces in it are kept as they are.
+
+    Args:
+        text: Text from an untrusted or non-template source (e.g. a form)
+
+    Returns:
+        The same text, exempt from placeholder rendering
+    """
+    return Rendered(text)
+
+
+def has_placeholders(text: str) -> bool:
+    """Check whether a string contains expression syntax.
+
+    Args:
+        text: String to check
+
+    Returns:
+        Whether the string has a placeholder or an escaped brace
+    """
+    return not isinstance(text, Rendered) and _TOKEN.search(text) is not None
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(text: str) -> Renderer:
+    """Compile a string with placeholders into a render function.
+
+    Args:
+        text: Expression such as "{first} {last}"
+
+    Returns:
+        Function taking a row mapping and returning the rendered string
+
+    Raises:
+        ValueError: If a placeholder is empty or names an unknown formatter
+    """
+    parts: List[Union[str, Tuple[str, Tuple[Tuple[Callable[..., str], Tuple[str, ...]], ...]]]] = []
+    position = 0
+    for match in _TOKEN.finditer(text):
+        parts.append(text[position:match.start()])
+        position = match.end()
+        token = match.group(0)
+        if token in ("{{", "}}"):
+            parts.append(token[0])
+        else:
+            parts.append(_compile_placeholder(match.group(1), text))
+    parts.append(text[position:])
+
+    literals = "".join(part for part in parts if isinstance(part, str))
+    placeholders = [part for part in parts if not isinstance(part, str)]
+    if not placeholders:
+        return lambda row: Rendered(literals)
+
+    def render(row: Mapping[str, Any]) -> str:
+        out = []
+        filled = False
+        for part in parts:
+            if isinstance(part, str):
+                out.append(part)
+                continue
+            name, formatters = part
+            value = row.get(name)
+            value = "" if value is None else str(value)
+            for formatter, args in formatters:
+                value = formatter(value, *args)
+            filled = filled or bool(value)
+            out.append(value)
+        return Rendered("".join(out).strip() if filled else "")
+
+    return render
+
+
+def _compile_placeholder(
+    source: str, text: str
+) -> Tuple[str, Tuple[Tuple[Callable[..., str], Tuple[str, ...]], ...]]:
+    """Split "name|formatter|formatter:arg" into the field and formatters."""
+    name, *specs = source.split("|")
+    name = name.strip()
+    if not name:
+        raise ValueError(f"Empty placeholder in {text!r}")
+    formatters = []
+    for spec in specs:
+        formatter_name, has_arg, arg = spec.partition(":")
+        formatter = FORMATTERS.get(formatter_name.strip())
+        if formatter is None:
+            raise ValueError(f"Unknown formatter {formatter_name.strip()!r} in {text!r}")
+        formatters.append((formatter, (arg,) if has_arg else ()))
+    return name, tuple(formatters)
+
+
+def compile_config(config: Any) -> Renderer:
+    """Compile every expression in a configuration.
+
+    Args:
+        config: Configuration (nested dicts, lists and scalars)
+
+    Returns:
+        Function taking a row mapping and returning a new configuration;
+        containers are rebuilt on every call, so results can be modified
+        freely
+    """
+    if isinstance(config, dict):
+        items = [(key, compile_config(value)) for key, value in config.items()]
+        return lambda row: {key: render(row) for key, render in items}
+    if isinstance(config, list):
+        renders = [compile_config(value) for value in config]
+        return lambda row: [render(row) for render in renders]
+    if isinstance(config, str) and has_placeholders(config):
+        return compile_expression(config)
+    return lambda row: config
+
+
+def render_config(config: Any, row: Optional[Mapping[str, Any]] = None) -> Any:
+    """Compile and render a configuration in one step.
+
+    Args:
+        config: Configuration with expressions
+        row: Data to fill in (default: none, so placeholders are empty)
+
+    Returns:
+        Rendered configuration
+    """
+    return compile_config(config)(row or {})
+
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream rows of data from a CSV or JSON Lines file.
+
+    Args:
+        path: Roster file (``.csv`` with a header row, or ``.jsonl``)
+
+    Returns:
+        Iterator over rows keyed by column name
+    """
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
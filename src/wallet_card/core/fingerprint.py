@@ -0,0 +1,60 @@
+"""Canonical fingerprints of pass configurations and their images."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional
+
+from .blob_store import Blob
+
+
+def fingerprint(*parts: Any) -> str:
+    """Hash JSON-like values into a stable key.
+
+    Dictionaries are serialized with sorted keys, so equal configurations
+    give equal fingerprints regardless of key order; values JSON cannot
+    represent (dates, paths) are hashed by their string form.
+
+    Args:
+        parts: Values making up the key
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def source_digest(source: Any) -> Optional[str]:
+    """Identify an image source by its content.
+
+    Args:
+        source: Image source (path, stream, bytes or Blob), or None
+
+    Returns:
+        A digest of the content ("" for no image, or for a path that does
+        not exist), or None if a stream cannot be rewound after hashing
+    """
+    if not source:
+        return ""
+    if isinstance(source, Blob):
+        return source.digest
+    if isinstance(source, bytes):
+        return hashlib.sha256(source).hexdigest()
+    if isinstance(source, (str, Path)):
+        # Files are identified like the resize cache does: path, mtime and size
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return ""
+        return fingerprint(str(Path(source).resolve()), stat.st_mtime_ns, stat.st_size)
+    try:
+        position = source.tell()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: source.read(64 * 1024), b""):
+            digest.update(chunk)
+        source.seek(position)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return digest.hexdigest()
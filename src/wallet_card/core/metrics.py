@@ -0,0 +1,361 @@
+"""In-process metrics with Prometheus text exposition."""
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from . import profiling
+
+LabelValues = Tuple[str, ...]
+
+# Seconds; covers a cached placeholder lookup up to a slow signed photo pass
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Render a label set, escaping values."""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Metric(ABC):
+    """Common state for labelled metrics."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        """Initialize metric.
+
+        Args:
+            name: Metric name
+            help_text: Description shown in the HELP line
+            labelnames: Names of the labels every sample carries
+        """
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """Order label values by the declared label names."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def expose(self) -> List[str]:
+        """Render the metric family in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Render the sample lines of the metric family."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the counter.
+
+        Args:
+            amount: Non-negative increment
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current value for a label set."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram of observed values."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """Initialize histogram.
+
+        Args:
+            name: Metric name
+            help_text: Description shown in the HELP line
+            labelnames: Names of the labels every sample carries
+            buckets: Sorted upper bounds; +Inf is added automatically
+        """
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values -> [per-bucket counts, sum, count]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observation.
+
+        Args:
+            value: Observed value
+            **labels: Label values
+        """
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of a block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        """Return the number of observations for a label set."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series[2] if series else 0
+
+    def _samples(self) -> List[str]:
+        lines = []
+        bucket_labels = self.labelnames + ("le",)
+        with self._lock:
+            items = sorted((key, [list(s[0]), s[1], s[2]]) for key, s in self._series.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(bucket_labels, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """Metric whose samples are read from a callback at scrape time.
+
+    Used to expose counters and gauges that other components already keep,
+    such as lru_cache statistics or queue depths.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        type_name: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Dict[LabelValues, float]],
+    ):
+        """Initialize callback metric.
+
+        Args:
+            name: Metric name
+            help_text: Description shown in the HELP line
+            type_name: "gauge" or "counter"
+            labelnames: Names of the labels every sample carries
+            callback: Returns a mapping of label values to sample values
+        """
+        super().__init__(name, help_text, labelnames)
+        self.type_name = type_name
+        self.callback = callback
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self.callback().items())
+        ]
+
+
+class Registry:
+    """Collection of metric families rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric family, replacing any with the same name.
+
+        Args:
+            metric: Metric to add
+
+        Returns:
+            The metric, for assignment at module level
+        """
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """Look up a registered metric family by name."""
+        return self._metrics.get(name)
+
+    def expose(self) -> str:
+        """Render every family in Prometheus text format (version 0.0.4).
+
+        Returns:
+            Exposition text ending with a newline
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.expose())
+            except Exception:
+                # A broken callback must not take down the whole scrape
+                continue
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "wallet_card_stage_seconds",
+    "Time spent in each pass generation stage.",
+    ("template", "stage"),
+))
+PASSES_GENERATED = REGISTRY.register(Counter(
+    "wallet_card_passes_generated_total",
+    "Passes generated successfully.",
+    ("template",),
+))
+OUTPUT_BYTES = REGISTRY.register(Counter(
+    "wallet_card_output_bytes_total",
+    "Bytes of .pkpass archives generated.",
+    ("template",),
+))
+GENERATION_ERRORS = REGISTRY.register(Counter(
+    "wallet_card_generation_errors_total",
+    "Failed pass generations by error kind.",
+    ("template", "error"),
+))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "wallet_card_cache_requests_total",
+    "Lookups in on-disk caches by result.",
+    ("cache", "result"),
+))
+
+# Template the current pipeline runs for; stages below read it for labels
+_current_template: ContextVar[str] = ContextVar("wallet_card_template", default="default")
+
+
+@contextmanager
+def template_context(name: str) -> Iterator[None]:
+    """Label stages timed inside the block with a template name."""
+    token = _current_template.set(name)
+    try:
+        yield
+    finally:
+        _current_template.reset(token)
+
+
+def current_template() -> str:
+    """Return the template name of the running pipeline."""
+    return _current_template.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a pipeline stage into wallet_card_stage_seconds.
+
+    When a profiler is active (see profiling.Profiler), the stage is also
+    profiled.
+
+    Args:
+        name: Stage name (e.g. "validate", "manifest")
+    """
+    profiler = profiling.current()
+    with STAGE_SECONDS.time(template=current_template(), stage=name):
+        if profiler is None:
+            yield
+        else:
+            with profiler.stage(name):
+                yield
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a cache lookup.
+
+    Args:
+        cache: Cache name
+        hit: Whether the lookup was served from the cache
+    """
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def register_lru_cache(name: str, func: Callable) -> None:
+    """Expose hit and miss counts of a functools.lru_cache function.
+
+    Args:
+        name: Cache label value
+        func: Function decorated with lru_cache
+    """
+    _lru_caches[name] = func
+
+
+def _collect_lru_caches() -> Dict[LabelValues, float]:
+    """Read hit and miss counts from registered lru_cache functions."""
+    samples: Dict[LabelValues, float] = {}
+    for name, func in list(_lru_caches.items()):
+        info = func.cache_info()
+        samples[(name, "hit")] = info.hits
+        samples[(name, "miss")] = info.misses
+    return samples
+
+
+_lru_caches: Dict[str, Callable] = {}
+REGISTRY.register(CallbackMetric(
+    "wallet_card_memory_cache_requests_total",
+    "Lookups in in-process caches by result.",
+    "counter",
+    ("cache", "result"),
+    _collect_lru_caches,
+))
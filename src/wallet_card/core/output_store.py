@@ -0,0 +1,360 @@
+"""Output directory with a SQLite index, TTL and size-based eviction."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class OutputStore:
+    """Tracks generated files in a SQLite index and evicts old ones.
+
+    Every file written through the store is recorded with its digest, size
+    and creation/last-access times, so listing and eviction never scan the
+    directory. Files idle for longer than ``ttl`` seconds are removed, and
+    once the directory exceeds ``max_bytes`` the least recently used files
+    are evicted until it fits again.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files (
+            filename TEXT PRIMARY KEY,
+            digest TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            created REAL NOT NULL,
+            accessed REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS files_accessed ON files (accessed);
+        CREATE INDEX IF NOT EXISTS files_created ON files (created, filename);
+    """
+
+    # Access times are only rewritten when older than this many seconds
+    TOUCH_INTERVAL = 60.0
+
+    def __init__(
+        self,
+        root: str,
+        index_path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        """Initialize output store.
+
+        Args:
+            root: Directory holding the generated files
+            index_path: Optional SQLite index path (default: <root>/.index.sqlite3)
+            ttl: Optional seconds since last access after which files expire
+            max_bytes: Optional cap on the total size of indexed files
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.index_path = Path(index_path) if index_path else self.root / ".index.sqlite3"
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._janitor: Optional[threading.Thread] = None
+
+        # Files written before the index existed are adopted by the janitor,
+        # so opening a store over a large directory stays instant
+        self.reindex_pending = not self.index_path.exists()
+        self._connect().executescript(self.SCHEMA)
+
+    def put(self, filename: str, data: bytes) -> Path:
+        """Write a file atomically and index it.
+
+        Args:
+            filename: Name of the file inside the store
+            data: File contents
+
+        Returns:
+            Path to the stored file
+        """
+        path = self.root / filename
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        self.record(filename, hashlib.sha1(data).hexdigest(), len(data))
+        return path
+
+    def add(self, path: Path) -> None:
+        """Index a file that was written to the store directory directly.
+
+        Args:
+            path: Path to the file
+        """
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b""):
+                digest.update(chunk)
+        self.record(Path(path).name, digest.hexdigest(), Path(path).stat().st_size)
+
+    def touch(self, filename: str) -> None:
+        """Record an access to a file.
+
+        Args:
+            filename: Name of the accessed file
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE files SET accessed = ? WHERE filename = ? AND accessed < ?",
+                (now, filename, now - self.TOUCH_INTERVAL),
+            )
+
+    def get(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Look up a file's index entry.
+
+        Args:
+            filename: Name of the file
+
+        Returns:
+            Index entry or None if the file is not indexed
+        """
+        row = self._connect().execute(
+            "SELECT filename, digest, size, created, accessed FROM files WHERE filename = ?",
+            (filename,),
+        ).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list(self, limit: int = 100, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List indexed files, newest first.
+
+        Args:
+            limit: Maximum number of entries to return
+            cursor: Opaque cursor from a previous page
+
+        Returns:
+            Tuple of (entries, next cursor or None on the last page)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query = "SELECT filename, digest, size, created, accessed FROM files"
+        params: List[Any] = []
+        if cursor:
+            created, _, filename = cursor.partition(":")
+            try:
+                params += [float(created), filename]
+            except ValueError:
+                raise ValueError(f"Invalid cursor: {cursor!r}") from None
+            query += " WHERE (created, filename) < (?, ?)"
+        query += " ORDER BY created DESC, filename DESC LIMIT ?"
+        params.append(limit + 1)
+
+        rows = self._connect().execute(query, params).fetchall()
+        entries = [self._row_to_dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = entries[-1]
+            next_cursor = f"{last['created']!r}:{last['filename']}"
+        return entries, next_cursor
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number and total size of indexed files.
+
+        Returns:
+            Dictionary with count and bytes
+        """
+        count, total = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM files"
+        ).fetchone()
+        return {"count": count, "bytes": total}
+
+    def remove(self, filename: str) -> None:
+        """Delete a file and its index entry.
+
+        Args:
+            filename: Name of the file
+        """
+        self._remove_many([filename])
+
+    def evict(self, now: Optional[float] = None) -> List[str]:
+        """Evict expired files, then least recently used ones over the size cap.
+
+        Args:
+            now: Optional current time (defaults to time.time())
+
+        Returns:
+            Names of evicted files
+        """
+        now = time.time() if now is None else now
+        conn = self._connect()
+        evicted: List[str] = []
+
+        if self.ttl is not None:
+            expired = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT filename FROM files WHERE accessed < ?", (now - self.ttl,)
+                )
+            ]
+            self._remove_many(expired)
+            evicted += expired
+
+        if self.max_bytes is not None:
+            excess = self.stats()["bytes"] - self.max_bytes
+            if excess > 0:
+                victims = []
+                for filename, size in conn.execute(
+                    "SELECT filename, size FROM files ORDER BY accessed ASC"
+                ):
+                    victims.append(filename)
+                    excess -= size
+                    if excess <= 0:
+                        break
+                self._remove_many(victims)
+                evicted += victims
+
+        return evicted
+
+    def reindex(self) -> int:
+        """Index files present in the directory but missing from the index.
+
+        Files are only stat()ed, not read: adopted entries have an empty
+        digest and their modification time as creation time.
+
+        Returns:
+            Number of files added
+        """
+        known = {row[0] for row in self._connect().execute("SELECT filename FROM files")}
+        added = 0
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or entry.name in known:
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                self.record(entry.name, "", stat.st_size, created=stat.st_mtime)
+                added += 1
+        self.reindex_pending = False
+        return added
+
+    @staticmethod
+    def sweep_directory(directory: str, max_age: float, now: Optional[float] = None) -> int:
+        """Delete files in an unindexed directory older than max_age.
+
+        Used for scratch directories such as the upload folder.
+
+        Args:
+            directory: Directory to sweep
+            max_age: Maximum file age in seconds (by modification time)
+            now: Optional current time
+
+        Returns:
+            Number of deleted files
+        """
+        cutoff = (time.time() if now is None else now) - max_age
+        removed = 0
+        if not os.path.isdir(directory):
+            return removed
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
+
+    def start_janitor(
+        self,
+        interval: float = 300.0,
+        sweep: Iterable[Tuple[str, float]] = (),
+        tasks: Iterable[Callable[[], Any]] = (),
+    ) -> None:
+        """Run eviction periodically on a daemon thread.
+
+        A pending reindex of a newly created index runs first, on the same
+        thread.
+
+        Args:
+            interval: Seconds between eviction passes
+            sweep: Extra (directory, max_age) pairs passed to sweep_directory
+            tasks: Extra callables run after each eviction pass
+        """
+        if self._janitor is not None:
+            return
+        sweep = list(sweep)
+        tasks = list(tasks)
+
+        def run() -> None:
+            if self.reindex_pending:
+                try:
+                    self.reindex()
+                except Exception:
+                    pass
+            while True:
+                time.sleep(interval)
+                try:
+                    self.evict()
+                    for directory, max_age in sweep:
+                        self.sweep_directory(directory, max_age)
+                    for task in tasks:
+                        task()
+                except Exception:
+                    # Never let a failed pass kill the janitor
+                    continue
+
+        self._janitor = threading.Thread(target=run, name="wallet-card-janitor", daemon=True)
+        self._janitor.start()
+
+    def record(self, filename: str, digest: str, size: int, created: Optional[float] = None) -> None:
+        """Insert or replace an index entry for a file already in place.
+
+        Args:
+            filename: Name of the file inside the store
+            digest: Content digest
+            size: File size in bytes
+            created: Optional creation time (defaults to now)
+        """
+        now = time.time()
+        created = now if created is None else created
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO files (filename, digest, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (filename, digest, size, created, now),
+            )
+
+    def _remove_many(self, filenames: List[str]) -> None:
+        """Unlink files and drop their index entries."""
+        for filename in filenames:
+            try:
+                (self.root / filename).unlink()
+            except FileNotFoundError:
+                pass
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM files WHERE filename = ?", [(f,) for f in filenames])
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection to the index."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.index_path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_dict(row: Tuple[Any, ...]) -> Dict[str, Any]:
+        """Convert an index row to a dictionary."""
+        filename, digest, size, created, accessed = row
+        return {
+            "filename": filename,
+            "digest": digest,
+            "size": size,
+            "created": created,
+            "accessed": accessed,
+        }
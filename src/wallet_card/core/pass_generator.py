@@ -1,14 +1,27 @@
 """Core pass generation logic."""
 
 import os
-import json
-import zipfile
-import tempfile
+import uuid
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Tuple
 from .pkpass_generator import PKPassGenerator
-from .asset_manager import AssetManager
+from .pass_store import PassStore
+from .asset_manager import AssetManager, ImageSource
+from .asset_bundle import AssetBundle, load_bundle
+from .fingerprint import fingerprint, source_digest
+from .result_cache import ResultCache
+from .serials import SerialAllocator, get_serial_allocator
 from .validator import Validator, ValidationError
+from . import metrics
+
+# Progress callback: receives a stage name and the fraction of work done
+ProgressCallback = Callable[[str, float], None]
+
+
+def _report(progress: Optional[ProgressCallback], stage: str, fraction: float) -> None:
+    """Invoke the progress callback if one was given."""
+    if progress is not None:
+        progress(stage, fraction)
 
 
 class PassGenerator:
@@ -20,6 +33,11 @@ class PassGenerator:
         output_dir: str = "output",
         cert_file: Optional[str] = None,
         key_file: Optional[str] = None,
+        store: Optional[PassStore] = None,
+        template_name: str = "default",
+        bundle: Optional[AssetBundle] = None,
+        result_cache: Optional[ResultCache] = None,
+        serials: Optional[SerialAllocator] = None,
     ):
         """Initialize pass generator.
 
@@ -28,6 +46,16 @@ class PassGenerator:
             output_dir: Directory for output files
             cert_file: Optional path to certificate file for signing
             key_file: Optional path to key file for signing
+            store: Optional content-addressed store; output files are
+                published as hardlinks to its objects
+            template_name: Template label attached to pipeline metrics
+            bundle: Optional prebuilt asset bundle supplying images that
+                are not given per pass
+            result_cache: Optional cache of generated archives; identical
+                generations are returned from it without rebuilding
+            serials: Optional allocator for passes configured without a
+                serial number (default: the process-wide allocator, with
+                its block counter in the output directory)
         """
         self.assets_dir = Path(assets_dir)
         self.output_dir = Path(output_dir)
@@ -35,17 +63,27 @@ class PassGenerator:
         self.asset_manager = AssetManager(str(self.assets_dir))
         self.cert_file = cert_file
         self.key_file = key_file
+        self.store = store
+        self.template_name = template_name
+        self.bundle = bundle
+        self.result_cache = result_cache
+        self.serials = serials
 
     def generate(
         self,
         config: Dict[str, Any],
         output_filename: Optional[str] = None,
+        uploads: Optional[Dict[str, ImageSource]] = None,
+        progress: Optional[ProgressCallback] = None,
     ) -> Path:
         """Generate a .pkpass file from configuration.
 
         Args:
             config: Configuration dictionary
             output_filename: Optional custom output filename
+            uploads: Optional in-memory images keyed by asset type
+                ("icon", "logo", "photo"), overriding config["assets"]
+            progress: Optional callback receiving (stage, fraction complete)
 
         Returns:
             Path to generated .pkpass file
@@ -53,22 +91,122 @@ class PassGenerator:
         Raises:
             ValidationError: If configuration is invalid
         """
+        data = self.generate_bytes(config, uploads, progress)
+
+        _report(progress, "writing", 0.9)
+        return self.save(data, config, output_filename)
+
+    def save(self, data: bytes, config: Dict[str, Any], output_filename: Optional[str] = None) -> Path:
+        """Write a generated archive to the output directory.
+
+        Default names carry a prefix of the content key, with or without a
+        store, so different passes with the same description never
+        overwrite each other.
+
+        Args:
+            data: Contents of the .pkpass file
+            config: Configuration dictionary the archive was built from
+            output_filename: Optional custom output filename
+
+        Returns:
+            Path to the written .pkpass file
+        """
+        if self.store is not None:
+            key = self.store.put(data)
+            output_path = self.output_dir / (output_filename or self.default_filename(config, key))
+            return self.store.publish(key, output_path)
+
+        filename = output_filename or self.default_filename(config, PassStore.key_for(data))
+        output_path = self.output_dir / filename
+        # Write to a temporary name and rename so readers never see a partial zip
+        tmp_path = output_path.with_name(f".{output_path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, output_path)
+
+        return output_path
+
+    def generate_bytes(
+        self,
+        config: Dict[str, Any],
+        uploads: Optional[Dict[str, ImageSource]] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> bytes:
+        """Generate a .pkpass archive entirely in memory.
+
+        Args:
+            config: Configuration dictionary
+            uploads: Optional in-memory images keyed by asset type
+                ("icon", "logo", "photo"), overriding config["assets"]
+            progress: Optional callback receiving (stage, fraction complete)
+
+        Returns:
+            Contents of the .pkpass file
+
+        Raises:
+            ValidationError: If configuration is invalid
+        """
+        key = None
+        if self.result_cache is not None:
+            # A repeat of an earlier generation skips the whole pipeline. The
+            # key is taken before a missing serial is allocated, so a repeat
+            # is served the archive, serial included, built the first time
+            key = self.generation_key(config, uploads)
+            cached = self.result_cache.get(key) if key is not None else None
+            if cached is not None:
+                return cached
+        config = self.assign_serial(config)
+
+        with metrics.template_context(self.template_name):
+            try:
+                data = self._generate_bytes(config, uploads or {}, progress)
+            except ValidationError:
+                metrics.GENERATION_ERRORS.inc(template=self.template_name, error="validation")
+                raise
+            except Exception:
+                metrics.GENERATION_ERRORS.inc(template=self.template_name, error="internal")
+                raise
+        metrics.PASSES_GENERATED.inc(template=self.template_name)
+        metrics.OUTPUT_BYTES.inc(len(data), template=self.template_name)
+        if key is not None:
+            self.result_cache.put(key, data)
+        return data
+
+    def assign_serial(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Give a configuration a unique serial number if it has none.
+
+        Args:
+            config: Configuration dictionary
+
+        Returns:
+            The configuration itself if it has a serial number, otherwise
+            a copy with a newly allocated one
+        """
+        pass_config = config.get("pass") or {}
+        if pass_config.get("serialNumber"):
+            return config
+        if self.serials is None:
+            self.serials = get_serial_allocator(str(self.output_dir / ".serials.sqlite3"))
+        return {**config, "pass": {**pass_config, "serialNumber": self.serials.allocate()}}
+
+    def _generate_bytes(
+        self,
+        config: Dict[str, Any],
+        uploads: Dict[str, ImageSource],
+        progress: Optional[ProgressCallback],
+    ) -> bytes:
+        """Run the generation pipeline, timing each stage."""
         # Validate configuration
-        Validator.validate_and_raise(config)
+        _report(progress, "validating", 0.0)
+        with metrics.stage("validate"):
+            Validator.validate_and_raise(config)
 
         # Prepare assets
-        assets = config.get("assets", {})
-        icon_path = self.asset_manager.prepare_icon(assets.get("icon"))
-        logo_path = self.asset_manager.prepare_logo(assets.get("logo"))
-        photo_path = self.asset_manager.prepare_photo(assets.get("photo"))
-
-        # Generate QR code if URL provided
-        qr_path = None
-        if "qr_data" in config:
-            qr_path = self.asset_manager.generate_qr_code(config["qr_data"])
+        files, digests = self.prepare_assets(config, uploads, progress)
 
         # Build pass data structure
-        pass_data = self._build_pass_data(config, icon_path, logo_path, photo_path, qr_path)
+        _report(progress, "building pass", 0.6)
+        with metrics.stage("build_pass_data"):
+            pass_data = self._build_pass_data(config)
 
         # Generate pass
         try:
@@ -77,60 +215,218 @@ class PassGenerator:
                 pass_data,
                 cert_file=self.cert_file,
                 key_file=self.key_file,
+                files=files,
+                digests=digests,
             )
-
-            # Generate pass in temporary directory
-            with tempfile.TemporaryDirectory() as tmpdir:
-                pass_path = Path(tmpdir) / "pass"
-                wp.create(pass_path)
-
-                # Determine output filename
-                if not output_filename:
-                    description = config["pass"].get("description", "wallet_card")
-                    # Sanitize filename
-                    safe_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in description)
-                    output_filename = f"{safe_name}.pkpass"
-
-                output_path = self.output_dir / output_filename
-
-                # Create zip file (.pkpass is a zip file)
-                # Important: Exclude macOS metadata files and use proper compression
-                with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                    for root, dirs, files in os.walk(pass_path):
-                        # Exclude __MACOSX and .DS_Store folders/files
-                        dirs[:] = [d for d in dirs if d not in ('__MACOSX', '.DS_Store')]
-                        for file in files:
-                            # Skip macOS metadata files
-                            if file.startswith('.') or file == '__MACOSX':
-                                continue
-                            file_path = Path(root) / file
-                            arcname = file_path.relative_to(pass_path)
-                            # Ensure no leading slashes or macOS metadata
-                            arcname_str = str(arcname).replace('\\', '/')
-                            if not arcname_str.startswith('__MACOSX') and not arcname_str.startswith('.'):
-                                zipf.write(file_path, arcname_str)
-
-            return output_path
+            return wp.to_bytes()
 
         except Exception as e:
             raise RuntimeError(f"Failed to generate pass: {str(e)}") from e
 
-    def _build_pass_data(
+    def prepare_assets(
         self,
         config: Dict[str, Any],
-        icon_path: Path,
-        logo_path: Path,
-        photo_path: Path,
-        qr_path: Optional[Path],
-    ) -> Dict[str, Any]:
-        """Build pass data structure for wallet-passes library.
+        uploads: Dict[str, ImageSource],
+        progress: Optional[ProgressCallback] = None,
+    ) -> Tuple[Dict[str, bytes], Dict[str, str]]:
+        """Prepare the pass images.
+
+        Args:
+            config: Configuration dictionary
+            uploads: In-memory images keyed by asset type, overriding
+                config["assets"]
+            progress: Optional callback receiving (stage, fraction complete)
+
+        Returns:
+            Tuple of (PNG bytes by pass file name, known SHA-1 digests of
+            bundled files)
+        """
+        assets = config.get("assets") or {}
+        bundle = self.bundle_for(config)
+        digests: Dict[str, str] = {}
+        _report(progress, "preparing icon", 0.1)
+        with metrics.stage("prepare_icon"):
+            icon = self._prepare_asset(
+                "icon", uploads.get("icon") or assets.get("icon"), bundle, digests,
+                self.asset_manager.prepare_icon_bytes,
+            )
+        _report(progress, "preparing logo", 0.25)
+        with metrics.stage("prepare_logo"):
+            logo = self._prepare_asset(
+                "logo", uploads.get("logo") or assets.get("logo"), bundle, digests,
+                self.asset_manager.prepare_logo_bytes,
+            )
+        _report(progress, "preparing photo", 0.4)
+        with metrics.stage("prepare_photo"):
+            photo = self._prepare_asset(
+                "photo", uploads.get("photo") or assets.get("photo"), bundle, digests,
+                self.asset_manager.prepare_photo_bytes,
+            )
+        # For generic passes, the photo goes in strip.png
+        return {"icon.png": icon, "logo.png": logo, "strip.png": photo}, digests
+
+    def preview(self, config: Dict[str, Any], uploads: Optional[Dict[str, ImageSource]] = None) -> bytes:
+        """Render a PNG approximation of the front of the pass.
+
+        The configuration is not validated, so partially filled forms can
+        be previewed.
+
+        Args:
+            config: Configuration dictionary
+            uploads: Optional in-memory images keyed by asset type
+
+        Returns:
+            PNG-encoded preview
+        """
+        from .preview import get_preview_renderer
+
+        with metrics.template_context(self.template_name):
+            files, _ = self.prepare_assets(config, uploads or {})
+            with metrics.stage("build_pass_data"):
+                pass_data = self._build_pass_data(config)
+            with metrics.stage("preview"):
+                return get_preview_renderer().render_png(pass_data, files)
+
+    def preview_key(
+        self, config: Dict[str, Any], uploads: Optional[Dict[str, ImageSource]] = None
+    ) -> Optional[str]:
+        """Fingerprint everything a preview depends on.
+
+        Args:
+            config: Configuration dictionary
+            uploads: Optional in-memory images keyed by asset type
+
+        Returns:
+            Cache key, or None if an image stream cannot be fingerprinted
+        """
+        sources = self._source_digests(config, uploads or {})
+        if sources is None:
+            return None
+        bundle = self.bundle_for(config)
+        return fingerprint(
+            "preview",
+            self.template_name,
+            config.get("pass"),
+            config.get("qr_data"),
+            sources,
+            bundle.version if bundle is not None else None,
+        )
+
+    def generation_key(
+        self, config: Dict[str, Any], uploads: Optional[Dict[str, ImageSource]] = None
+    ) -> Optional[str]:
+        """Fingerprint everything a generated archive depends on.
+
+        The key covers the template, the whole configuration, the content
+        of every image, the asset bundle version and the signing
+        certificate and key, so a change to any of them misses the cache.
+
+        Args:
+            config: Configuration dictionary
+            uploads: Optional in-memory images keyed by asset type
+
+        Returns:
+            Cache key, or None if an image stream cannot be fingerprinted
+        """
+        sources = self._source_digests(config, uploads or {})
+        if sources is None:
+            return None
+        bundle = self.bundle_for(config)
+        return fingerprint(
+            "pkpass",
+            self.template_name,
+            config,
+            sources,
+            bundle.version if bundle is not None else None,
+            source_digest(self.cert_file),
+            source_digest(self.key_file),
+        )
+
+    def invalidate(self, config: Dict[str, Any], uploads: Optional[Dict[str, ImageSource]] = None) -> bool:
+        """Drop the cached archive for a configuration, if any.
+
+        Args:
+            config: Configuration dictionary
+            uploads: Optional in-memory images keyed by asset type
+
+        Returns:
+            Whether a cached archive was removed
+        """
+        if self.result_cache is None:
+            return False
+        key = self.generation_key(config, uploads)
+        return key is not None and self.result_cache.invalidate(key)
+
+    def _source_digests(
+        self, config: Dict[str, Any], uploads: Dict[str, ImageSource]
+    ) -> Optional[Dict[str, str]]:
+        """Digest the image source of each asset type (None if one cannot be)."""
+        assets = config.get("assets") or {}
+        sources = {}
+        for asset_type in ("icon", "logo", "photo"):
+            digest = source_digest(uploads.get(asset_type) or assets.get(asset_type))
+            if digest is None:
+                return None
+            sources[asset_type] = digest
+        return sources
+
+    def bundle_for(self, config: Dict[str, Any]) -> Optional[AssetBundle]:
+        """Return the asset bundle for a configuration.
+
+        Args:
+            config: Configuration dictionary; ``assets.bundle`` may name a
+                bundle directory
+
+        Returns:
+            The generator's bundle, the configured one, or None
+
+        Raises:
+            ValueError: If the configured bundle cannot be loaded
+        """
+        if self.bundle is not None:
+            return self.bundle
+        path = (config.get("assets") or {}).get("bundle")
+        return load_bundle(path) if path else None
+
+    def _prepare_asset(
+        self,
+        asset_type: str,
+        source: Optional[ImageSource],
+        bundle: Optional[AssetBundle],
+        digests: Dict[str, str],
+        prepare: Callable[[Optional[ImageSource]], bytes],
+    ) -> bytes:
+        """Take an image from the bundle unless one was given for this pass."""
+        name = bundle.file_for(asset_type) if bundle is not None and not source else None
+        if name is None:
+            return prepare(source)
+        digests[name] = bundle.digests[name]
+        return bundle.files[name]
+
+    @staticmethod
+    def default_filename(config: Dict[str, Any], key: Optional[str] = None) -> str:
+        """Derive an output filename from the pass description.
+
+        Args:
+            config: Configuration dictionary
+            key: Optional content key; its prefix is appended so passes
+                with the same description do not collide
+
+        Returns:
+            Sanitized .pkpass filename
+        """
+        description = config["pass"].get("description", "wallet_card")
+        # Sanitize filename
+        safe_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in description)
+        if key:
+            return f"{safe_name}-{key[:16]}.pkpass"
+        return f"{safe_name}.pkpass"
+
+    def _build_pass_data(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Build pass.json data structure.
 
         Args:
             config: Configuration dictionary
-            icon_path: Path to icon image
-            logo_path: Path to logo image
-            photo_path: Path to photo image
-            qr_path: Optional path to QR code image
 
         Returns:
             Pass data dictionary
@@ -148,7 +444,7 @@ class PassGenerator:
         pass_data = {
             "formatVersion": 1,
             "passTypeIdentifier": pass_config.get("passTypeIdentifier", "pass.com.example.generic"),
-            "serialNumber": pass_config.get("serialNumber", "123456789"),
+            "serialNumber": pass_config.get("serialNumber", ""),
             "teamIdentifier": team_id,
             "organizationName": pass_config.get("organizationName", "My Organization"),
             "description": pass_config.get("description", "Digital Business Card"),
@@ -158,6 +454,11 @@ class PassGenerator:
             "labelColor": pass_config.get("labelColor", "rgb(255,255,255)"),
         }
 
+        # Enable updates through the PassKit web service when configured
+        if pass_config.get("webServiceURL"):
+            pass_data["webServiceURL"] = pass_config["webServiceURL"]
+            pass_data["authenticationToken"] = pass_config["authenticationToken"]
+
         # Note: Images are handled separately in pkpass_generator
         # We don't include image paths in pass.json - they're copied directly
 
@@ -170,18 +471,17 @@ class PassGenerator:
             "backFields": fields.get("backFields", []),
         }
 
-        # Add header fields if photo exists
-        if photo_path.exists():
-            pass_data["generic"]["headerFields"] = [
-                {
-                    "key": "photo",
-                    "label": "",
-                    "value": str(photo_path),
-                }
-            ]
+        # Header field for the photo; the image itself ships as strip.png
+        pass_data["generic"]["headerFields"] = [
+            {
+                "key": "photo",
+                "label": "",
+                "value": "",
+            }
+        ]
 
-        # Add barcode/QR code
-        if qr_path and qr_path.exists():
+        # Add barcode/QR code (rendered by Wallet from the message)
+        if "qr_data" in config:
             qr_data = config.get("qr_data", "")
             pass_data["barcodes"] = [
                 {
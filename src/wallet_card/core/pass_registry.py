@@ -0,0 +1,271 @@
+"""SQLite-backed state for the PassKit web service."""
+
+import hmac
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class PassRegistry:
+    """Tracks updatable passes and the devices registered for them.
+
+    Every pass issued with a ``webServiceURL`` is recorded with its
+    authentication token, the pass store key of its latest version and an
+    update tag (microseconds since the epoch). Devices register per pass;
+    the change feed for a device is answered from the registrations primary
+    key and a lookup per registered pass, so it stays fast regardless of
+    the total number of registrations.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS passes (
+            pass_type_id TEXT NOT NULL,
+            serial TEXT NOT NULL,
+            auth_token TEXT NOT NULL,
+            pass_key TEXT NOT NULL,
+            updated_at INTEGER NOT NULL,
+            PRIMARY KEY (pass_type_id, serial)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS passes_updated ON passes (pass_type_id, updated_at);
+        CREATE TABLE IF NOT EXISTS devices (
+            device_id TEXT PRIMARY KEY,
+            push_token TEXT NOT NULL,
+            updated_at INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS devices_push_token ON devices (push_token);
+        CREATE TABLE IF NOT EXISTS registrations (
+            device_id TEXT NOT NULL,
+            pass_type_id TEXT NOT NULL,
+            serial TEXT NOT NULL,
+            created_at INTEGER NOT NULL,
+            PRIMARY KEY (device_id, pass_type_id, serial)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS registrations_pass ON registrations (pass_type_id, serial);
+    """
+
+    def __init__(self, path: str):
+        """Initialize pass registry.
+
+        Args:
+            path: SQLite database path (created if missing)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._connect().executescript(self.SCHEMA)
+
+    def update_pass(self, pass_type_id: str, serial: str, auth_token: str, pass_key: str) -> int:
+        """Record a new version of a pass.
+
+        Args:
+            pass_type_id: Pass type identifier
+            serial: Serial number
+            auth_token: Authentication token embedded in the pass
+            pass_key: Pass store key of the new archive
+
+        Returns:
+            Update tag of this version
+        """
+        with self._connect() as conn:
+            # Tags only move forward, even if two updates share a clock tick
+            row = conn.execute(
+                "SELECT updated_at FROM passes WHERE pass_type_id = ? AND serial = ?",
+                (pass_type_id, serial),
+            ).fetchone()
+            tag = max(_now(), row[0] + 1) if row else _now()
+            conn.execute(
+                "INSERT OR REPLACE INTO passes (pass_type_id, serial, auth_token, pass_key, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (pass_type_id, serial, auth_token, pass_key, tag),
+            )
+        return tag
+
+    def get_pass(self, pass_type_id: str, serial: str) -> Optional[Dict[str, Any]]:
+        """Look up a pass.
+
+        Args:
+            pass_type_id: Pass type identifier
+            serial: Serial number
+
+        Returns:
+            Pass entry or None if unknown
+        """
+        row = self._connect().execute(
+            "SELECT pass_type_id, serial, auth_token, pass_key, updated_at FROM passes "
+            "WHERE pass_type_id = ? AND serial = ?",
+            (pass_type_id, serial),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("pass_type_id", "serial", "auth_token", "pass_key", "updated_at"), row))
+
+    def authenticate(self, pass_type_id: str, serial: str, token: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Check a request's authentication token against a pass.
+
+        Args:
+            pass_type_id: Pass type identifier
+            serial: Serial number
+            token: Token from the ``Authorization: ApplePass`` header
+
+        Returns:
+            The pass entry if the token matches, otherwise None
+        """
+        entry = self.get_pass(pass_type_id, serial)
+        if entry is None or not token:
+            return None
+        if not hmac.compare_digest(entry["auth_token"].encode(), token.encode()):
+            return None
+        return entry
+
+    def register_device(self, device_id: str, push_token: str, pass_type_id: str, serial: str) -> bool:
+        """Register a device for updates to a pass.
+
+        Args:
+            device_id: Device library identifier
+            push_token: APNs push token of the device
+            pass_type_id: Pass type identifier
+            serial: Serial number
+
+        Returns:
+            True if the registration is new, False if it already existed
+        """
+        now = _now()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO devices (device_id, push_token, updated_at) VALUES (?, ?, ?)",
+                (device_id, push_token, now),
+            )
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO registrations (device_id, pass_type_id, serial, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (device_id, pass_type_id, serial, now),
+            )
+        return cursor.rowcount == 1
+
+    def unregister_device(self, device_id: str, pass_type_id: str, serial: str) -> bool:
+        """Remove a device's registration for a pass.
+
+        Devices left without registrations are forgotten.
+
+        Args:
+            device_id: Device library identifier
+            pass_type_id: Pass type identifier
+            serial: Serial number
+
+        Returns:
+            True if a registration was removed
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM registrations WHERE device_id = ? AND pass_type_id = ? AND serial = ?",
+                (device_id, pass_type_id, serial),
+            )
+            conn.execute(
+                "DELETE FROM devices WHERE device_id = ? AND NOT EXISTS "
+                "(SELECT 1 FROM registrations WHERE device_id = ?)",
+                (device_id, device_id),
+            )
+        return cursor.rowcount == 1
+
+    def updated_serials(
+        self, device_id: str, pass_type_id: str, since: Optional[int] = None
+    ) -> Tuple[List[str], Optional[int]]:
+        """List a device's passes updated after a tag.
+
+        Args:
+            device_id: Device library identifier
+            pass_type_id: Pass type identifier
+            since: Update tag from a previous response (None: all passes)
+
+        Returns:
+            Tuple of (serial numbers, newest update tag or None if empty)
+        """
+        rows = self._connect().execute(
+            "SELECT p.serial, p.updated_at FROM registrations r "
+            "JOIN passes p ON p.pass_type_id = r.pass_type_id AND p.serial = r.serial "
+            "WHERE r.device_id = ? AND r.pass_type_id = ? AND p.updated_at > ? "
+            "ORDER BY p.serial",
+            (device_id, pass_type_id, -1 if since is None else since),
+        ).fetchall()
+        if not rows:
+            return [], None
+        return [serial for serial, _ in rows], max(updated for _, updated in rows)
+
+    def push_tokens(self, pass_type_id: str, serials: Optional[Iterable[str]] = None) -> List[str]:
+        """Look up the push tokens of devices registered for passes.
+
+        Each device is listed once, however many of the passes it holds;
+        one push makes it fetch the change feed for all of them.
+
+        Args:
+            pass_type_id: Pass type identifier
+            serials: Serial numbers (None: every pass of the type)
+
+        Returns:
+            Distinct push tokens
+        """
+        query = (
+            "SELECT DISTINCT d.push_token FROM registrations r "
+            "JOIN devices d ON d.device_id = r.device_id WHERE r.pass_type_id = ?"
+        )
+        conn = self._connect()
+        if serials is None:
+            return [row[0] for row in conn.execute(query, (pass_type_id,))]
+
+        tokens: Dict[str, None] = {}
+        serials = list(serials)
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(serials), 500):
+            chunk = serials[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for (token,) in conn.execute(f"{query} AND r.serial IN ({placeholders})", [pass_type_id, *chunk]):
+                tokens[token] = None
+        return list(tokens)
+
+    def forget_push_tokens(self, tokens: Iterable[str]) -> int:
+        """Remove devices whose push tokens are no longer valid.
+
+        Args:
+            tokens: Push tokens rejected by APNs
+
+        Returns:
+            Number of removed devices
+        """
+        params = [(token,) for token in tokens]
+        with self._connect() as conn:
+            conn.executemany(
+                "DELETE FROM registrations WHERE device_id IN "
+                "(SELECT device_id FROM devices WHERE push_token = ?)",
+                params,
+            )
+            cursor = conn.executemany("DELETE FROM devices WHERE push_token = ?", params)
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of passes, devices and registrations.
+
+        Returns:
+            Dictionary of counts
+        """
+        conn = self._connect()
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("passes", "devices", "registrations")
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection to the database."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+def _now() -> int:
+    """Return the current time in microseconds."""
+    return time.time_ns() // 1000
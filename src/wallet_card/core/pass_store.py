@@ -0,0 +1,221 @@
+"""Content-addressed storage for generated passes."""
+
+import hashlib
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Iterator, Optional
+
+from . import metrics
+
+
+class PassStore:
+    """Content-addressed, lock-free store for .pkpass archives.
+
+    Archives are keyed by the SHA-256 of their bytes and kept under
+    two-level sharded directories (``ab/cd/<key>.pkpass``). Objects are
+    written to a unique temporary file and linked into place, so readers
+    never see partial archives and concurrent writers of the same content
+    (on this or another node sharing the directory) simply converge on one
+    file. Named copies are published as hardlinks to the object, so
+    identical passes share storage.
+
+    Where the filesystem has no hardlinks, objects are copied out instead
+    and a marker file records it; link counts then say nothing about use,
+    so ``prune`` keeps every object.
+    """
+
+    # Created in the root once a hardlink fails on this filesystem
+    NO_HARDLINKS_MARKER = ".no-hardlinks"
+
+    KEY_REGEX = re.compile(r"^[0-9a-f]{64}$")
+
+    def __init__(self, root: str, suffix: str = ".pkpass"):
+        """Initialize pass store.
+
+        Args:
+            root: Root directory of the store
+            suffix: File suffix for stored objects
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.suffix = suffix
+        # Orders dedup hits against prune, which checks age then unlinks
+        self._prune_lock = threading.Lock()
+
+    @staticmethod
+    def key_for(data: bytes) -> str:
+        """Compute the lookup key for an archive.
+
+        Args:
+            data: Archive contents
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        return hashlib.sha256(data).hexdigest()
+
+    def path_for(self, key: str) -> Path:
+        """Return the object path for a key.
+
+        Args:
+            key: Lookup key
+
+        Returns:
+            Sharded object path
+
+        Raises:
+            ValueError: If the key is malformed
+        """
+        if not self.KEY_REGEX.match(key):
+            raise ValueError(f"Invalid pass key: {key}")
+        return self.root / key[:2] / key[2:4] / f"{key}{self.suffix}"
+
+    def put(self, data: bytes) -> str:
+        """Store an archive, deduplicating identical content.
+
+        Args:
+            data: Archive contents
+
+        Returns:
+            Lookup key of the stored object
+        """
+        key = self.key_for(data)
+        path = self.path_for(key)
+        with self._prune_lock:
+            try:
+                # A fresh mtime keeps prune off the object until it is published
+                os.utime(path)
+            except FileNotFoundError:
+                pass
+            else:
+                metrics.record_cache("pass_store", hit=True)
+                return key
+        metrics.record_cache("pass_store", hit=False)
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.parent / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            try:
+                # link() never replaces an existing object, so the first
+                # writer wins and later identical writes are no-ops
+                os.link(tmp_path, path)
+            except FileExistsError:
+                pass
+            except OSError:
+                # Filesystem without hardlinks: rename is still atomic
+                self._mark_no_hardlinks()
+                os.replace(tmp_path, path)
+        finally:
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+        return key
+
+    def get(self, key: str) -> Optional[Path]:
+        """Look up a stored object.
+
+        Args:
+            key: Lookup key
+
+        Returns:
+            Object path or None if not stored (or the key is malformed)
+        """
+        try:
+            path = self.path_for(key)
+        except ValueError:
+            return None
+        return path if path.exists() else None
+
+    def publish(self, key: str, dest: Path) -> Path:
+        """Atomically expose an object under a human-readable name.
+
+        The object is hardlinked (or copied, where hardlinks are not
+        supported) to a temporary name next to ``dest`` and renamed over it.
+
+        Args:
+            key: Lookup key of a stored object
+            dest: Destination path
+
+        Returns:
+            The destination path
+        """
+        src = self.path_for(key)
+        dest = Path(dest)
+        if dest.exists() and os.path.samefile(src, dest):
+            return dest
+
+        tmp_path = dest.parent / f".{dest.name}.{uuid.uuid4().hex}.tmp"
+        try:
+            try:
+                os.link(src, tmp_path)
+            except FileNotFoundError:
+                raise
+            except OSError:
+                self._mark_no_hardlinks()
+                shutil.copyfile(src, tmp_path)
+            os.replace(tmp_path, dest)
+        finally:
+            # rename() is a no-op when both names are already the same inode
+            try:
+                tmp_path.unlink()
+            except FileNotFoundError:
+                pass
+        return dest
+
+    def prune(self, grace: float = 3600.0, now: Optional[float] = None) -> int:
+        """Remove objects no longer published anywhere.
+
+        Objects whose only link is the store entry itself, and stale
+        temporary files, are deleted once older than ``grace`` seconds.
+        Objects are kept when the store had to copy instead of link.
+
+        Args:
+            grace: Minimum age in seconds before removal
+            now: Optional current time
+
+        Returns:
+            Number of removed files
+        """
+        cutoff = (time.time() if now is None else now) - grace
+        links_counted = not (self.root / self.NO_HARDLINKS_MARKER).exists()
+        removed = 0
+        for entry in self._iter_files():
+            temporary = entry.name.endswith(".tmp")
+            if not (temporary or links_counted):
+                continue
+            try:
+                with self._prune_lock:
+                    stat = entry.stat()
+                    unreferenced = temporary or stat.st_nlink == 1
+                    if unreferenced and stat.st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def _mark_no_hardlinks(self) -> None:
+        """Record that objects are copied, not linked, on this filesystem."""
+        (self.root / self.NO_HARDLINKS_MARKER).touch(exist_ok=True)
+
+    def _iter_files(self) -> Iterator[os.DirEntry]:
+        """Iterate over every file in the shard directories."""
+        for first in os.scandir(self.root):
+            if not first.is_dir():
+                continue
+            for second in os.scandir(first.path):
+                if not second.is_dir():
+                    continue
+                for entry in os.scandir(second.path):
+                    if entry.is_file():
+                        yield entry
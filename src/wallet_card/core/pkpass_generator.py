@@ -1,15 +1,15 @@
 """Custom pkpass file generator (replacement for wallet-passes library)."""
 
+import copy
+import io
 import json
 import hashlib
+import os
 import zipfile
-import tempfile
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.serialization import pkcs12
-from cryptography.hazmat.primitives.asymmetric import padding
-from cryptography import x509
+from typing import Any, Dict, Optional, Tuple, Union
+from . import metrics
 
 
 class PKPassGenerator:
@@ -20,6 +20,8 @@ class PKPassGenerator:
         pass_data: Dict[str, Any],
         cert_file: Optional[str] = None,
         key_file: Optional[str] = None,
+        files: Optional[Dict[str, Union[bytes, Path]]] = None,
+        digests: Optional[Dict[str, str]] = None,
     ):
         """Initialize pkpass generator.
 
@@ -27,10 +29,15 @@ class PKPassGenerator:
             pass_data: Pass data dictionary
             cert_file: Optional path to certificate file
             key_file: Optional path to key file
+            files: Optional extra pass files (e.g. "icon.png") as bytes or paths
+            digests: Optional known SHA-1 hex digests of files, e.g. from an
+                asset bundle; they are used in the manifest without rehashing
         """
         self.pass_data = pass_data
         self.cert_file = cert_file
         self.key_file = key_file
+        self.files = files or {}
+        self.digests = digests or {}
 
     def create(self, output_dir: Path) -> None:
         """Create pkpass structure in output directory.
@@ -41,115 +48,115 @@ class PKPassGenerator:
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
+        for name, content in self.build().items():
+            (output_dir / name).write_bytes(content)
+
+    def to_bytes(self) -> bytes:
+        """Build the pass and return the zipped .pkpass archive.
+
+        Returns:
+            Contents of the .pkpass file
+        """
+        files = self.build()
+        buffer = io.BytesIO()
+        # .pkpass is a plain zip; macOS metadata never enters the archive
+        # because files are added from memory rather than walked from disk
+        with metrics.stage("zip"):
+            with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+                for name, content in files.items():
+                    zipf.writestr(name, content)
+        return buffer.getvalue()
+
+    def build(self) -> Dict[str, bytes]:
+        """Build all pass files in memory.
+
+        Returns:
+            Mapping of archive names to file contents, ending with
+            manifest.json and signature
+        """
         # Clean pass_data - remove image paths from JSON (images are separate files)
-        import copy
         clean_pass_data = copy.deepcopy(self.pass_data)
         if "images" in clean_pass_data:
             # Remove image paths from JSON - they're handled as separate files
             del clean_pass_data["images"]
-        
+
         # Clean headerFields - remove file paths
         if "generic" in clean_pass_data and "headerFields" in clean_pass_data["generic"]:
             for field in clean_pass_data["generic"]["headerFields"]:
                 if "value" in field and isinstance(field["value"], str) and ("/" in field["value"] or "\\" in field["value"]):
                     # It's a file path, remove it
                     field["value"] = ""
-        
-        # Write pass.json
-        pass_json_path = output_dir / "pass.json"
-        with open(pass_json_path, "w", encoding="utf-8") as f:
-            json.dump(clean_pass_data, f, indent=2, ensure_ascii=False)
+
+        files: Dict[str, bytes] = {
+            "pass.json": json.dumps(clean_pass_data, indent=2, ensure_ascii=False).encode("utf-8"),
+        }
 
         # Copy images if they exist in pass_data
-        import shutil
         if "images" in self.pass_data:
             for image_type, image_path in self.pass_data["images"].items():
                 if image_path and Path(image_path).exists():
-                    dest_path = output_dir / f"{image_type}.png"
-                    shutil.copy2(image_path, dest_path)
-
-        # Handle headerFields with photo (strip image)
-        if "generic" in self.pass_data:
-            generic = self.pass_data["generic"]
-            if "headerFields" in generic:
-                # Clean headerFields - remove file paths, keep only structure
-                for field in generic["headerFields"]:
-                    if field.get("key") == "photo" and "value" in field:
-                        photo_path = Path(field["value"])
-                        if photo_path.exists():
-                            # For generic passes, photo goes in strip.png
-                            dest_path = output_dir / "strip.png"
-                            shutil.copy2(photo_path, dest_path)
-                        # Remove the file path from the field - just keep the structure
-                        field["value"] = ""  # Empty value, image is in strip.png
-
-        # Create manifest.json
-        manifest = self._create_manifest(output_dir)
-        manifest_path = output_dir / "manifest.json"
-        with open(manifest_path, "w", encoding="utf-8") as f:
-            json.dump(manifest, f, indent=2)
+                    files[f"{image_type}.png"] = Path(image_path).read_bytes()
+
+        # Handle headerFields with photo given as a file path (strip image)
+        generic = self.pass_data.get("generic", {})
+        for field in generic.get("headerFields", []):
+            if field.get("key") == "photo" and field.get("value"):
+                photo_path = Path(field["value"])
+                if photo_path.exists():
+                    # For generic passes, photo goes in strip.png
+                    files["strip.png"] = photo_path.read_bytes()
+
+        for name, content in self.files.items():
+            files[name] = content if isinstance(content, bytes) else Path(content).read_bytes()
+
+        # Create manifest BEFORE creating signature file
+        with metrics.stage("manifest"):
+            manifest = self._create_manifest(files)
+            manifest_content = json.dumps(manifest, indent=2).encode("utf-8")
+        files["manifest.json"] = manifest_content
 
         # Create signature - Apple Wallet requires this file
-        signature_path = output_dir / "signature"
         if self.cert_file and self.key_file:
-            signature = self._create_signature(manifest_path)
-            with open(signature_path, "wb") as f:
-                f.write(signature)
+            with metrics.stage("signature"):
+                files["signature"] = self._create_signature(manifest_content)
         else:
             # For unsigned passes, create a minimal signature placeholder
             # Some iOS versions require at least some content in signature file
             # This is a workaround - not cryptographically valid but may work for personal use
-            with open(signature_path, "wb") as f:
-                # Write a minimal placeholder (some systems check for non-empty file)
-                f.write(b"UNSIGNED")
+            files["signature"] = b"UNSIGNED"
+
+        return files
 
-    def _create_manifest(self, pass_dir: Path) -> Dict[str, str]:
+    def _create_manifest(self, files: Dict[str, bytes]) -> Dict[str, str]:
         """Create manifest.json with SHA1 hashes of all files.
 
         Args:
-            pass_dir: Directory containing pass files
+            files: Mapping of pass file names to contents
 
         Returns:
             Manifest dictionary mapping filenames to SHA1 hashes
         """
-        manifest = {}
-        # Create manifest BEFORE creating signature file
-        for file_path in pass_dir.iterdir():
-            if file_path.is_file() and file_path.name != "manifest.json" and file_path.name != "signature":
-                with open(file_path, "rb") as f:
-                    content = f.read()
-                    sha1_hash = hashlib.sha1(content).hexdigest()
-                    manifest[file_path.name] = sha1_hash
-        return manifest
-
-    def _create_signature(self, manifest_path: Path) -> bytes:
+        return {
+            name: self.digests.get(name) or hashlib.sha1(content).hexdigest()
+            for name, content in files.items()
+            if name not in ("manifest.json", "signature")
+        }
+
+    def _create_signature(self, manifest_content: bytes) -> bytes:
         """Create signature for manifest.json.
 
         Args:
-            manifest_path: Path to manifest.json
+            manifest_content: Contents of manifest.json
 
         Returns:
             Signature bytes
         """
+        # cryptography is slow to import and only needed for signed passes
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding
+
         try:
-            # Read certificate and key
-            with open(self.cert_file, "rb") as f:
-                cert_data = f.read()
-            with open(self.key_file, "rb") as f:
-                key_data = f.read()
-
-            # Try to load as PEM
-            try:
-                cert = x509.load_pem_x509_certificate(cert_data)
-                private_key = serialization.load_pem_private_key(
-                    key_data, password=None
-                )
-            except Exception as e:
-                raise ValueError(f"Failed to load certificate/key: {e}")
-
-            # Read manifest content
-            with open(manifest_path, "rb") as f:
-                manifest_content = f.read()
+            _, private_key = load_signer(self.cert_file, self.key_file)
 
             # Sign manifest using SHA1 with PKCS1v15 padding (required by Apple Wallet)
             # Apple Wallet expects PKCS1v15 padding with SHA1
@@ -164,3 +171,48 @@ class PKPassGenerator:
         except Exception as e:
             raise RuntimeError(f"Failed to create signature: {e}") from e
 
+
+def load_signer(cert_file: str, key_file: str) -> Tuple[Any, Any]:
+    """Load the signing certificate and private key.
+
+    Parsed objects are cached per file path and modification time, so a
+    warm process signs without re-reading or re-parsing the PEM files.
+    Keys are deliberately kept in memory only, never in the warm cache.
+
+    Args:
+        cert_file: Path to the PEM certificate
+        key_file: Path to the PEM private key
+
+    Returns:
+        Tuple of (certificate, private key)
+
+    Raises:
+        ValueError: If the files cannot be parsed
+    """
+    return _load_signer(
+        os.path.abspath(cert_file), os.stat(cert_file).st_mtime_ns,
+        os.path.abspath(key_file), os.stat(key_file).st_mtime_ns,
+    )
+
+
+@lru_cache(maxsize=8)
+def _load_signer(cert_file: str, cert_mtime: int, key_file: str, key_mtime: int) -> Tuple[Any, Any]:
+    """Parse a certificate and key (cached by path and mtime)."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import serialization
+
+    with open(cert_file, "rb") as f:
+        cert_data = f.read()
+    with open(key_file, "rb") as f:
+        key_data = f.read()
+
+    # Try to load as PEM
+    try:
+        cert = x509.load_pem_x509_certificate(cert_data)
+        private_key = serialization.load_pem_private_key(key_data, password=None)
+    except Exception as e:
+        raise ValueError(f"Failed to load certificate/key: {e}")
+    return cert, private_key
+
+
+metrics.register_lru_cache("signer", _load_signer)
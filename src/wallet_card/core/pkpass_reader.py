@@ -0,0 +1,430 @@
+"""Reading and verifying .pkpass archives without extracting them."""
+
+import hashlib
+import io
+import json
+import os
+import struct
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .validator import Validator
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Pass styles; pass.json must contain exactly one of them
+PASS_STYLES = ("boardingPass", "coupon", "eventTicket", "generic", "storeCard")
+
+REQUIRED_KEYS = ("formatVersion", "passTypeIdentifier", "serialNumber", "teamIdentifier", "organizationName", "description")
+
+FIELD_GROUPS = ("headerFields", "primaryFields", "secondaryFields", "auxiliaryFields", "backFields")
+
+# Largest image sizes Wallet displays without scaling, in points (@1x)
+MAX_IMAGE_POINTS = {
+    "logo": (160, 50),
+    "strip": (375, 144),
+    "thumbnail": (90, 90),
+    "background": (180, 220),
+    "footer": (286, 15),
+}
+
+# Smallest usable icon, in points
+MIN_ICON_POINTS = (29, 29)
+
+# DER encoding of the PKCS#7 signedData content type (1.2.840.113549.1.7.2)
+PKCS7_SIGNED_DATA_OID = bytes.fromhex("06092a864886f70d010702")
+
+
+class PKPassReader:
+    """Reads a .pkpass archive in place.
+
+    Entries are read through ``zipfile`` one at a time and hashed in
+    chunks, so verification never extracts the archive or loads it whole.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, source: Union[str, Path, bytes, BinaryIO]):
+        """Open an archive.
+
+        Args:
+            source: Path, archive bytes or a seekable binary stream
+
+        Raises:
+            zipfile.BadZipFile: If the source is not a zip archive
+        """
+        self._file = None
+        if isinstance(source, (str, Path)):
+            self._file = open(source, "rb")
+            stream = self._file
+        elif isinstance(source, bytes):
+            stream = io.BytesIO(source)
+        else:
+            stream = source
+        try:
+            self._zip = zipfile.ZipFile(stream)
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self) -> "PKPassReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the archive."""
+        if getattr(self, "_zip", None) is not None:
+            self._zip.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def names(self) -> List[str]:
+        """Return the names of the files in the archive."""
+        return [info.filename for info in self._zip.infolist() if not info.is_dir()]
+
+    def read(self, name: str) -> bytes:
+        """Read one file.
+
+        Args:
+            name: Archive name
+
+        Returns:
+            File contents
+        """
+        return self._zip.read(name)
+
+    def sha1(self, name: str) -> str:
+        """Hash one file while streaming it.
+
+        Args:
+            name: Archive name
+
+        Returns:
+            Hex SHA-1 digest
+        """
+        digest = hashlib.sha1()
+        with self._zip.open(name) as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def image_size(self, name: str) -> Optional[Tuple[int, int]]:
+        """Read a PNG's dimensions from its header.
+
+        Args:
+            name: Archive name of the image
+
+        Returns:
+            (width, height), or None if the file is not a PNG
+        """
+        with self._zip.open(name) as f:
+            header = f.read(24)
+        if len(header) < 24 or not header.startswith(PNG_SIGNATURE) or header[12:16] != b"IHDR":
+            return None
+        return struct.unpack(">II", header[16:24])
+
+    def pass_json(self) -> Dict[str, Any]:
+        """Parse pass.json."""
+        return json.loads(self.read("pass.json"))
+
+    def manifest(self) -> Dict[str, str]:
+        """Parse manifest.json."""
+        return json.loads(self.read("manifest.json"))
+
+    def verify(self, cert_file: Optional[str] = None) -> Dict[str, Any]:
+        """Check the archive's structure, manifest, signature, images and pass.json.
+
+        Args:
+            cert_file: Optional PEM certificate; raw RSA signatures are
+                then verified against it
+
+        Returns:
+            Report with ``ok``, ``errors``, ``warnings`` and ``signature``
+            (``pkcs7``, ``raw-rsa``, ``unsigned``, ``missing`` or ``unknown``)
+        """
+        errors: List[str] = []
+        warnings: List[str] = []
+        names = self.names()
+
+        for required in ("pass.json", "manifest.json", "signature"):
+            if required not in names:
+                errors.append(f"Missing {required}")
+        if any(name.startswith("__MACOSX/") or name.endswith(".DS_Store") for name in names):
+            warnings.append("Archive contains macOS metadata")
+
+        manifest = self._check_manifest(names, errors)
+        signature = self._check_signature(names, cert_file, errors, warnings)
+        self._check_images(names, errors, warnings)
+        if "pass.json" in names:
+            try:
+                _check_pass_json(self.pass_json(), errors, warnings)
+            except ValueError as e:
+                errors.append(f"pass.json is not valid JSON: {e}")
+
+        return {
+            "ok": not errors,
+            "errors": errors,
+            "warnings": warnings,
+            "signature": signature,
+            "files": len(manifest) if manifest is not None else 0,
+        }
+
+    def _check_manifest(self, names: List[str], errors: List[str]) -> Optional[Dict[str, str]]:
+        """Compare every file's SHA-1 with manifest.json."""
+        if "manifest.json" not in names:
+            return None
+        try:
+            manifest = self.manifest()
+        except ValueError as e:
+            errors.append(f"manifest.json is not valid JSON: {e}")
+            return None
+        if not isinstance(manifest, dict):
+            errors.append("manifest.json must be an object")
+            return None
+
+        present = set(names)
+        for name, expected in manifest.items():
+            if name not in present:
+                errors.append(f"Manifest lists missing file: {name}")
+            elif self.sha1(name) != str(expected).lower():
+                errors.append(f"Hash mismatch: {name}")
+        for name in present - set(manifest) - {"manifest.json", "signature"}:
+            if not name.startswith("__MACOSX/") and not name.endswith(".DS_Store"):
+                errors.append(f"File not in manifest: {name}")
+        return manifest
+
+    def _check_signature(
+        self, names: List[str], cert_file: Optional[str], errors: List[str], warnings: List[str]
+    ) -> str:
+        """Classify the signature and verify it when a certificate is given."""
+        if "signature" not in names:
+            return "missing"
+        signature = self.read("signature")
+        if signature == b"UNSIGNED":
+            warnings.append("Pass is unsigned")
+            return "unsigned"
+        if _is_pkcs7(signature):
+            return "pkcs7"
+        if len(signature) in (128, 256, 384, 512):
+            if cert_file and "manifest.json" in names:
+                if not _verify_raw_signature(signature, self.read("manifest.json"), cert_file):
+                    errors.append("Signature does not match manifest.json")
+            return "raw-rsa"
+        errors.append(f"Unrecognized signature ({len(signature)} bytes)")
+        return "unknown"
+
+    def _check_images(self, names: List[str], errors: List[str], warnings: List[str]) -> None:
+        """Check that images are PNGs of usable sizes."""
+        if not any(name in names for name in ("icon.png", "icon@2x.png", "icon@3x.png")):
+            errors.append("Missing icon.png")
+        for name in names:
+            if not name.endswith(".png") or "/" in name:
+                continue
+            size = self.image_size(name)
+            if size is None:
+                errors.append(f"Not a PNG image: {name}")
+                continue
+            base, _, scale = name[:-4].partition("@")
+            factor = int(scale[:-1]) if scale.endswith("x") and scale[:-1].isdigit() else 1
+            if base == "icon" and (size[0] < MIN_ICON_POINTS[0] * factor or size[1] < MIN_ICON_POINTS[1] * factor):
+                errors.append(f"{name} is {size[0]}x{size[1]}, smaller than the minimum icon size")
+            limit = MAX_IMAGE_POINTS.get(base)
+            if limit and (size[0] > limit[0] * factor or size[1] > limit[1] * factor):
+                warnings.append(f"{name} is {size[0]}x{size[1]}; Wallet will scale it down")
+
+
+def _check_pass_json(data: Any, errors: List[str], warnings: List[str]) -> None:
+    """Check pass.json against the fields Wallet requires."""
+    if not isinstance(data, dict):
+        errors.append("pass.json must be an object")
+        return
+    for key in REQUIRED_KEYS:
+        if key not in data:
+            errors.append(f"pass.json missing {key}")
+        elif key != "formatVersion" and not isinstance(data[key], str):
+            errors.append(f"pass.json {key} must be a string")
+    if "formatVersion" in data and data["formatVersion"] != 1:
+        errors.append("pass.json formatVersion must be 1")
+
+    styles = [style for style in PASS_STYLES if style in data]
+    if len(styles) != 1:
+        errors.append(f"pass.json must contain exactly one pass style ({', '.join(PASS_STYLES)})")
+    else:
+        _check_fields(data[styles[0]], errors)
+
+    for key in ("foregroundColor", "backgroundColor", "labelColor"):
+        if key in data and not Validator.validate_color(data[key]):
+            errors.append(f"pass.json {key} is not an rgb() color")
+
+    if "webServiceURL" in data and len(str(data.get("authenticationToken", ""))) < 16:
+        errors.append("pass.json webServiceURL requires an authenticationToken of 16+ characters")
+
+    barcodes = data.get("barcodes", [])
+    if not isinstance(barcodes, list):
+        errors.append("pass.json barcodes must be a list")
+        barcodes = []
+    for barcode in barcodes:
+        if not isinstance(barcode, dict):
+            errors.append("pass.json barcodes entries must be objects")
+            continue
+        missing = [key for key in ("message", "format", "messageEncoding") if key not in barcode]
+        if missing:
+            errors.append(f"pass.json barcode missing {', '.join(missing)}")
+
+    if "images" in data:
+        warnings.append("pass.json contains an 'images' key; images belong in separate files")
+
+
+def _check_fields(style: Any, errors: List[str]) -> None:
+    """Check field groups for structure and unique keys."""
+    if not isinstance(style, dict):
+        errors.append("pass.json pass style must be an object")
+        return
+    seen = set()
+    for group in FIELD_GROUPS:
+        fields = style.get(group, [])
+        if not isinstance(fields, list):
+            errors.append(f"pass.json {group} must be a list")
+            continue
+        for field in fields:
+            if not isinstance(field, dict) or "key" not in field or "value" not in field:
+                errors.append(f"pass.json {group} entries need key and value")
+                continue
+            if not isinstance(field["key"], str):
+                errors.append(f"pass.json {group} field keys must be strings")
+                continue
+            if field["key"] in seen:
+                errors.append(f"pass.json field key is not unique: {field['key']}")
+            seen.add(field["key"])
+
+
+def _is_pkcs7(signature: bytes) -> bool:
+    """Check for a DER SEQUENCE spanning the whole signature with the signedData type."""
+    if len(signature) < 16 or signature[0] != 0x30:
+        return False
+    length = signature[1]
+    offset = 2
+    if length & 0x80:
+        count = length & 0x7F
+        length = int.from_bytes(signature[2:2 + count], "big")
+        offset += count
+    return offset + length == len(signature) and signature[offset:offset + 11] == PKCS7_SIGNED_DATA_OID
+
+
+def _verify_raw_signature(signature: bytes, manifest: bytes, cert_file: str) -> bool:
+    """Verify a PKCS#1 v1.5 SHA-1 signature of manifest.json."""
+    from cryptography import x509
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import padding
+
+    with open(cert_file, "rb") as f:
+        public_key = x509.load_pem_x509_certificate(f.read()).public_key()
+    try:
+        public_key.verify(signature, manifest, padding.PKCS1v15(), hashes.SHA1())
+    except InvalidSignature:
+        return False
+    return True
+
+
+def verify_file(path: str, cert_file: Optional[str] = None) -> Dict[str, Any]:
+    """Verify one archive, reporting unreadable files instead of raising.
+
+    Args:
+        path: Path to the .pkpass file
+        cert_file: Optional PEM certificate for signature verification
+
+    Returns:
+        Report from PKPassReader.verify plus the path
+    """
+    try:
+        with PKPassReader(path) as reader:
+            report = reader.verify(cert_file)
+    except Exception as e:
+        # Corrupt members surface as zlib, RuntimeError (encrypted) or
+        # NotImplementedError (unknown compression); none may end a bulk run
+        report = {"ok": False, "errors": [f"Unreadable archive: {e}"], "warnings": [], "signature": "missing", "files": 0}
+    report["path"] = path
+    return report
+
+
+def _verify_args(args: Tuple[str, Optional[str]]) -> Dict[str, Any]:
+    """Unpack arguments for process pool workers."""
+    return verify_file(*args)
+
+
+def iter_pkpass_files(paths: Sequence[str]) -> Iterator[str]:
+    """Yield .pkpass files given as files or found under directories.
+
+    Args:
+        paths: Files and directories
+
+    Returns:
+        Iterator over file paths
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for dirpath, _, filenames in os.walk(path):
+                for filename in sorted(filenames):
+                    if filename.endswith(".pkpass"):
+                        yield os.path.join(dirpath, filename)
+        else:
+            yield path
+
+
+def verify_many(
+    paths: Sequence[str],
+    workers: Optional[int] = None,
+    cert_file: Optional[str] = None,
+    include_ok: bool = False,
+) -> Dict[str, Any]:
+    """Verify archives across a process pool.
+
+    Args:
+        paths: Files and directories to verify
+        workers: Worker processes (default: CPU count; 1 runs inline)
+        cert_file: Optional PEM certificate for signature verification
+        include_ok: List passing archives in the report too
+
+    Returns:
+        Report with totals, signature kinds and per-archive results
+    """
+    files = list(iter_pkpass_files(paths))
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if workers == 1 or len(files) < 2:
+        reports = map(verify_file, files, [cert_file] * len(files))
+        results = _summarize(reports, include_ok)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Large chunks keep inter-process overhead low for big archives
+            chunksize = max(1, min(256, len(files) // (workers * 4)))
+            reports = pool.map(_verify_args, [(path, cert_file) for path in files], chunksize=chunksize)
+            results = _summarize(reports, include_ok)
+    elapsed = time.perf_counter() - start
+
+    results.update({
+        "total": len(files),
+        "elapsed_s": round(elapsed, 2),
+        "per_second": round(len(files) / elapsed, 1) if elapsed else 0.0,
+    })
+    return results
+
+
+def _summarize(reports, include_ok: bool) -> Dict[str, Any]:
+    """Count reports and keep the ones worth listing."""
+    summary: Dict[str, Any] = {"ok": 0, "failed": 0, "with_warnings": 0, "signatures": {}, "results": []}
+    for report in reports:
+        summary["ok" if report["ok"] else "failed"] += 1
+        if report["warnings"]:
+            summary["with_warnings"] += 1
+        summary["signatures"][report["signature"]] = summary["signatures"].get(report["signature"], 0) + 1
+        if include_ok or not report["ok"]:
+            summary["results"].append(report)
+    return summary
@@ -0,0 +1,221 @@
+"""PNG previews of the front of a pass, and a cache for them.
+
+Previews approximate Wallet's generic pass layout from the same pass.json
+data and images that go into the archive: logo and logo text, primary
+field with the photo as thumbnail, secondary and auxiliary rows, and the
+QR code. They are meant for checking colours and fields, not as a
+pixel-exact rendering.
+"""
+
+import io
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .result_cache import MemoryCache
+
+# Pillow loads on the first preview, not when the web app starts
+if TYPE_CHECKING:
+    from PIL import Image, ImageDraw
+
+
+class PassPreviewRenderer:
+    """Renders the front of a generic pass, in points times ``scale``."""
+
+    WIDTH = 320
+    PADDING = 12
+    LOGO_BOX = (160, 50)
+    THUMBNAIL_SIZE = 90
+    QR_SIZE = 130
+    CORNER_RADIUS = 10
+
+    # Font sizes in points
+    LOGO_TEXT_SIZE = 16
+    LABEL_SIZE = 10
+    PRIMARY_SIZE = 24
+    VALUE_SIZE = 14
+
+    def __init__(self, scale: int = 2):
+        """Initialize renderer.
+
+        Args:
+            scale: Pixels per point (2 matches a Retina display)
+        """
+        self.scale = scale
+
+    def render(self, pass_data: Dict[str, Any], files: Dict[str, bytes]) -> "Image.Image":
+        """Render the front of a pass.
+
+        Args:
+            pass_data: pass.json contents
+            files: Pass images by file name ("logo.png", "strip.png")
+
+        Returns:
+            RGBA image with rounded corners
+        """
+        from PIL import Image, ImageDraw
+
+        s = self.scale
+        pad = self.PADDING
+        fields = pass_data.get("generic", {})
+        background = _color(pass_data.get("backgroundColor"), (0, 77, 153))
+        foreground = _color(pass_data.get("foregroundColor"), (255, 255, 255))
+        label_color = _color(pass_data.get("labelColor"), foreground)
+        barcodes = pass_data.get("barcodes") or []
+        height = self._height(fields, bool(barcodes))
+
+        card = Image.new("RGBA", (self.WIDTH * s, height * s), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(card)
+        draw.rounded_rectangle(
+            (0, 0, card.width - 1, card.height - 1), radius=self.CORNER_RADIUS * s, fill=background
+        )
+
+        # Header: logo, logo text and header fields
+        x = pad
+        if files.get("logo.png"):
+            logo = _fitted(files["logo.png"], (self.LOGO_BOX[0] * s, self.LOGO_BOX[1] * s))
+            card.paste(logo, (x * s, pad * s))
+            x += logo.width // s + 8
+        header = [field for field in fields.get("headerFields", []) if field.get("label") or field.get("value")]
+        header_width = 80 if header else 0
+        logo_text = pass_data.get("logoText", "")
+        if logo_text:
+            top = pad + (self.LOGO_BOX[1] - self.LOGO_TEXT_SIZE) // 2
+            self._text(draw, (x, top), logo_text, foreground, self.LOGO_TEXT_SIZE, self.WIDTH - pad - header_width - x)
+        if header:
+            self._field(draw, header[0], (self.WIDTH - pad - header_width, pad), header_width,
+                        label_color, foreground, self.VALUE_SIZE)
+
+        # Primary field, with the photo as thumbnail on the right
+        y = pad + self.LOGO_BOX[1] + 12
+        primary_width = self.WIDTH - 2 * pad
+        if files.get("strip.png"):
+            thumb = _fitted(files["strip.png"], (self.THUMBNAIL_SIZE * s, self.THUMBNAIL_SIZE * s))
+            card.paste(thumb, ((self.WIDTH - pad - self.THUMBNAIL_SIZE) * s, y * s))
+            primary_width -= self.THUMBNAIL_SIZE + 8
+        for field in fields.get("primaryFields", [])[:1]:
+            self._field(draw, field, (pad, y + 8), primary_width, label_color, foreground, self.PRIMARY_SIZE)
+        y += self.THUMBNAIL_SIZE + 12
+
+        # Secondary and auxiliary rows share the width evenly
+        for row in ("secondaryFields", "auxiliaryFields"):
+            row_fields = fields.get(row, [])[:4]
+            if not row_fields:
+                continue
+            column = (self.WIDTH - 2 * pad) // len(row_fields)
+            for index, field in enumerate(row_fields):
+                self._field(draw, field, (pad + index * column, y), column - 8,
+                            label_color, foreground, self.VALUE_SIZE)
+            y += self.LABEL_SIZE + self.VALUE_SIZE + 20
+
+        if barcodes:
+            self._barcode(card, barcodes[0].get("message", ""), y + 8)
+        return card
+
+    def render_png(self, pass_data: Dict[str, Any], files: Dict[str, bytes]) -> bytes:
+        """Render the front of a pass and encode it as PNG.
+
+        Accepts the same arguments as render().
+
+        Returns:
+            PNG-encoded preview
+        """
+        buffer = io.BytesIO()
+        self.render(pass_data, files).save(buffer, "PNG")
+        return buffer.getvalue()
+
+    def _height(self, fields: Dict[str, List[Dict[str, Any]]], barcode: bool) -> int:
+        """Compute the card height in points for the rows present."""
+        height = self.PADDING + self.LOGO_BOX[1] + 12 + self.THUMBNAIL_SIZE + 12
+        for row in ("secondaryFields", "auxiliaryFields"):
+            if fields.get(row):
+                height += self.LABEL_SIZE + self.VALUE_SIZE + 20
+        if barcode:
+            height += self.QR_SIZE + 24
+        return height + self.PADDING
+
+    def _field(
+        self,
+        draw: "ImageDraw.ImageDraw",
+        field: Dict[str, Any],
+        position: Tuple[int, int],
+        width: int,
+        label_color: Tuple[int, int, int],
+        value_color: Tuple[int, int, int],
+        value_size: int,
+    ) -> None:
+        """Draw a field's label above its value."""
+        x, y = position
+        self._text(draw, (x, y), str(field.get("label", "")).upper(), label_color, self.LABEL_SIZE, width)
+        self._text(draw, (x, y + self.LABEL_SIZE + 4), str(field.get("value", "")), value_color, value_size, width)
+
+    def _text(
+        self,
+        draw: "ImageDraw.ImageDraw",
+        position: Tuple[int, int],
+        text: str,
+        fill: Tuple[int, int, int],
+        size: int,
+        width: int,
+    ) -> None:
+        """Draw text in points, shortened with an ellipsis to fit ``width``."""
+        from .share_card import load_font
+
+        if not text or width <= 0:
+            return
+        s = self.scale
+        font = load_font(size * s)
+        if draw.textlength(text, font=font) > width * s:
+            while text and draw.textlength(text + "…", font=font) > width * s:
+                text = text[:-1]
+            text += "…"
+        draw.text((position[0] * s, position[1] * s), text, fill=fill, font=font)
+
+    def _barcode(self, card: "Image.Image", message: str, top: int) -> None:
+        """Draw the QR code on a white panel, centred horizontally."""
+        from PIL import ImageDraw
+
+        from .qr import qr_matrix
+        from .share_card import render_qr_image
+
+        s = self.scale
+        panel = self.QR_SIZE + 12
+        left = (self.WIDTH - panel) // 2
+        ImageDraw.Draw(card).rounded_rectangle(
+            (left * s, top * s, (left + panel) * s, (top + panel) * s), radius=6 * s, fill="white"
+        )
+        qr = render_qr_image(qr_matrix(message), self.QR_SIZE * s)
+        card.paste(qr, ((left + 6) * s, (top + 6) * s))
+
+
+def _color(value: Optional[str], default: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    """Parse a pass colour such as "rgb(0,77,153)", falling back to a default."""
+    from PIL import ImageColor
+
+    try:
+        return ImageColor.getrgb(value)[:3] if value else default
+    except ValueError:
+        return default
+
+
+def _fitted(data: bytes, box: Tuple[int, int]) -> "Image.Image":
+    """Decode an image and shrink it to fit a box, keeping its aspect ratio."""
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("RGB")
+        img.thumbnail(box, Image.Resampling.LANCZOS)
+        return img
+
+
+@lru_cache(maxsize=None)
+def get_preview_renderer() -> PassPreviewRenderer:
+    """Return the process-wide preview renderer.
+
+    Returns:
+        Shared PassPreviewRenderer instance
+    """
+    return PassPreviewRenderer()
+
+
+class PreviewCache(MemoryCache):
+    """Thread-safe LRU of rendered previews keyed by fingerprint."""
@@ -0,0 +1,235 @@
+"""CPU and memory profiling of the generation pipeline."""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Profiler collecting the running pipeline's stages, if any
+_active: ContextVar[Optional["Profiler"]] = ContextVar("wallet_card_profiler", default=None)
+
+# cProfile and tracemalloc are process-wide; profile one pipeline at a time
+_session_lock = threading.Lock()
+
+# Allocations made by the profilers themselves are left out of reports
+_IGNORED_FILES = (tracemalloc.__file__, cProfile.__file__, pstats.__file__, __file__)
+
+
+def current() -> Optional["Profiler"]:
+    """Return the profiler attached to the running pipeline, if any."""
+    return _active.get()
+
+
+class StageProfile:
+    """Measurements for one pipeline stage."""
+
+    def __init__(self, name: str, start: float, duration: float):
+        """Initialize stage profile.
+
+        Args:
+            name: Stage name
+            start: Start time in seconds (perf_counter clock)
+            duration: Wall-clock duration in seconds
+        """
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.peak_bytes = 0
+        self.allocated_bytes = 0
+        self.top_allocations: List[str] = []
+        self.stats: Optional[pstats.Stats] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable summary."""
+        return {
+            "stage": self.name,
+            "duration_ms": round(self.duration * 1000, 3),
+            "peak_kb": round(self.peak_bytes / 1024, 1),
+            "allocated_kb": round(self.allocated_bytes / 1024, 1),
+            "top_allocations": self.top_allocations,
+        }
+
+
+class Profiler:
+    """Records cProfile stats and tracemalloc usage per pipeline stage.
+
+    Activate it around a pipeline run; every ``metrics.stage`` block inside
+    then gets its own cProfile stats, peak traced memory and top allocation
+    sites. Only outermost stages are profiled; nested stages are recorded
+    for the trace but share their parent's measurements.
+    """
+
+    def __init__(self, memory: bool = True, top: int = 10):
+        """Initialize profiler.
+
+        Args:
+            memory: Trace allocations with tracemalloc
+            top: Number of allocation sites kept per stage
+        """
+        self.memory = memory
+        self.top = top
+        self.stages: List[StageProfile] = []
+        self._depth = 0
+        self._origin = 0.0
+        self._total: Optional[StageProfile] = None
+
+    @contextmanager
+    def activate(self, name: str = "generate") -> Iterator["Profiler"]:
+        """Profile the pipeline run inside the block.
+
+        Args:
+            name: Name of the enclosing trace event
+        """
+        with _session_lock:
+            started_tracing = self.memory and not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start()
+            token = _active.set(self)
+            self._origin = time.perf_counter()
+            try:
+                yield self
+            finally:
+                self._total = StageProfile(name, self._origin, time.perf_counter() - self._origin)
+                _active.reset(token)
+                if started_tracing:
+                    tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Measure one stage.
+
+        Args:
+            name: Stage name
+        """
+        outermost = self._depth == 0
+        self._depth += 1
+        profile = cProfile.Profile() if outermost else None
+        tracing = outermost and tracemalloc.is_tracing()
+        if tracing:
+            before = self._snapshot()
+            if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+                tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            result = StageProfile(name, start, time.perf_counter() - start)
+            self._depth -= 1
+            if profile is not None:
+                result.stats = pstats.Stats(profile)
+            if tracing:
+                current_bytes, peak = tracemalloc.get_traced_memory()
+                result.peak_bytes = max(0, peak - baseline)
+                result.allocated_bytes = max(0, current_bytes - baseline)
+                diff = self._snapshot().compare_to(before, "lineno")
+                grown = [stat for stat in diff if stat.size_diff > 0]
+                result.top_allocations = [str(stat) for stat in grown[: self.top]]
+            self.stages.append(result)
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        """Take an allocation snapshot without the profilers' own traces."""
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+        )
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Return per-stage summaries in execution order."""
+        return [stage.to_dict() for stage in sorted(self.stages, key=lambda s: s.start)]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Build a Chrome trace-event document.
+
+        Load the result in chrome://tracing or https://ui.perfetto.dev.
+
+        Returns:
+            Trace document with one complete ("X") event per stage
+        """
+        pid = os.getpid()
+        tid = threading.get_ident()
+        stages = list(self.stages)
+        if self._total is not None:
+            stages.insert(0, self._total)
+        events = []
+        for stage in stages:
+            args = {"peak_kb": round(stage.peak_bytes / 1024, 1)} if stage.peak_bytes else {}
+            events.append({
+                "name": stage.name,
+                "cat": "wallet_card",
+                "ph": "X",
+                "ts": round((stage.start - self._origin) * 1e6, 1),
+                "dur": round(stage.duration * 1e6, 1),
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, directory: str, prefix: str = "profile") -> Dict[str, Path]:
+        """Write the trace, per-stage pstats files and a text report.
+
+        Args:
+            directory: Output directory (created if missing)
+            prefix: File name prefix
+
+        Returns:
+            Mapping of artefact kind to path
+        """
+        out = Path(directory)
+        out.mkdir(parents=True, exist_ok=True)
+        written = {}
+
+        trace_path = out / f"{prefix}.trace.json"
+        trace_path.write_text(json.dumps(self.chrome_trace()))
+        written["trace"] = trace_path
+
+        # Merge repeated stages (e.g. several QR renders) into one stats file
+        merged: Dict[str, pstats.Stats] = {}
+        for stage in self.stages:
+            if stage.stats is not None:
+                merged.setdefault(stage.name, pstats.Stats()).add(stage.stats)
+        for name, stats in merged.items():
+            prof_path = out / f"{prefix}.{name}.prof"
+            stats.dump_stats(str(prof_path))
+            written[f"prof:{name}"] = prof_path
+
+        report_path = out / f"{prefix}.txt"
+        report_path.write_text(self.report())
+        written["report"] = report_path
+        return written
+
+    def report(self, limit: int = 15) -> str:
+        """Render a human-readable report of every stage.
+
+        Args:
+            limit: Number of functions listed per stage
+
+        Returns:
+            Report text
+        """
+        buffer = io.StringIO()
+        for stage in sorted(self.stages, key=lambda s: s.start):
+            buffer.write(
+                f"== {stage.name}: {stage.duration * 1000:.2f} ms, "
+                f"peak {stage.peak_bytes / 1024:.1f} KiB ==\n"
+            )
+            for line in stage.top_allocations:
+                buffer.write(f"  {line}\n")
+            if stage.stats is not None:
+                stage.stats.stream = buffer
+                stage.stats.sort_stats("cumulative").print_stats(limit)
+        return buffer.getvalue()
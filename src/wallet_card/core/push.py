@@ -0,0 +1,414 @@
+"""Push notification fan-out for updated passes.
+
+When passes change, every device registered for them gets an empty APNs
+push on the pass type's topic and then asks the web service for the
+change feed. ``PushFanout`` looks up the devices' push tokens and sends
+the pushes in batches from a pool of worker threads, each holding one
+persistent connection from a pluggable ``PushTransport``.
+"""
+
+import http.client
+import json
+import queue
+import ssl
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from .pass_registry import PassRegistry
+
+
+class PushResult:
+    """Outcome of one push."""
+
+    def __init__(self, token: str, status: int, reason: str = ""):
+        """Initialize push result.
+
+        Args:
+            token: Device push token
+            status: HTTP status (0 for connection errors)
+            reason: APNs reason string, if any
+        """
+        self.token = token
+        self.status = status
+        self.reason = reason
+
+    @property
+    def ok(self) -> bool:
+        """Whether APNs accepted the push."""
+        return self.status == 200
+
+    @property
+    def invalid(self) -> bool:
+        """Whether the token will never work again."""
+        return self.status == 410 or (self.status == 400 and self.reason == "BadDeviceToken")
+
+    @property
+    def retryable(self) -> bool:
+        """Whether sending again later may succeed."""
+        return self.status == 0 or self.status == 429 or self.status >= 500
+
+
+class PushConnection(ABC):
+    """A persistent connection that sends pushes."""
+
+    @abstractmethod
+    def send(self, topic: str, token: str) -> PushResult:
+        """Send one push.
+
+        Args:
+            topic: APNs topic (the pass type identifier)
+            token: Device push token
+
+        Returns:
+            Outcome of the push
+        """
+
+    def send_batch(self, topic: str, tokens: Sequence[str]) -> List[PushResult]:
+        """Send a batch of pushes; transports may override this to pipeline.
+
+        Args:
+            topic: APNs topic
+            tokens: Device push tokens
+
+        Returns:
+            Outcome per token, in order
+        """
+        return [self.send(topic, token) for token in tokens]
+
+    def close(self) -> None:
+        """Close the connection."""
+
+
+class PushTransport(ABC):
+    """Creates connections to a push service."""
+
+    @abstractmethod
+    def connect(self) -> PushConnection:
+        """Open a connection.
+
+        Returns:
+            New connection
+        """
+
+
+class HTTPPushTransport(PushTransport):
+    """APNs provider API requests over persistent HTTP/1.1 connections.
+
+    Requests follow the APNs format (``POST /3/device/<token>`` with an
+    ``apns-topic`` header and an empty JSON payload) and authenticate with
+    a TLS client certificate. APNs itself only speaks HTTP/2, which the
+    standard library lacks: use this transport with the local stand-in
+    (``wallet_card.perf.mock_apns``) or an HTTP/2-terminating gateway, or
+    plug in an HTTP/2 transport for direct delivery.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        cert_file: Optional[str] = None,
+        key_file: Optional[str] = None,
+        timeout: float = 10.0,
+    ):
+        """Initialize HTTP push transport.
+
+        Args:
+            url: Base URL, e.g. http://127.0.0.1:2197
+            cert_file: Optional TLS client certificate (PEM)
+            key_file: Optional TLS client key (PEM)
+            timeout: Per-request timeout in seconds
+        """
+        parts = urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or (443 if self.https else 80)
+        self.timeout = timeout
+        self._context = None
+        if self.https:
+            self._context = ssl.create_default_context()
+            if cert_file and key_file:
+                self._context.load_cert_chain(cert_file, key_file)
+
+    def connect(self) -> PushConnection:
+        """Open a connection."""
+        return _HTTPPushConnection(self)
+
+    def _open(self) -> http.client.HTTPConnection:
+        """Create the underlying HTTP connection."""
+        if self.https:
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout, context=self._context)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+
+class _HTTPPushConnection(PushConnection):
+    """Keep-alive connection that reconnects after errors."""
+
+    def __init__(self, transport: HTTPPushTransport):
+        self.transport = transport
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def send(self, topic: str, token: str) -> PushResult:
+        if self._conn is None:
+            self._conn = self.transport._open()
+        try:
+            self._conn.request(
+                "POST",
+                f"/3/device/{token}",
+                body=b"{}",
+                headers={"apns-topic": topic, "Content-Type": "application/json"},
+            )
+            response = self._conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            return PushResult(token, 0, str(e))
+
+        reason = ""
+        if body:
+            try:
+                reason = json.loads(body).get("reason", "")
+            except ValueError:
+                pass
+        if response.getheader("Connection", "").lower() == "close":
+            self.close()
+        return PushResult(token, response.status, reason)
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class RateLimiter:
+    """Token bucket shared by all senders."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """Initialize rate limiter.
+
+        Args:
+            rate: Sustained pushes per second
+            burst: Bucket size (default: one second's worth)
+        """
+        self.rate = rate
+        self.burst = burst or rate
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, count: int = 1) -> None:
+        """Take tokens, sleeping until the bucket allows it.
+
+        Args:
+            count: Number of pushes about to be sent
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Going into debt reserves the tokens; later callers wait longer
+            self._tokens -= count
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+class PushFanout:
+    """Sends update pushes to every device registered for a set of passes."""
+
+    def __init__(
+        self,
+        registry: PassRegistry,
+        transport: PushTransport,
+        connections: int = 4,
+        batch_size: int = 100,
+        rate: Optional[float] = None,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+    ):
+        """Initialize push fan-out.
+
+        Args:
+            registry: Registry holding devices and registrations
+            transport: Push transport
+            connections: Persistent connections (one per worker thread)
+            batch_size: Pushes handed to a worker at a time
+            rate: Optional limit in pushes per second
+            max_retries: Attempts after the first for throttled or failed pushes
+            backoff: Initial retry delay in seconds, doubled per attempt
+        """
+        self.registry = registry
+        self.transport = transport
+        self.connections = connections
+        self.batch_size = batch_size
+        self.limiter = RateLimiter(rate) if rate else None
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def notify(self, pass_type_id: str, serials: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Push to the devices holding updated passes.
+
+        Tokens rejected as unregistered are removed from the registry.
+
+        Args:
+            pass_type_id: Pass type identifier (the APNs topic)
+            serials: Updated serial numbers (None: every pass of the type)
+
+        Returns:
+            Report with counts, duration and throughput
+        """
+        tokens = self.registry.push_tokens(pass_type_id, serials)
+        report = self.send(pass_type_id, tokens)
+        if report["invalid_tokens"]:
+            self.registry.forget_push_tokens(report["invalid_tokens"])
+        return report
+
+    def send(self, topic: str, tokens: Sequence[str]) -> Dict[str, Any]:
+        """Send one push per token.
+
+        Args:
+            topic: APNs topic
+            tokens: Device push tokens
+
+        Returns:
+            Report with counts, invalid tokens, duration and throughput
+        """
+        batches: "queue.Queue[List[str]]" = queue.Queue()
+        for start in range(0, len(tokens), self.batch_size):
+            batches.put(list(tokens[start:start + self.batch_size]))
+
+        totals = {"sent": 0, "failed": 0, "retried": 0}
+        invalid: List[str] = []
+        lock = threading.Lock()
+
+        def worker() -> None:
+            connection = self.transport.connect()
+            try:
+                while True:
+                    try:
+                        batch = batches.get_nowait()
+                    except queue.Empty:
+                        return
+                    sent, failed, retried, rejected = self._send_batch(connection, topic, batch)
+                    with lock:
+                        totals["sent"] += sent
+                        totals["failed"] += failed
+                        totals["retried"] += retried
+                        invalid.extend(rejected)
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=worker, name=f"wallet-card-push-{i}", daemon=True)
+            for i in range(min(self.connections, batches.qsize()))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        return {
+            "topic": topic,
+            "tokens": len(tokens),
+            "sent": totals["sent"],
+            "failed": totals["failed"],
+            "retried": totals["retried"],
+            "invalid": len(invalid),
+            "invalid_tokens": invalid,
+            "elapsed_s": round(elapsed, 3),
+            "per_minute": round(totals["sent"] / elapsed * 60) if elapsed else 0,
+        }
+
+    def _send_batch(self, connection: PushConnection, topic: str, batch: List[str]):
+        """Send a batch, retrying throttled and failed pushes with backoff.
+
+        Returns:
+            Tuple of (sent, failed, retried, invalid tokens)
+        """
+        sent = retried = 0
+        invalid: List[str] = []
+        pending = batch
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                retried += len(pending)
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            if self.limiter is not None:
+                self.limiter.acquire(len(pending))
+            retry = []
+            for result in connection.send_batch(topic, pending):
+                if result.ok:
+                    sent += 1
+                elif result.invalid:
+                    invalid.append(result.token)
+                elif result.retryable:
+                    retry.append(result.token)
+            pending = retry
+            if not pending:
+                break
+        failed = len(batch) - sent - len(invalid)
+        return sent, failed, retried, invalid
+
+
+class PushDispatcher:
+    """Coalesces update notifications and fans them out in the background.
+
+    Regenerating many passes in a burst (e.g. after an org-wide change)
+    submits one serial at a time; the dispatcher collects them for
+    ``delay`` seconds and sends one fan-out per pass type.
+    """
+
+    def __init__(self, fanout: PushFanout, delay: float = 1.0):
+        """Initialize push dispatcher.
+
+        Args:
+            fanout: Fan-out engine
+            delay: Seconds to collect updates before sending
+        """
+        self.fanout = fanout
+        self.delay = delay
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._pending: Dict[str, set] = {}
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, pass_type_id: str, serials: Iterable[str]) -> None:
+        """Queue updated passes for a push.
+
+        Args:
+            pass_type_id: Pass type identifier
+            serials: Updated serial numbers
+        """
+        with self._cond:
+            self._pending.setdefault(pass_type_id, set()).update(serials)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="wallet-card-push", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Send everything queued now, in the calling thread.
+
+        Returns:
+            Fan-out reports, one per pass type
+        """
+        with self._cond:
+            pending, self._pending = self._pending, {}
+        reports = [self.fanout.notify(pass_type_id, sorted(serials)) for pass_type_id, serials in pending.items()]
+        if reports:
+            self.last_report = reports[-1]
+        return reports
+
+    def _run(self) -> None:
+        """Background loop: wait for updates, let them accumulate, send."""
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+            time.sleep(self.delay)
+            try:
+                self.flush()
+            except Exception:
+                # A failed fan-out must not stop later ones
+                continue
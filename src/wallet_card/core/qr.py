@@ -0,0 +1,110 @@
+"""QR encoding and vector (SVG) rendering."""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from . import metrics
+
+# QR module matrix: rows of dark (True) and light (False) modules
+Matrix = Tuple[Tuple[bool, ...], ...]
+
+
+@lru_cache(maxsize=256)
+def qr_matrix(data: str, error_correction: str = "M", border: int = 4) -> Matrix:
+    """Encode data as a QR module matrix, caching repeat payloads.
+
+    Args:
+        data: Data to encode
+        error_correction: Error correction level ("L", "M", "Q" or "H")
+        border: Quiet zone width in modules
+
+    Returns:
+        Square matrix of dark (True) and light (False) modules, border included
+    """
+    import qrcode
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{error_correction}"),
+        border=border,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+
+metrics.register_lru_cache("qr_matrix", qr_matrix)
+
+
+def svg_path(matrix: Sequence[Sequence[bool]]) -> str:
+    """Convert a QR matrix into SVG path data of merged rectangles.
+
+    Dark modules are merged into horizontal runs, and identical runs on
+    consecutive rows into taller rectangles, so a code needs a few hundred
+    path commands rather than one square per module.
+
+    Args:
+        matrix: QR module matrix
+
+    Returns:
+        Path data for the ``d`` attribute, one unit per module
+    """
+    # Open rectangles: (start column, width) -> (start row, height)
+    open_rects: Dict[Tuple[int, int], Tuple[int, int]] = {}
+    rects: List[Tuple[int, int, int, int]] = []
+    for row_index, row in enumerate(list(matrix) + [()]):
+        runs = set()
+        start = None
+        for col, dark in enumerate(list(row) + [False]):
+            if dark and start is None:
+                start = col
+            elif not dark and start is not None:
+                runs.add((start, col - start))
+                start = None
+        for run in list(open_rects):
+            if run not in runs:
+                top, height = open_rects.pop(run)
+                rects.append((run[0], top, run[1], height))
+        for run in runs:
+            if run in open_rects:
+                top, height = open_rects[run]
+                open_rects[run] = (top, height + 1)
+            else:
+                open_rects[run] = (row_index, 1)
+
+    rects.sort(key=lambda rect: (rect[1], rect[0]))
+    return "".join(
+        f"M{col} {top}h{width}v{height}h-{width}z"
+        for col, top, width, height in rects
+    )
+
+
+def render_qr_svg(
+    matrix: Sequence[Sequence[bool]],
+    size: Optional[int] = None,
+    dark: str = "#000",
+    light: str = "#fff",
+) -> str:
+    """Render a QR matrix as a standalone SVG document.
+
+    The drawing uses one unit per module and scales losslessly; ``size``
+    only sets the default display size.
+
+    Args:
+        matrix: QR module matrix
+        size: Optional width and height in pixels
+        dark: Module colour
+        light: Background colour
+
+    Returns:
+        SVG markup
+    """
+    modules = len(matrix)
+    dimensions = f' width="{size}" height="{size}"' if size else ""
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {modules} {modules}"{dimensions} '
+        f'shape-rendering="crispEdges">'
+        f'<rect width="{modules}" height="{modules}" fill="{light}"/>'
+        f'<path fill="{dark}" d="{svg_path(matrix)}"/>'
+        "</svg>"
+    )
@@ -0,0 +1,239 @@
+"""Memoised generation results keyed by fingerprint.
+
+Generating the same pass twice (a re-clicked Generate button, a re-run
+batch) produces the same archive. ``ResultCache`` keeps recent archives in
+memory and, optionally, on disk, keyed by a fingerprint of everything the
+archive depends on, so a repeat is a lookup instead of validation, image
+processing, hashing and signing.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from . import metrics
+from .warm_cache import WarmCache
+
+
+class MemoryCache:
+    """Thread-safe, size-capped LRU of bytes keyed by fingerprint."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024):
+        """Initialize cache.
+
+        Args:
+            max_entries: Maximum entries kept
+            max_bytes: Maximum total size of kept entries
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Look up an entry, marking it as recently used.
+
+        Args:
+            key: Fingerprint
+
+        Returns:
+            Cached bytes, or None
+        """
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an entry, evicting the least recently used ones.
+
+        Args:
+            key: Fingerprint
+            data: Bytes to keep
+        """
+        if self.max_entries <= 0 or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def delete(self, key: str) -> bool:
+        """Remove an entry.
+
+        Args:
+            key: Fingerprint
+
+        Returns:
+            Whether an entry was removed
+        """
+        with self._lock:
+            data = self._entries.pop(key, None)
+            if data is None:
+                return False
+            self._bytes -= len(data)
+            return True
+
+    def get_or_render(self, key: Optional[str], render: Callable[[], bytes]) -> Tuple[bytes, bool]:
+        """Return a cached entry or render and store it.
+
+        Concurrent misses for the same key may both render; the result is
+        the same, so the second store is harmless.
+
+        Args:
+            key: Fingerprint, or None to render without caching
+            render: Produces the bytes on a miss
+
+        Returns:
+            Tuple of (bytes, whether it was a cache hit)
+        """
+        if key is None:
+            return render(), False
+        data = self.get(key)
+        if data is not None:
+            return data, True
+        data = render()
+        self.put(key, data)
+        return data, False
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Report cache size and hit counts.
+
+        Returns:
+            Dictionary with entries, bytes, hits and misses
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self._hits, "misses": self._misses}
+
+
+class ResultCache:
+    """Two-level cache of generated .pkpass archives.
+
+    Lookups go to a memory LRU first, then to an optional on-disk cache
+    (a size-capped, versioned WarmCache, so archives built by older code
+    are never served); disk hits are promoted to memory.
+    """
+
+    NAMESPACE = "pkpass"
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_entries: int = 64,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ):
+        """Initialize result cache.
+
+        Args:
+            root: Optional directory for the on-disk level
+            max_entries: Maximum archives kept in memory
+            max_memory_bytes: Size cap for archives kept in memory
+            max_disk_bytes: Size cap for the on-disk level
+        """
+        self.memory = MemoryCache(max_entries, max_memory_bytes)
+        self.disk = WarmCache(root, max_bytes=max_disk_bytes, name="result_disk") if root else None
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Look up an archive.
+
+        Args:
+            key: Generation fingerprint
+
+        Returns:
+            Archive bytes, or None if not cached
+        """
+        data = self.memory.get(key)
+        level = "memory"
+        if data is None and self.disk is not None:
+            data = self.disk.get(self.NAMESPACE, (key,))
+            level = "disk"
+            if data is not None:
+                self.memory.put(key, data)
+        with self._lock:
+            if data is None:
+                self._misses += 1
+            elif level == "memory":
+                self._memory_hits += 1
+            else:
+                self._disk_hits += 1
+        metrics.record_cache("result", hit=data is not None)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an archive in both levels.
+
+        Args:
+            key: Generation fingerprint
+            data: Archive bytes
+        """
+        self.memory.put(key, data)
+        if self.disk is not None:
+            self.disk.put(self.NAMESPACE, (key,), data)
+
+    def invalidate(self, key: str) -> bool:
+        """Forget one archive.
+
+        Args:
+            key: Generation fingerprint
+
+        Returns:
+            Whether an archive was removed from either level
+        """
+        removed = self.memory.delete(key)
+        if self.disk is not None:
+            removed = self.disk.delete(self.NAMESPACE, (key,)) or removed
+        return removed
+
+    def clear(self) -> None:
+        """Forget every archive, e.g. after a template or certificate change."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear(self.NAMESPACE)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report hit counts and sizes.
+
+        Returns:
+            Dictionary with memory and disk hits, misses, hit rate and the
+            entries and bytes held in memory (and on disk, when enabled)
+        """
+        memory = self.memory.stats()
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            stats = {
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": memory["entries"],
+                "memory_bytes": memory["bytes"],
+            }
+        if self.disk is not None:
+            disk = self.disk.stats()
+            stats["disk_entries"] = disk["entries"]
+            stats["disk_bytes"] = disk["bytes"]
+        return stats
@@ -0,0 +1,255 @@
+"""Unique serial numbers for passes.
+
+Wallet identifies a pass by its pass type and serial number, so updates
+and device registrations need every issued pass to have its own serial.
+Two strategies are available:
+
+- ``random``: sortable random IDs (ULID layout: a millisecond timestamp
+  followed by 80 random bits, in Crockford base32). Needs no shared state,
+  so any number of processes and nodes allocate independently.
+- ``block``: a counter persisted in SQLite. Each allocator leases a block
+  of consecutive numbers in one short transaction and hands them out from
+  memory, so the database is touched once per block rather than per pass.
+  Numbers left in a block when a process exits are skipped, never reused.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Crockford base32: no I, L, O or U, so IDs are unambiguous when read aloud
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+STRATEGIES = ("random", "block")
+
+
+class SerialAllocator(ABC):
+    """Hands out serial numbers that are unique for the allocator's scope."""
+
+    @abstractmethod
+    def allocate(self) -> str:
+        """Allocate one serial number.
+
+        Returns:
+            New serial number
+        """
+
+    def allocate_many(self, count: int) -> List[str]:
+        """Allocate several serial numbers at once.
+
+        Args:
+            count: Number of serials
+
+        Returns:
+            New serial numbers, in allocation order
+        """
+        return [self.allocate() for _ in range(count)]
+
+
+class RandomSerialAllocator(SerialAllocator):
+    """Sortable random IDs, e.g. "01JAB3K9Q7Z8X2M4N6P0R5T1VW"."""
+
+    def __init__(self, prefix: str = ""):
+        """Initialize random allocator.
+
+        Args:
+            prefix: Text put in front of every serial
+        """
+        self.prefix = prefix
+
+    def allocate(self) -> str:
+        """Allocate one serial number.
+
+        IDs sort by creation time to the millisecond; the random part makes
+        collisions between allocators negligible without coordination.
+
+        Returns:
+            New serial number
+        """
+        value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+        chars = []
+        for _ in range(26):
+            value, digit = divmod(value, 32)
+            chars.append(_ALPHABET[digit])
+        return self.prefix + "".join(reversed(chars))
+
+
+class BlockSerialAllocator(SerialAllocator):
+    """Counter in SQLite, allocated in leased blocks.
+
+    Allocators sharing a database (threads, worker processes, or nodes on
+    a shared volume) never hand out the same number: each lease advances
+    the stored counter by ``block_size`` under an immediate transaction.
+    A forked child takes a fresh block instead of reusing its parent's.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS serial_blocks (
+            sequence TEXT PRIMARY KEY,
+            next_value INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sequence: str = "default",
+        block_size: int = 1000,
+        prefix: str = "",
+        width: int = 10,
+    ):
+        """Initialize block allocator.
+
+        Args:
+            path: SQLite database path (created if missing)
+            sequence: Name of the counter; sequences are independent
+            block_size: Numbers leased per database transaction
+            prefix: Text put in front of every serial
+            width: Minimum number of digits (zero padded, so serials of
+                equal width sort numerically)
+
+        Raises:
+            ValueError: If block_size is not positive
+        """
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.sequence = sequence
+        self.block_size = block_size
+        self.prefix = prefix
+        self.width = width
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0
+        self._pid = None
+        self._leases = 0
+        conn = self._connect()
+        try:
+            conn.executescript(self.SCHEMA)
+        finally:
+            conn.close()
+
+    def allocate(self) -> str:
+        """Allocate one serial number.
+
+        Returns:
+            New serial number
+        """
+        return self._format(self._take(1)[0])
+
+    def allocate_many(self, count: int) -> List[str]:
+        """Allocate several serial numbers at once.
+
+        Args:
+            count: Number of serials
+
+        Returns:
+            New serial numbers, in allocation order
+        """
+        serials = []
+        while len(serials) < count:
+            start, end = self._take(count - len(serials))
+            serials.extend(self._format(value) for value in range(start, end))
+        return serials
+
+    def stats(self) -> Dict[str, int]:
+        """Report lease activity.
+
+        Returns:
+            Dictionary with leases taken and numbers left in the current block
+        """
+        with self._lock:
+            remaining = self._end - self._next if self._pid == os.getpid() else 0
+            return {"leases": self._leases, "remaining": remaining}
+
+    def _take(self, count: int) -> Tuple[int, int]:
+        """Take up to ``count`` numbers from the current block, leasing one if needed."""
+        with self._lock:
+            if self._pid != os.getpid() or self._next >= self._end:
+                self._next, self._end = self._lease()
+                self._pid = os.getpid()
+                self._leases += 1
+            start = self._next
+            self._next = min(self._end, start + count)
+            return start, self._next
+
+    def _lease(self) -> Tuple[int, int]:
+        """Reserve the next block of numbers in the database."""
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front, so concurrent leases
+            # queue on the busy timeout instead of failing to upgrade
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT next_value FROM serial_blocks WHERE sequence = ?", (self.sequence,)
+            ).fetchone()
+            start = row[0] if row else 1
+            conn.execute(
+                "INSERT OR REPLACE INTO serial_blocks (sequence, next_value) VALUES (?, ?)",
+                (self.sequence, start + self.block_size),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return start, start + self.block_size
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection that manages transactions explicitly."""
+        return sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+
+    def _format(self, value: int) -> str:
+        """Render a counter value as a serial number."""
+        return f"{self.prefix}{value:0{self.width}d}"
+
+
+def create_serial_allocator(
+    strategy: str = "random", path: str = "serials.sqlite3", block_size: int = 1000, prefix: str = ""
+) -> SerialAllocator:
+    """Create an allocator for a strategy name.
+
+    Args:
+        strategy: "random" or "block"
+        path: SQLite database for the block strategy
+        block_size: Numbers leased at a time by the block strategy
+        prefix: Text put in front of every serial
+
+    Returns:
+        Serial allocator
+
+    Raises:
+        ValueError: If the strategy is unknown
+    """
+    if strategy == "random":
+        return RandomSerialAllocator(prefix=prefix)
+    if strategy == "block":
+        return BlockSerialAllocator(path, block_size=block_size, prefix=prefix)
+    raise ValueError(f"Unknown serial strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+
+
+@lru_cache(maxsize=None)
+def get_serial_allocator(default_db: str = "serials.sqlite3") -> SerialAllocator:
+    """Return the process-wide allocator, configured from the environment.
+
+    WALLET_CARD_SERIALS selects the strategy ("random" by default, or
+    "block"); WALLET_CARD_SERIAL_DB overrides the block counter database,
+    WALLET_CARD_SERIAL_BLOCK its block size, and WALLET_CARD_SERIAL_PREFIX
+    is put in front of every serial.
+
+    Args:
+        default_db: Block counter database when WALLET_CARD_SERIAL_DB is unset
+
+    Returns:
+        Shared allocator for that database
+    """
+    return create_serial_allocator(
+        os.environ.get("WALLET_CARD_SERIALS", "random").lower(),
+        path=os.environ.get("WALLET_CARD_SERIAL_DB") or default_db,
+        block_size=int(os.environ.get("WALLET_CARD_SERIAL_BLOCK", 1000)),
+        prefix=os.environ.get("WALLET_CARD_SERIAL_PREFIX", ""),
+    )
@@ -0,0 +1,238 @@
+"""QR share-card rendering with cached fonts and backgrounds."""
+
+import io
+from functools import lru_cache
+from typing import Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from PIL import Image, ImageDraw, ImageFont
+
+from . import warm_cache
+from .qr import qr_matrix, svg_path
+
+# Candidate TrueType fonts, tried in order; Pillow's bundled font is the fallback
+FONT_CANDIDATES = (
+    "/System/Library/Fonts/Helvetica.ttc",  # macOS
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",  # Debian/Ubuntu
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",  # Fedora/Alpine
+    "C:\\Windows\\Fonts\\arial.ttf",  # Windows
+)
+
+# A dynamic text line: (text, fill colour)
+TextLine = Tuple[str, str]
+
+
+@lru_cache(maxsize=None)
+def load_font(size: int) -> ImageFont.ImageFont:
+    """Load a font at the given size, once per process.
+
+    Args:
+        size: Font size in pixels
+
+    Returns:
+        The first available TrueType candidate, Pillow's bundled scalable
+        font, or the legacy bitmap default as a last resort
+    """
+    for candidate in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    try:
+        # Pillow >= 10.1 ships a scalable default font
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def render_qr_image(matrix: Sequence[Sequence[bool]], size: int) -> Image.Image:
+    """Render a QR matrix as a crisp square image.
+
+    Modules are drawn at one pixel each and scaled up by an integer factor,
+    so no resampling blur is introduced; the result is centred on a white
+    ``size`` x ``size`` canvas.
+
+    Args:
+        matrix: QR module matrix
+        size: Output edge length in pixels
+
+    Returns:
+        Grayscale QR image
+    """
+    modules = len(matrix)
+    pixels = bytes(0 if dark else 255 for row in matrix for dark in row)
+    small = Image.frombytes("L", (modules, modules), pixels)
+
+    scale = max(1, size // modules)
+    scaled = small.resize((modules * scale, modules * scale), Image.Resampling.NEAREST)
+    if scaled.size == (size, size):
+        return scaled
+
+    canvas = Image.new("L", (size, size), 255)
+    offset = (size - scaled.size[0]) // 2
+    canvas.paste(scaled, (offset, offset))
+    return canvas
+
+
+class ShareCardRenderer:
+    """Renders 800x500 share cards: a QR code on the left, text on the right.
+
+    Each layout's static parts (canvas, footer instructions) are drawn once
+    and cached; rendering a card only draws the per-person text and pastes
+    the QR code.
+    """
+
+    WIDTH = 800
+    HEIGHT = 500
+    QR_POSITION = (50, 100)
+    QR_SIZE = 300
+    TEXT_X = 400
+
+    # Static footer lines per layout: (text, fill, font size, y position)
+    LAYOUTS = {
+        "wallet": {
+            "error_correction": "M",
+            "footer": (
+                ("📱 Scan to add to Wallet", "green", 18, 390),
+                ("Open in Safari on iPhone", "gray", 14, 420),
+            ),
+        },
+        "vcard": {
+            "error_correction": "L",
+            "footer": (),
+        },
+    }
+
+    def render(
+        self,
+        qr_data: str,
+        name: str,
+        title: str = "",
+        lines: Sequence[TextLine] = (),
+        layout: str = "wallet",
+    ) -> Image.Image:
+        """Render a share card.
+
+        Args:
+            qr_data: Data encoded in the QR code
+            name: Name shown as the card heading
+            title: Optional title shown under the name
+            lines: Further (text, fill) lines, e.g. contact details
+            layout: Layout name from LAYOUTS
+
+        Returns:
+            Rendered card image
+        """
+        spec = self.LAYOUTS[layout]
+        card = self._background(layout).copy()
+        draw = ImageDraw.Draw(card)
+
+        matrix = qr_matrix(qr_data, spec["error_correction"])
+        card.paste(render_qr_image(matrix, self.QR_SIZE), self.QR_POSITION)
+
+        # Add text (right side)
+        y_pos = 100
+        draw.text((self.TEXT_X, y_pos), name, fill="black", font=load_font(36))
+        y_pos += 50
+        if title:
+            draw.text((self.TEXT_X, y_pos), title, fill="gray", font=load_font(24))
+            y_pos += 60
+        small = load_font(18)
+        for text, fill in lines:
+            draw.text((self.TEXT_X, y_pos), text, fill=fill, font=small)
+            y_pos += 40
+
+        return card
+
+    def render_png(
+        self,
+        qr_data: str,
+        name: str,
+        title: str = "",
+        lines: Sequence[TextLine] = (),
+        layout: str = "wallet",
+    ) -> bytes:
+        """Render a share card and encode it as PNG.
+
+        Accepts the same arguments as render(). Cards are kept in the warm
+        cache when it is enabled.
+
+        Returns:
+            PNG-encoded card
+        """
+        lines = tuple(tuple(line) for line in lines)
+
+        def encode() -> bytes:
+            buffer = io.BytesIO()
+            self.render(qr_data, name, title, lines, layout).save(buffer, "PNG")
+            return buffer.getvalue()
+
+        return warm_cache.cached("share_card", (qr_data, name, title, lines, layout), encode)
+
+    def render_svg(
+        self,
+        qr_data: str,
+        name: str,
+        title: str = "",
+        lines: Sequence[TextLine] = (),
+        layout: str = "wallet",
+    ) -> str:
+        """Render a share card as SVG, without rasterizing anything.
+
+        Accepts the same arguments as render() and produces the same
+        layout; the QR code is a single path of merged rectangles and text
+        is left to the viewer's fonts.
+
+        Returns:
+            SVG markup
+        """
+        spec = self.LAYOUTS[layout]
+        matrix = qr_matrix(qr_data, spec["error_correction"])
+        modules = len(matrix)
+        x, y = self.QR_POSITION
+
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.WIDTH}" height="{self.HEIGHT}" '
+            f'viewBox="0 0 {self.WIDTH} {self.HEIGHT}" font-family="Helvetica, Arial, \'DejaVu Sans\', sans-serif">',
+            f'<rect width="{self.WIDTH}" height="{self.HEIGHT}" fill="white"/>',
+            f'<svg x="{x}" y="{y}" width="{self.QR_SIZE}" height="{self.QR_SIZE}" '
+            f'viewBox="0 0 {modules} {modules}" shape-rendering="crispEdges">'
+            f'<path d="{svg_path(matrix)}"/></svg>',
+        ]
+
+        # Same positions as render(); SVG text is placed by its baseline
+        texts = [(name, "black", 36, 100)]
+        y_pos = 150
+        if title:
+            texts.append((title, "gray", 24, y_pos))
+            y_pos += 60
+        for text, fill in lines:
+            texts.append((text, fill, 18, y_pos))
+            y_pos += 40
+        texts.extend((text, fill, size, top) for text, fill, size, top in spec["footer"])
+        for text, fill, size, top in texts:
+            parts.append(
+                f'<text x="{self.TEXT_X}" y="{top + round(size * 0.8)}" font-size="{size}" '
+                f'fill="{fill}">{escape(text)}</text>'
+            )
+        parts.append("</svg>")
+        return "".join(parts)
+
+    @lru_cache(maxsize=None)
+    def _background(self, layout: str) -> Image.Image:
+        """Draw the static parts of a layout once."""
+        card = Image.new("RGB", (self.WIDTH, self.HEIGHT), color="white")
+        draw = ImageDraw.Draw(card)
+        for text, fill, size, y_pos in self.LAYOUTS[layout]["footer"]:
+            draw.text((self.TEXT_X, y_pos), text, fill=fill, font=load_font(size))
+        return card
+
+
+@lru_cache(maxsize=None)
+def get_share_card_renderer() -> ShareCardRenderer:
+    """Return the process-wide share-card renderer.
+
+    Returns:
+        Shared ShareCardRenderer instance
+    """
+    return ShareCardRenderer()
@@ -128,6 +128,13 @@ class Validator:
             if not Validator.validate_color(pass_data["foregroundColor"]):
                 errors.append("Invalid foregroundColor format (use rgb(r,g,b))")
 
+        # Validate web service settings (Apple requires 16+ character tokens)
+        if pass_data.get("webServiceURL"):
+            if not str(pass_data["webServiceURL"]).startswith(("https://", "http://")):
+                errors.append("Invalid webServiceURL (use an http(s) URL)")
+            if len(str(pass_data.get("authenticationToken", ""))) < 16:
+                errors.append("authenticationToken must be at least 16 characters when webServiceURL is set")
+
         # Validate fields
         if "fields" in pass_data:
             fields = pass_data["fields"]
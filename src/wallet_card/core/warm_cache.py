@@ -0,0 +1,319 @@
+"""On-disk cache for derived artifacts that survives warm serverless invocations."""
+
+import hashlib
+import os
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .. import __version__
+from . import metrics
+
+# Bump when rendering changes so stale artifacts are never served
+CACHE_FORMAT = 1
+CACHE_VERSION = f"{CACHE_FORMAT}-{__version__}"
+
+
+class WarmCache:
+    """Versioned, size-capped cache of rendered artifacts on local disk.
+
+    Entries live under ``<root>/v<version>/<namespace>/``. Keys hash the
+    cache version with the caller's key parts, so upgrading the package
+    never serves artifacts rendered by older code; directories of other
+    versions are deleted by ``prune``. When the cache grows past
+    ``max_bytes`` the least recently used entries are removed.
+    """
+
+    def __init__(
+        self, root: str, max_bytes: int = 64 * 1024 * 1024, version: str = CACHE_VERSION, name: str = "warm"
+    ):
+        """Initialize warm cache.
+
+        Args:
+            root: Cache root directory (e.g. under /tmp)
+            max_bytes: Size cap for this version's entries
+            version: Cache version; part of every key
+            name: Cache label on lookup metrics
+        """
+        self.root = Path(root)
+        self.name = name
+        self.version = version
+        self.max_bytes = max_bytes
+        self.dir = self.root / f"v{version}"
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._bytes = sum(entry.stat().st_size for entry in self._entries())
+
+    def path_for(self, namespace: str, parts: Tuple[Hashable, ...]) -> Path:
+        """Return the file path for a key.
+
+        Args:
+            namespace: Artifact kind, e.g. "placeholder"
+            parts: Values identifying the artifact
+
+        Returns:
+            Entry path
+        """
+        digest = hashlib.sha256(repr((self.version, namespace, parts)).encode("utf-8")).hexdigest()
+        return self.dir / namespace / digest[:2] / digest
+
+    def get(self, namespace: str, parts: Tuple[Hashable, ...]) -> Optional[bytes]:
+        """Look up an artifact.
+
+        Args:
+            namespace: Artifact kind
+            parts: Values identifying the artifact
+
+        Returns:
+            Cached bytes or None
+        """
+        path = self.path_for(namespace, parts)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            metrics.record_cache(self.name, hit=False)
+            return None
+        # Refresh mtime for LRU eviction (atime is often disabled on /tmp)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        with self._lock:
+            self._hits += 1
+        metrics.record_cache(self.name, hit=True)
+        return data
+
+    def put(self, namespace: str, parts: Tuple[Hashable, ...], data: bytes) -> None:
+        """Store an artifact, evicting old entries if over the size cap.
+
+        Args:
+            namespace: Artifact kind
+            parts: Values identifying the artifact
+            data: Artifact bytes
+        """
+        path = self.path_for(namespace, parts)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            # An overwritten entry's bytes leave the total with it
+            replaced = path.stat().st_size
+        except OSError:
+            replaced = 0
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            # A full or read-only /tmp must never fail the request
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._bytes += len(data) - replaced
+            over = self._bytes > self.max_bytes
+        if over:
+            self.prune()
+
+    def delete(self, namespace: str, parts: Tuple[Hashable, ...]) -> bool:
+        """Remove an artifact.
+
+        Args:
+            namespace: Artifact kind
+            parts: Values identifying the artifact
+
+        Returns:
+            Whether an entry was removed
+        """
+        path = self.path_for(namespace, parts)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            self._bytes -= size
+        return True
+
+    def clear(self, namespace: str) -> int:
+        """Remove every artifact of a kind.
+
+        Args:
+            namespace: Artifact kind
+
+        Returns:
+            Number of removed entries
+        """
+        removed = _remove_tree(self.dir / namespace)
+        with self._lock:
+            self._bytes = sum(entry.stat().st_size for entry in self._entries())
+        return removed
+
+    def get_or_create(self, namespace: str, parts: Tuple[Hashable, ...], render: Callable[[], bytes]) -> bytes:
+        """Return a cached artifact, rendering and storing it on a miss.
+
+        Args:
+            namespace: Artifact kind
+            parts: Values identifying the artifact
+            render: Produces the artifact
+
+        Returns:
+            Artifact bytes
+        """
+        data = self.get(namespace, parts)
+        if data is None:
+            data = render()
+            self.put(namespace, parts, data)
+        return data
+
+    def prune(self) -> int:
+        """Drop other versions' entries and evict LRU entries over the cap.
+
+        Returns:
+            Number of removed entries
+        """
+        removed = 0
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and entry.name != self.dir.name and entry.name.startswith("v"):
+                removed += _remove_tree(Path(entry.path))
+
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+
+        # Evict down to 90% of the cap so puts do not prune every time
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                removed += 1
+                total -= size
+            except FileNotFoundError:
+                continue
+
+        with self._lock:
+            self._bytes = total
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count, size and hit counters.
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        entries = list(self._entries())
+        with self._lock:
+            return {
+                "dir": str(self.dir),
+                "entries": len(entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def _entries(self):
+        """Iterate over entry files of this version."""
+        for namespace in os.scandir(self.dir):
+            if not namespace.is_dir():
+                continue
+            for shard in os.scandir(namespace.path):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        yield entry
+
+
+def _remove_tree(path: Path) -> int:
+    """Delete a directory tree, returning the number of removed files."""
+    removed = 0
+    for dirpath, dirnames, filenames in os.walk(path, topdown=False):
+        for filename in filenames:
+            try:
+                os.unlink(os.path.join(dirpath, filename))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        try:
+            os.rmdir(dirpath)
+        except OSError:
+            pass
+    return removed
+
+
+_cache: Optional[WarmCache] = None
+_configured = False
+_config_lock = threading.Lock()
+
+
+def get_warm_cache() -> Optional[WarmCache]:
+    """Return the process-wide warm cache, configured from the environment.
+
+    WALLET_CARD_WARM_CACHE enables it: "1" uses <tempdir>/wallet-card-cache,
+    any other value is taken as the cache directory. The size cap is read
+    from WALLET_CARD_WARM_CACHE_MAX_BYTES.
+
+    Returns:
+        The cache, or None when disabled
+    """
+    global _cache, _configured
+    if _configured:
+        return _cache
+    with _config_lock:
+        if not _configured:
+            setting = os.environ.get("WALLET_CARD_WARM_CACHE", "")
+            if setting:
+                root = setting
+                if setting.lower() in ("1", "true", "yes"):
+                    root = os.path.join(tempfile.gettempdir(), "wallet-card-cache")
+                max_bytes = int(os.environ.get("WALLET_CARD_WARM_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+                try:
+                    _cache = WarmCache(root, max_bytes=max_bytes)
+                except OSError:
+                    _cache = None
+            _configured = True
+    return _cache
+
+
+def set_warm_cache(cache: Optional[WarmCache]) -> None:
+    """Replace the process-wide warm cache (None disables it).
+
+    Args:
+        cache: Cache to use
+    """
+    global _cache, _configured
+    with _config_lock:
+        _cache = cache
+        _configured = True
+
+
+def cached(namespace: str, parts: Tuple[Hashable, ...], render: Callable[[], bytes]) -> bytes:
+    """Render through the warm cache when it is enabled.
+
+    Args:
+        namespace: Artifact kind
+        parts: Values identifying the artifact
+        render: Produces the artifact
+
+    Returns:
+        Artifact bytes
+    """
+    cache = get_warm_cache()
+    if cache is None:
+        return render()
+    return cache.get_or_create(namespace, parts, render)
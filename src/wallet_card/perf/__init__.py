@@ -0,0 +1 @@
+"""Performance tooling: benchmarks and load tests."""
@@ -0,0 +1,338 @@
+"""Benchmarks for pass generation.
+
+Everything is generated locally from fixed seeds (rosters and images), so
+results from different commits on the same machine are comparable.
+"""
+
+import io
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from PIL import Image, ImageDraw
+
+from .. import __version__
+from ..templates import TEMPLATES
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+FIRST_NAMES = ("Ada", "Grace", "Alan", "Edsger", "Barbara", "Donald", "Frances", "Ken", "Radia", "Linus")
+LAST_NAMES = ("Lovelace", "Hopper", "Turing", "Dijkstra", "Liskov", "Knuth", "Allen", "Thompson", "Perlman")
+TITLES = ("Engineer", "Staff Engineer", "Engineering Manager", "Designer", "Product Manager")
+
+# Metrics where a larger value is better; everything else is lower-is-better
+HIGHER_IS_BETTER = {"passes_per_sec"}
+
+
+def synthetic_image(size: int, seed: int = 0, fmt: str = "JPEG") -> bytes:
+    """Create a photo-like test image.
+
+    Gradients plus random shapes and noise compress roughly like a real
+    photo, unlike a flat colour.
+
+    Args:
+        size: Edge length in pixels
+        seed: Random seed
+        fmt: Pillow format name
+
+    Returns:
+        Encoded image
+    """
+    rng = random.Random(seed)
+    gradient = Image.linear_gradient("L").resize((size, size))
+    img = Image.merge("RGB", (gradient, gradient.rotate(90), gradient.rotate(180)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(24):
+        x0, y0 = rng.randrange(size), rng.randrange(size)
+        radius = rng.randrange(size // 16 + 1, size // 4 + 2)
+        colour = tuple(rng.randrange(256) for _ in range(3))
+        draw.ellipse((x0 - radius, y0 - radius, x0 + radius, y0 + radius), fill=colour)
+    pixels = size * size
+    noise = Image.frombytes("L", (size, size), rng.getrandbits(pixels * 8).to_bytes(pixels, "little"))
+    noise = noise.convert("RGB")
+    img = Image.blend(img, noise, 0.15)
+
+    buffer = io.BytesIO()
+    img.save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def synthetic_roster(count: int, seed: int = 0) -> List[Dict[str, str]]:
+    """Create people for batch runs.
+
+    Args:
+        count: Number of people
+        seed: Random seed
+
+    Returns:
+        Roster rows with name, title, email, phone and website
+    """
+    rng = random.Random(seed)
+    roster = []
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        roster.append({
+            "name": f"{first} {last}",
+            "title": rng.choice(TITLES),
+            "email": f"{first}.{last}{i}@example.com".lower(),
+            "phone": f"555-{rng.randrange(100, 999)}-{rng.randrange(1000, 9999)}",
+            "website": f"https://example.com/{first.lower()}_{last.lower()}_{i}",
+        })
+    return roster
+
+
+def roster_config(person: Dict[str, str], serial: int) -> Dict[str, Any]:
+    """Build a pass configuration for a roster row.
+
+    Args:
+        person: Roster row
+        serial: Serial number for the pass
+
+    Returns:
+        Configuration dictionary
+    """
+    return {
+        "pass": {
+            "description": f"{person['name']} Card",
+            "organizationName": "Benchmark Org",
+            "passTypeIdentifier": "pass.com.example.bench",
+            "serialNumber": str(serial),
+            "fields": {
+                "primaryFields": [{"key": "name", "label": "Name", "value": person["name"]}],
+                "secondaryFields": [
+                    {"key": "title", "label": "Title", "value": person["title"]},
+                    {"key": "email", "label": "Email", "value": person["email"]},
+                ],
+                "auxiliaryFields": [{"key": "phone", "label": "Phone", "value": person["phone"]}],
+                "backFields": [{"key": "website", "label": "Website", "value": person["website"]}],
+            },
+        },
+        "qr_data": person["website"],
+    }
+
+
+def _make_template(name: str, workdir: str):
+    """Instantiate a template writing into a scratch directory."""
+    return TEMPLATES[name](assets_dir=os.path.join(workdir, "assets"), output_dir=os.path.join(workdir, "output"))
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Return a nearest-rank percentile."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def bench_single(template: str, image_size: int, repeat: int, seed: int, workdir: str) -> Dict[str, Any]:
+    """Measure single-pass latency and archive size.
+
+    Args:
+        template: Template name
+        image_size: Edge length of the uploaded icon, logo and photo
+        repeat: Number of timed runs (after one warm-up run)
+        seed: Random seed
+        workdir: Scratch directory
+
+    Returns:
+        Result entry
+    """
+    instance = _make_template(template, workdir)
+    image = synthetic_image(image_size, seed)
+    uploads = {"icon": image, "logo": image, "photo": image}
+    config = roster_config(synthetic_roster(1, seed)[0], 1)
+
+    data = instance.generate_bytes(config, uploads)  # warm-up: imports, fonts
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = instance.generate_bytes(config, uploads)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "name": f"single/{template}/{image_size}px",
+        "metrics": {
+            "median_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(percentile(timings, 0.95), 3),
+            "min_ms": round(min(timings), 3),
+            "pkpass_bytes": len(data),
+        },
+    }
+
+
+def _noop(_: int) -> None:
+    """Warm a worker process."""
+
+
+def _batch_worker(args) -> int:
+    """Generate a slice of a roster in a worker process."""
+    template, image_size, rows, seed, workdir = args
+    instance = _make_template(template, workdir)
+    image = synthetic_image(image_size, seed)
+    uploads = {"icon": image, "logo": image, "photo": image}
+    total = 0
+    for serial, person in rows:
+        total += len(instance.generate_bytes(roster_config(person, serial), uploads))
+    return total
+
+
+def bench_batch(
+    template: str, image_size: int, count: int, workers: int, seed: int, workdir: str
+) -> Dict[str, Any]:
+    """Measure batch throughput with a process pool.
+
+    Args:
+        template: Template name
+        image_size: Edge length of the uploaded images
+        count: Number of passes in the batch
+        workers: Number of worker processes
+        seed: Random seed
+        workdir: Scratch directory
+
+    Returns:
+        Result entry
+    """
+    rows = list(enumerate(synthetic_roster(count, seed), start=1))
+    chunks = [rows[i::workers] for i in range(workers)]
+    tasks = [(template, image_size, chunk, seed, workdir) for chunk in chunks if chunk]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Start the workers before timing so process spawn is not counted
+        list(pool.map(_noop, range(workers)))
+        start = time.perf_counter()
+        total_bytes = sum(pool.map(_batch_worker, tasks))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "name": f"batch/{template}/{image_size}px/{workers}w",
+        "metrics": {
+            "passes_per_sec": round(count / elapsed, 2),
+            "total_ms": round(elapsed * 1000, 1),
+            "mean_pkpass_bytes": total_bytes // count,
+        },
+    }
+
+
+def peak_rss_kb() -> Dict[str, int]:
+    """Return peak resident set size of this process and its children.
+
+    Returns:
+        Dictionary with self and children peaks in KiB (empty on Windows)
+    """
+    if resource is None:
+        return {}
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    scale = 1024 if sys.platform == "darwin" else 1
+    return {
+        "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+        "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine and code under test."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "version": __version__,
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def run_benchmarks(
+    templates: Optional[Iterable[str]] = None,
+    image_sizes: Iterable[int] = (256, 1024, 3000),
+    repeat: int = 5,
+    batch_size: int = 40,
+    workers: Iterable[int] = (1, 2, 4),
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Run the benchmark suite.
+
+    Args:
+        templates: Template names (default: all)
+        image_sizes: Edge lengths of synthetic uploads
+        repeat: Timed runs per single-pass case
+        batch_size: Passes per batch case (0 skips batch cases)
+        workers: Worker counts for batch cases
+        seed: Random seed for rosters and images
+
+    Returns:
+        Report with environment, results and peak RSS
+    """
+    templates = list(templates or TEMPLATES)
+    image_sizes = list(image_sizes)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="wallet-card-bench-") as workdir:
+        for template in templates:
+            for size in image_sizes:
+                results.append(bench_single(template, size, repeat, seed, workdir))
+        if batch_size:
+            # Throughput is measured for one template at the middle image size
+            size = image_sizes[len(image_sizes) // 2]
+            for count in workers:
+                results.append(bench_batch(templates[0], size, batch_size, count, seed, workdir))
+
+    return {
+        "environment": environment(),
+        "parameters": {
+            "templates": templates,
+            "image_sizes": image_sizes,
+            "repeat": repeat,
+            "batch_size": batch_size,
+            "workers": list(workers),
+            "seed": seed,
+        },
+        "results": results,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """Find metrics that regressed beyond a tolerance.
+
+    Args:
+        current: Report from run_benchmarks
+        baseline: Earlier report to compare against
+        tolerance: Allowed relative slowdown (0.2 = 20%)
+
+    Returns:
+        Human-readable regression descriptions (empty if none)
+    """
+    previous = {entry["name"]: entry["metrics"] for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in current["results"]:
+        before = previous.get(entry["name"])
+        if not before:
+            continue
+        for metric, value in entry["metrics"].items():
+            old = before.get(metric)
+            if not old:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                regressed = value < old * (1 - tolerance)
+            else:
+                regressed = value > old * (1 + tolerance)
+            if regressed:
+                change = (value - old) / old * 100
+                regressions.append(f"{entry['name']} {metric}: {old} -> {value} ({change:+.1f}%)")
+    return regressions
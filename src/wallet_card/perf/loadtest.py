@@ -0,0 +1,360 @@
+"""Load generator for the web app.
+
+Drives /api/generate (multipart, with photo uploads), /api/download and
+/api/validate from a pool of client threads and reports latency
+percentiles, throughput and error rates per endpoint.
+"""
+
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .bench import percentile, roster_config, synthetic_image, synthetic_roster
+
+# Default request mix: endpoint -> relative weight
+DEFAULT_MIX = {"generate": 3, "download": 5, "validate": 2}
+
+# Upload edge lengths drawn for generate requests (None: no photo)
+UPLOAD_SIZES = (None, 256, 512, 1024, 2048)
+
+# Generated files remembered as download targets
+MAX_DOWNLOAD_URLS = 1000
+
+
+def encode_multipart(
+    fields: Dict[str, str], files: Dict[str, Tuple[str, bytes, str]]
+) -> Tuple[bytes, str]:
+    """Encode a multipart/form-data body.
+
+    Args:
+        fields: Form fields
+        files: Uploads as field -> (filename, content, content type)
+
+    Returns:
+        Tuple of (body, Content-Type header value)
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, content, content_type) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode()
+            + content
+            + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+class EndpointStats:
+    """Latencies and outcomes for one endpoint."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self.errors = 0
+        self.bytes_received = 0
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        """Summarize the recorded requests.
+
+        Args:
+            elapsed: Duration of the run in seconds
+
+        Returns:
+            Request count, throughput, error rate and latency percentiles
+        """
+        count = len(self.latencies) + self.errors
+        failed = self.errors + sum(n for status, n in self.statuses.items() if status >= 500)
+        result: Dict[str, Any] = {
+            "requests": count,
+            "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(failed / count, 4) if count else 0.0,
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items())},
+            "connection_errors": self.errors,
+            "bytes_received": self.bytes_received,
+        }
+        if self.latencies:
+            for name, fraction in (("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)):
+                result[name] = round(percentile(self.latencies, fraction) * 1000, 2)
+            result["max_ms"] = round(max(self.latencies) * 1000, 2)
+        return result
+
+
+class LoadTest:
+    """Runs a request mix against a server from concurrent client threads."""
+
+    def __init__(
+        self,
+        base_url: str,
+        concurrency: int = 8,
+        duration: float = 30.0,
+        requests: Optional[int] = None,
+        mix: Optional[Dict[str, int]] = None,
+        timeout: float = 60.0,
+        seed: int = 0,
+    ):
+        """Initialize load test.
+
+        Args:
+            base_url: Server URL, e.g. http://127.0.0.1:5000
+            concurrency: Number of client threads
+            duration: Seconds to run (ignored when requests is given)
+            requests: Optional total number of requests to send
+            mix: Relative weights for generate, download and validate
+            timeout: Per-request timeout in seconds
+            seed: Random seed for the request mix and payloads
+        """
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.concurrency = concurrency
+        self.duration = duration
+        self.requests = requests
+        self.mix = mix or DEFAULT_MIX
+        self.timeout = timeout
+        self.seed = seed
+
+        self.stats = {name: EndpointStats() for name in self.mix}
+        self._lock = threading.Lock()
+        self._issued = 0
+        self._downloads: List[str] = []
+        self._roster = synthetic_roster(200, seed)
+        # Encode uploads once; generate requests pick one at random
+        self._images = {size: synthetic_image(size, seed) for size in UPLOAD_SIZES if size}
+
+    def run(self) -> Dict[str, Any]:
+        """Run the load test.
+
+        Returns:
+            Report with per-endpoint and overall results
+        """
+        deadline = time.monotonic() + self.duration
+        threads = [
+            threading.Thread(target=self._worker, args=(i, deadline), daemon=True)
+            for i in range(self.concurrency)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        overall = EndpointStats()
+        for stats in self.stats.values():
+            overall.latencies += stats.latencies
+            overall.errors += stats.errors
+            overall.bytes_received += stats.bytes_received
+            for status, n in stats.statuses.items():
+                overall.statuses[status] = overall.statuses.get(status, 0) + n
+
+        return {
+            "target": f"http://{self.host}:{self.port}",
+            "concurrency": self.concurrency,
+            "elapsed_s": round(elapsed, 2),
+            "overall": overall.summary(elapsed),
+            "endpoints": {name: stats.summary(elapsed) for name, stats in self.stats.items()},
+        }
+
+    def _next_slot(self, deadline: float) -> bool:
+        """Reserve the next request, or report that the run is over."""
+        with self._lock:
+            if self.requests is not None:
+                if self._issued >= self.requests:
+                    return False
+            elif time.monotonic() >= deadline:
+                return False
+            self._issued += 1
+            return True
+
+    def _worker(self, index: int, deadline: float) -> None:
+        """Client thread: send requests from the mix until done."""
+        rng = random.Random(self.seed * 1000 + index)
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        while self._next_slot(deadline):
+            endpoint = rng.choices(names, weights)[0]
+            with self._lock:
+                download = rng.choice(self._downloads) if self._downloads else None
+            if endpoint == "download" and download is None and "generate" in self.mix:
+                # Nothing to download yet; create something first
+                endpoint = "generate"
+            method, path, body, headers = self._build_request(endpoint, rng, download)
+            self._send(endpoint, method, path, body, headers)
+
+    def _build_request(
+        self, endpoint: str, rng: random.Random, download: Optional[str]
+    ) -> Tuple[str, str, Optional[bytes], Dict[str, str]]:
+        """Build the method, path, body and headers for an endpoint."""
+        person = rng.choice(self._roster)
+        if endpoint == "generate":
+            fields = dict(person, description=f"{person['name']} Load", template_style="classic-blue")
+            files = {}
+            size = rng.choice(UPLOAD_SIZES)
+            if size:
+                files["photo"] = ("photo.jpg", self._images[size], "image/jpeg")
+            body, content_type = encode_multipart(fields, files)
+            return "POST", "/api/generate", body, {"Content-Type": content_type}
+        if endpoint == "download":
+            return "GET", download or "/api/download/missing.pkpass", None, {}
+        if endpoint == "validate":
+            body = json.dumps(roster_config(person, rng.randrange(1, 10 ** 6))).encode()
+            return "POST", "/api/validate", body, {"Content-Type": "application/json"}
+        raise ValueError(f"Unknown endpoint: {endpoint}")
+
+    def _send(
+        self, endpoint: str, method: str, path: str, body: Optional[bytes], headers: Dict[str, str]
+    ) -> None:
+        """Send one request and record its outcome."""
+        stats = self.stats[endpoint]
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            payload = response.read()
+            latency = time.perf_counter() - start
+        except (OSError, http.client.HTTPException):
+            with self._lock:
+                stats.errors += 1
+            return
+        finally:
+            conn.close()
+
+        with self._lock:
+            stats.latencies.append(latency)
+            stats.statuses[response.status] = stats.statuses.get(response.status, 0) + 1
+            stats.bytes_received += len(payload)
+            if endpoint == "generate" and response.status == 200:
+                try:
+                    url = json.loads(payload).get("download_url")
+                except ValueError:
+                    url = None
+                if url and len(self._downloads) < MAX_DOWNLOAD_URLS:
+                    self._downloads.append(url)
+
+
+def free_port() -> int:
+    """Return an unused local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(host: str, port: int, timeout: float = 30.0) -> None:
+    """Block until the server answers HTTP requests.
+
+    Raises:
+        TimeoutError: If it does not come up in time
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        conn = http.client.HTTPConnection(host, port, timeout=2)
+        try:
+            conn.request("GET", "/api/admission")
+            conn.getresponse().read()
+            return
+        except (OSError, http.client.HTTPException):
+            time.sleep(0.1)
+        finally:
+            conn.close()
+    raise TimeoutError(f"Server on {host}:{port} did not start within {timeout}s")
+
+
+class ServerProcess:
+    """Runs wallet_card.web.app in a child process for the duration of a test.
+
+    ``dev`` uses Flask's threaded development server; ``gunicorn`` runs the
+    production WSGI server (which must be installed).
+    """
+
+    def __init__(self, kind: str = "dev", port: Optional[int] = None, workers: int = 2, threads: int = 4):
+        """Initialize server process.
+
+        Args:
+            kind: "dev" or "gunicorn"
+            port: Port to listen on (default: a free one)
+            workers: Gunicorn worker processes
+            threads: Gunicorn threads per worker
+        """
+        self.kind = kind
+        self.port = port or free_port()
+        self.workers = workers
+        self.threads = threads
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        return f"http://127.0.0.1:{self.port}"
+
+    def command(self) -> List[str]:
+        """Return the command line that starts the server."""
+        if self.kind == "gunicorn":
+            return [
+                sys.executable, "-m", "gunicorn",
+                "--workers", str(self.workers), "--threads", str(self.threads),
+                "--bind", f"127.0.0.1:{self.port}", "wallet_card.web.app:app",
+            ]
+        if self.kind == "dev":
+            return [
+                sys.executable, "-m", "flask", "--app", "wallet_card.web.app",
+                "run", "--port", str(self.port), "--with-threads", "--no-reload",
+            ]
+        raise ValueError(f"Unknown server kind: {self.kind}")
+
+    def __enter__(self) -> "ServerProcess":
+        self._process = subprocess.Popen(
+            self.command(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=dict(os.environ)
+        )
+        try:
+            wait_for_server("127.0.0.1", self.port)
+        except TimeoutError:
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a report as a text table.
+
+    Args:
+        report: Report from LoadTest.run
+
+    Returns:
+        Table with one row per endpoint plus the total
+    """
+    header = f"{'endpoint':10} {'reqs':>7} {'rps':>8} {'err%':>6} {'p50':>8} {'p95':>8} {'p99':>8}"
+    lines = [header, "-" * len(header)]
+    rows = list(report["endpoints"].items()) + [("total", report["overall"])]
+    for name, stats in rows:
+        lines.append(
+            f"{name:10} {stats['requests']:7d} {stats['throughput_rps']:8.1f} "
+            f"{stats['error_rate'] * 100:6.2f} {stats.get('p50_ms', 0):8.1f} "
+            f"{stats.get('p95_ms', 0):8.1f} {stats.get('p99_ms', 0):8.1f}"
+        )
+    lines.append("(latencies in ms)")
+    return "\n".join(lines)
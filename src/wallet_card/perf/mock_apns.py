@@ -0,0 +1,104 @@
+"""Local stand-in for APNs, for tests and push throughput runs.
+
+Accepts APNs-style requests (``POST /3/device/<token>``) over keep-alive
+HTTP/1.1 and records them. Tokens can be marked unregistered (410) and a
+number of upcoming requests can be throttled (429) to exercise retries.
+"""
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Set, Tuple
+
+
+class MockAPNsServer:
+    """Threaded APNs stand-in listening on a local port."""
+
+    def __init__(self, port: int = 0, latency: float = 0.0):
+        """Initialize mock APNs server.
+
+        Args:
+            port: Port to listen on (0: pick a free one)
+            latency: Seconds to wait before answering each push
+        """
+        self.latency = latency
+        self.received: List[Tuple[str, str]] = []
+        self.unregistered: Set[str] = set()
+        self.connections = 0
+        self._throttle = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def throttle(self, count: int) -> None:
+        """Answer the next ``count`` pushes with 429 TooManyRequests.
+
+        Args:
+            count: Number of pushes to reject
+        """
+        with self._lock:
+            self._throttle = count
+
+    def __enter__(self) -> "MockAPNsServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _respond(self, topic: str, token: str) -> Tuple[int, str]:
+        """Decide the status and reason for one push."""
+        with self._lock:
+            if self._throttle > 0:
+                self._throttle -= 1
+                return 429, "TooManyRequests"
+            if not topic:
+                return 400, "MissingTopic"
+            if token in self.unregistered:
+                return 410, "Unregistered"
+            self.received.append((topic, token))
+            return 200, ""
+
+    def _handler(self):
+        """Build the request handler class bound to this server."""
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with mock._lock:
+                    mock.connections += 1
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if not self.path.startswith("/3/device/"):
+                    self._reply(404, "BadPath")
+                    return
+                if mock.latency:
+                    time.sleep(mock.latency)
+                status, reason = mock._respond(self.headers.get("apns-topic", ""), self.path[len("/3/device/"):])
+                self._reply(status, reason)
+
+            def _reply(self, status: int, reason: str):
+                body = json.dumps({"reason": reason}).encode() if reason else b""
+                self.send_response(status)
+                self.send_header("apns-id", str(uuid.uuid4()))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
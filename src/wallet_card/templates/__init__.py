@@ -1,22 +1,66 @@
-"""Template system for different pass types."""
-
-from .base_template import BaseTemplate
-from .business_card import BusinessCardTemplate
-from .classic_blue import ClassicBlueTemplate
-from .modern_dark import ModernDarkTemplate
-from .professional_green import ProfessionalGreenTemplate
-from .elegant_purple import ElegantPurpleTemplate
-from .bold_red import BoldRedTemplate
-from .minimalist_light import MinimalistLightTemplate
-
-__all__ = [
-    "BaseTemplate",
-    "BusinessCardTemplate",
-    "ClassicBlueTemplate",
-    "ModernDarkTemplate",
-    "ProfessionalGreenTemplate",
-    "ElegantPurpleTemplate",
-    "BoldRedTemplate",
-    "MinimalistLightTemplate",
-]
+"""Template system for different pass types.
 
+Template modules are imported on first use, so importing this package
+(e.g. from the web app on a serverless cold start) does not load them all.
+"""
+
+import importlib
+from typing import Iterator, Mapping, Type
+
+# Template classes by attribute name: (module, class)
+_CLASSES = {
+    "BaseTemplate": ("base_template", "BaseTemplate"),
+    "BusinessCardTemplate": ("business_card", "BusinessCardTemplate"),
+    "ClassicBlueTemplate": ("classic_blue", "ClassicBlueTemplate"),
+    "ModernDarkTemplate": ("modern_dark", "ModernDarkTemplate"),
+    "ProfessionalGreenTemplate": ("professional_green", "ProfessionalGreenTemplate"),
+    "ElegantPurpleTemplate": ("elegant_purple", "ElegantPurpleTemplate"),
+    "BoldRedTemplate": ("bold_red", "BoldRedTemplate"),
+    "MinimalistLightTemplate": ("minimalist_light", "MinimalistLightTemplate"),
+}
+
+# Template styles by CLI/web name
+_STYLES = {
+    "classic-blue": "ClassicBlueTemplate",
+    "modern-dark": "ModernDarkTemplate",
+    "professional-green": "ProfessionalGreenTemplate",
+    "elegant-purple": "ElegantPurpleTemplate",
+    "bold-red": "BoldRedTemplate",
+    "minimalist-light": "MinimalistLightTemplate",
+    "business-card": "BusinessCardTemplate",  # Legacy support
+}
+
+
+def _load(name: str) -> type:
+    """Import a template class by attribute name."""
+    module_name, class_name = _CLASSES[name]
+    module = importlib.import_module(f".{module_name}", __name__)
+    return getattr(module, class_name)
+
+
+class _TemplateRegistry(Mapping):
+    """Read-only mapping of style name to template class, imported lazily."""
+
+    def __getitem__(self, style: str) -> Type:
+        return _load(_STYLES[style])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_STYLES)
+
+    def __len__(self) -> int:
+        return len(_STYLES)
+
+
+TEMPLATES: Mapping[str, Type] = _TemplateRegistry()
+
+
+def __getattr__(name: str):
+    """Import template classes on attribute access (PEP 562)."""
+    if name in _CLASSES:
+        value = _load(name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["TEMPLATES", *_CLASSES]
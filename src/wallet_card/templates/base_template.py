@@ -1,21 +1,35 @@
 """Base template class for pass generation."""
 
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
 from pathlib import Path
-from ..core.pass_generator import PassGenerator
-from ..core.asset_manager import AssetManager
+from ..core.pass_generator import PassGenerator, ProgressCallback
+from ..core.asset_bundle import AssetBundle
+from ..core.asset_manager import AssetManager, ImageSource
+from ..core.field_template import Renderer, compile_config
+from ..core.pass_store import PassStore
+from ..core.result_cache import ResultCache
+from ..core.serials import SerialAllocator
 
 
 class BaseTemplate(ABC):
     """Base class for all pass templates."""
 
+    # Compiled configurations kept per instance, least recently used first out
+    MAX_COMPILED = 128
+
     def __init__(
         self,
         assets_dir: str = "assets/user",
         output_dir: str = "output",
         cert_file: str = None,
         key_file: str = None,
+        store: Optional[PassStore] = None,
+        bundle: Optional[AssetBundle] = None,
+        result_cache: Optional[ResultCache] = None,
+        serials: Optional[SerialAllocator] = None,
     ):
         """Initialize template.
 
@@ -24,11 +38,39 @@ class BaseTemplate(ABC):
             output_dir: Directory for output files
             cert_file: Optional certificate file for signing
             key_file: Optional key file for signing
+            store: Optional content-addressed pass store
+            bundle: Optional prebuilt asset bundle for the organization
+            result_cache: Optional cache of generated archives
+            serials: Optional allocator for passes without a serial number
         """
         self.assets_dir = assets_dir
         self.output_dir = output_dir
-        self.generator = PassGenerator(assets_dir, output_dir, cert_file, key_file)
+        self.generator = PassGenerator(
+            assets_dir,
+            output_dir,
+            cert_file,
+            key_file,
+            store,
+            template_name=self.template_name(),
+            bundle=bundle,
+            result_cache=result_cache,
+            serials=serials,
+        )
         self.asset_manager = AssetManager(assets_dir)
+        self._compiled: "OrderedDict[Hashable, Tuple[Renderer, Dict[str, Any]]]" = OrderedDict()
+        self._compiled_lock = threading.Lock()
+
+    @classmethod
+    def template_name(cls) -> str:
+        """Return the template's short name, e.g. "classic_blue".
+
+        Returns:
+            Class name without the Template suffix, in snake case
+        """
+        name = cls.__name__
+        if name.endswith("Template"):
+            name = name[: -len("Template")]
+        return "".join(f"_{c.lower()}" if c.isupper() else c for c in name).lstrip("_")
 
     @abstractmethod
     def get_template_config(self) -> Dict[str, Any]:
@@ -39,21 +81,162 @@ class BaseTemplate(ABC):
         """
         pass
 
-    def generate(self, config: Dict[str, Any], output_filename: str = None) -> Path:
+    def generate(
+        self,
+        config: Dict[str, Any],
+        output_filename: str = None,
+        uploads: Optional[Dict[str, ImageSource]] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Path:
         """Generate pass from configuration.
 
         Args:
             config: Configuration dictionary (merged with template defaults)
             output_filename: Optional output filename
+            uploads: Optional in-memory images keyed by asset type
+            progress: Optional callback receiving (stage, fraction complete)
 
         Returns:
             Path to generated .pkpass file
         """
-        # Merge template defaults with provided config
-        template_config = self.get_template_config()
-        merged_config = self._merge_configs(template_config, config)
+        return self.generator.generate(
+            self.resolve_config(config), output_filename, uploads, progress
+        )
 
-        return self.generator.generate(merged_config, output_filename)
+    def generate_bytes(
+        self,
+        config: Dict[str, Any],
+        uploads: Optional[Dict[str, ImageSource]] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> bytes:
+        """Generate pass in memory without writing to the output directory.
+
+        Args:
+            config: Configuration dictionary (merged with template defaults)
+            uploads: Optional in-memory images keyed by asset type
+            progress: Optional callback receiving (stage, fraction complete)
+
+        Returns:
+            Contents of the .pkpass file
+        """
+        return self.generator.generate_bytes(self.resolve_config(config), uploads, progress)
+
+    def preview(self, config: Dict[str, Any], uploads: Optional[Dict[str, ImageSource]] = None) -> bytes:
+        """Render a PNG approximation of the front of the pass.
+
+        Args:
+            config: Configuration dictionary (merged with template defaults)
+            uploads: Optional in-memory images keyed by asset type
+
+        Returns:
+            PNG-encoded preview
+        """
+        return self.generator.preview(self.resolve_config(config), uploads)
+
+    def preview_key(self, config: Dict[str, Any], uploads: Optional[Dict[str, ImageSource]] = None) -> Optional[str]:
+        """Fingerprint a preview for caching.
+
+        Args:
+            config: Configuration dictionary (merged with template defaults)
+            uploads: Optional in-memory images keyed by asset type
+
+        Returns:
+            Cache key, or None if the preview cannot be fingerprinted
+        """
+        return self.generator.preview_key(self.resolve_config(config), uploads)
+
+    def invalidate(self, config: Dict[str, Any], uploads: Optional[Dict[str, ImageSource]] = None) -> bool:
+        """Drop the cached archive for a configuration, if any.
+
+        Args:
+            config: Configuration dictionary (merged with template defaults)
+            uploads: Optional in-memory images keyed by asset type
+
+        Returns:
+            Whether a cached archive was removed
+        """
+        return self.generator.invalidate(self.resolve_config(config), uploads)
+
+    def resolve_config(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge template defaults with provided config and fill placeholders.
+
+        Defaults from an asset bundle built for this template apply on top
+        of the template's own and below the provided config. Placeholders
+        such as "{name}" are filled from the config's ``data`` section.
+        The merged configuration is compiled once and reused for every
+        call with the same settings, whatever the data.
+
+        Args:
+            config: Configuration dictionary
+
+        Returns:
+            Merged and rendered configuration, without ``data``
+        """
+        render, defaults = self._renderer(config)
+        data = config.get("data")
+        return render({**defaults, **data} if data else defaults)
+
+    def compile(self, config: Optional[Dict[str, Any]] = None) -> Callable[[Mapping[str, Any]], Dict[str, Any]]:
+        """Compile the merged configuration for rendering many rows.
+
+        Merging and parsing placeholders happen once; each row then only
+        costs string substitution. Rendered configurations are resolved
+        already and can go straight to ``self.generator``.
+
+        Args:
+            config: Optional configuration shared by all rows (its ``data``
+                section supplies defaults for missing row values)
+
+        Returns:
+            Function taking a row of data and returning its configuration
+
+        Raises:
+            ValueError: If a placeholder uses an unknown formatter
+        """
+        config = config or {}
+        render, shared = self._renderer(config)
+        shared = {**shared, **(config.get("data") or {})}
+        if not shared:
+            return render
+        return lambda row: render({**shared, **row})
+
+    def _renderer(self, config: Dict[str, Any]) -> Tuple[Renderer, Dict[str, Any]]:
+        """Return the compiled merged configuration and the defaults' data.
+
+        Compiled configurations are keyed by the bundle version and the
+        configuration without its ``data``; settings that cannot be keyed
+        (unhashable values) are compiled on every call.
+        """
+        bundle = self.generator.bundle_for(config)
+        settings = {key: value for key, value in config.items() if key != "data"}
+        try:
+            key: Optional[Hashable] = (bundle.version if bundle is not None else None, _freeze(settings))
+        except TypeError:
+            key = None
+        if key is not None:
+            with self._compiled_lock:
+                entry = self._compiled.get(key)
+                if entry is not None:
+                    self._compiled.move_to_end(key)
+                    return entry
+
+        merged = self._merge_defaults(settings)
+        defaults = merged.pop("data", None) or {}
+        entry = (compile_config(merged), defaults)
+        if key is not None:
+            with self._compiled_lock:
+                self._compiled[key] = entry
+                while len(self._compiled) > self.MAX_COMPILED:
+                    self._compiled.popitem(last=False)
+        return entry
+
+    def _merge_defaults(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge template and asset bundle defaults under a configuration."""
+        defaults = self.get_template_config()
+        bundle = self.generator.bundle_for(config)
+        if bundle is not None and bundle.template == self.template_name():
+            defaults = self._merge_configs(defaults, bundle.defaults)
+        return self._merge_configs(defaults, config)
 
     def _merge_configs(self, template: Dict[str, Any], user: Dict[str, Any]) -> Dict[str, Any]:
         """Merge template config with user config.
@@ -88,3 +271,19 @@ class BaseTemplate(ABC):
 
         return Validator.validate_config(config)
 
+
+def _freeze(value: Any) -> Hashable:
+    """Turn a configuration into a hashable key that tells types apart.
+
+    Literal strings are kept distinct from template strings, since they
+    compile differently.
+
+    Raises:
+        TypeError: If the configuration holds an unhashable value
+    """
+    if isinstance(value, dict):
+        return ("dict", tuple((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return ("list", tuple(_freeze(item) for item in value))
+    hash(value)
+    return (type(value), value)
@@ -19,24 +19,24 @@ class ElegantPurpleTemplate(BaseTemplate):
                 "labelColor": "rgb(255,255,255)",
                 "fields": {
                     "primaryFields": [
-                        {"key": "name", "label": "Name", "value": ""}
+                        {"key": "name", "label": "Name", "value": "{name}"}
                     ],
                     "secondaryFields": [
-                        {"key": "title", "label": "Title", "value": ""},
-                        {"key": "email", "label": "Email", "value": ""}
+                        {"key": "title", "label": "Title", "value": "{title}"},
+                        {"key": "email", "label": "Email", "value": "{email}"}
                     ],
                     "auxiliaryFields": [
-                        {"key": "phone", "label": "Phone", "value": ""}
+                        {"key": "phone", "label": "Phone", "value": "{phone}"}
                     ],
                     "backFields": [
-                        {"key": "linkedin", "label": "LinkedIn", "value": ""},
-                        {"key": "github", "label": "GitHub", "value": ""},
-                        {"key": "website", "label": "Website", "value": ""}
+                        {"key": "linkedin", "label": "LinkedIn", "value": "{linkedin}"},
+                        {"key": "github", "label": "GitHub", "value": "{github}"},
+                        {"key": "website", "label": "Website", "value": "{website}"}
                     ],
                 },
             },
             "assets": {},
-            "qr_data": "",
+            "qr_data": "{website}",
             "signing": {
                 "enabled": False,
             },
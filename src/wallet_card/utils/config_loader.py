@@ -11,16 +11,27 @@ class ConfigLoader:
     """Loads and merges configuration from files and environment variables."""
 
     @staticmethod
-    def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
+    def load_config(
+        config_path: Optional[str] = None,
+        defaults: Optional[Dict[str, Any]] = None,
+        builtin_defaults: bool = True,
+    ) -> Dict[str, Any]:
         """Load configuration from file or use defaults.
 
         Args:
             config_path: Path to configuration file (YAML or JSON)
+            defaults: Optional defaults layered over the built-in ones, e.g.
+                an asset bundle's organization defaults
+            builtin_defaults: Start from the built-in defaults; turn off
+                for partial configurations that leave the rest (such as
+                the fields) to the pass template
 
         Returns:
             Configuration dictionary
         """
-        default_config = ConfigLoader._get_default_config()
+        default_config = ConfigLoader._get_default_config() if builtin_defaults else {}
+        if defaults:
+            default_config = ConfigLoader._merge_configs(default_config, defaults)
 
         if config_path and Path(config_path).exists():
             file_config = ConfigLoader._load_file(config_path)
@@ -64,7 +75,6 @@ class ConfigLoader:
         return {
             "pass": {
                 "passTypeIdentifier": "pass.com.example.generic",
-                "serialNumber": "123456789",
                 "teamIdentifier": "",
                 "organizationName": "My Organization",
                 "description": "Digital Business Card",
@@ -0,0 +1,129 @@
+"""Admission control for CPU-heavy web requests."""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator
+
+
+class OverloadedError(Exception):
+    """Raised when a request cannot be admitted in time."""
+
+    def __init__(self, message: str, retry_after: int):
+        """Initialize error.
+
+        Args:
+            message: Human-readable reason
+            retry_after: Suggested client back-off in seconds
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded wait queue and queue deadlines.
+
+    At most ``max_concurrent`` requests run at once. Up to ``max_queue``
+    more may wait, each for at most ``queue_timeout`` seconds; anything
+    beyond that is rejected immediately so overload degrades into fast
+    503 responses instead of thrashing.
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_queue: int = 16, queue_timeout: float = 10.0):
+        """Initialize admission controller.
+
+        Args:
+            max_concurrent: Maximum requests running at once
+            max_queue: Maximum requests waiting for a slot
+            queue_timeout: Maximum seconds a request may wait
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        # Exponentially weighted average of service time, for Retry-After
+        self._avg_service = 1.0
+
+    @contextmanager
+    def admit(self) -> Iterator[None]:
+        """Hold a concurrency slot for the duration of the block.
+
+        Raises:
+            OverloadedError: If the wait queue is full or the deadline passes
+        """
+        with self._cond:
+            if self._active >= self.max_concurrent or self._waiting:
+                if self._waiting >= self.max_queue:
+                    self._rejected += 1
+                    raise OverloadedError("Server is busy, please retry", self._retry_after())
+                self._waiting += 1
+                try:
+                    admitted = self._cond.wait_for(
+                        lambda: self._active < self.max_concurrent, timeout=self.queue_timeout
+                    )
+                finally:
+                    self._waiting -= 1
+                if not admitted:
+                    self._timed_out += 1
+                    raise OverloadedError("Timed out waiting for capacity", self._retry_after())
+            self._active += 1
+            self._admitted += 1
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - started
+            with self._cond:
+                self._active -= 1
+                self._avg_service = 0.8 * self._avg_service + 0.2 * elapsed
+                self._cond.notify()
+
+    def limit(self, func: Callable) -> Callable:
+        """Decorate a view so it runs under admission control.
+
+        Args:
+            func: View function
+
+        Returns:
+            Wrapped view function
+        """
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with self.admit():
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def stats(self) -> Dict[str, Any]:
+        """Return current load and rejection counters.
+
+        Returns:
+            Dictionary of gauges and counters
+        """
+        with self._cond:
+            return {
+                "active": self._active,
+                "waiting": self._waiting,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "admitted_total": self._admitted,
+                "rejected_total": self._rejected,
+                "timed_out_total": self._timed_out,
+            }
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until a slot frees up.
+
+        Must be called with the lock held.
+        """
+        backlog = (self._waiting + 1) / max(1, self.max_concurrent)
+        return max(1, math.ceil(backlog * self._avg_service))
@@ -1,30 +1,73 @@
 """Flask web application for wallet card generator."""
 
+import hashlib
+import io
+import logging
 import os
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
-import qrcode
-from PIL import Image, ImageDraw, ImageFont
-from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for
-from werkzeug.utils import secure_filename
-
+from flask import Flask, Request, Response, render_template, request, jsonify, send_file, flash, redirect, url_for
+from werkzeug.security import safe_join
+
+from ..core import metrics
+from ..core.asset_bundle import load_bundle
+from ..core.blob_store import Blob, BlobStore
+from ..core.field_template import literal
+from ..core.output_store import OutputStore
+from ..core.pass_generator import PassGenerator
+from ..core.pass_registry import PassRegistry
+from ..core.pass_store import PassStore
+from ..core.preview import PreviewCache
+from ..core.result_cache import ResultCache
+from ..core.serials import SerialAllocator, get_serial_allocator
+from ..core.profiling import Profiler
 from ..core.validator import Validator, ValidationError
-from ..templates.bold_red import BoldRedTemplate
-from ..templates.business_card import BusinessCardTemplate
-from ..templates.classic_blue import ClassicBlueTemplate
-from ..templates.elegant_purple import ElegantPurpleTemplate
-from ..templates.minimalist_light import MinimalistLightTemplate
-from ..templates.modern_dark import ModernDarkTemplate
-from ..templates.professional_green import ProfessionalGreenTemplate
-from ..utils.config_loader import ConfigLoader
+from ..templates import TEMPLATES
+from .admission import AdmissionController, OverloadedError
+from .jobs import JobQueue, QueueFullError
+
+
+def _is_inline(args) -> bool:
+    """Check whether the client asked for the pass bytes in the response."""
+    return args.get("inline", "").lower() in ("1", "true", "yes")
+
+
+class InMemoryUploadRequest(Request):
+    """Request that keeps inline-mode uploads in memory.
+
+    Werkzeug spools uploads larger than 500KB to a temporary file; for
+    ``?inline=1`` requests they stay in a BytesIO (bounded by
+    MAX_CONTENT_LENGTH) so the pipeline never touches disk.
+    """
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if _is_inline(self.args):
+            return io.BytesIO()
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
 
 # Get the directory where this file is located
 BASE_DIR = Path(__file__).parent
 # Use absolute path for templates
 template_path = BASE_DIR / "templates"
 app = Flask(__name__, template_folder=str(template_path.resolve()))
+app.request_class = InMemoryUploadRequest
 app.secret_key = os.environ.get("SECRET_KEY", "dev-secret-key-change-in-production")
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB max file size
+# Downloads are served with strong ETags, so clients may cache them for a long time
+app.config["DOWNLOAD_MAX_AGE"] = int(os.environ.get("WALLET_CARD_DOWNLOAD_MAX_AGE", 7 * 24 * 3600))
+# Set to an nginx internal location (e.g. /protected-output) to hand downloads off
+app.config["X_ACCEL_REDIRECT_PREFIX"] = os.environ.get("WALLET_CARD_X_ACCEL_REDIRECT", "")
+# Apache/lighttpd style X-Sendfile hand-off, handled by Flask's send_file
+app.config["USE_X_SENDFILE"] = os.environ.get("WALLET_CARD_USE_X_SENDFILE", "").lower() in ("1", "true")
+
+logger = logging.getLogger(__name__)
 
 # Absolute paths & environment detection for serverless
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent.resolve()
@@ -44,6 +87,71 @@ else:
     OUTPUT_FOLDER = PROJECT_ROOT / "output"
 
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "gif"}
+PKPASS_MIMETYPE = "application/vnd.apple.pkpass"
+# Content-addressed downloads never change
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+IMAGE_MIMETYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".svg": "image/svg+xml",
+}
+
+# Indexed output directory, content-addressed pass store, upload store and
+# PassKit registry, created lazily. Creation is guarded (double-checked) so
+# concurrent first requests share one instance; reentrant because some
+# singletons build on others
+_singletons_lock = threading.RLock()
+_output_store = None
+_pass_store = None
+_blob_store = None
+_registry = None
+
+# Public base URL of the PassKit web service routes below (e.g.
+# https://cards.example.com/passkit); stored passes become updatable when set
+app.config["WEB_SERVICE_URL"] = os.environ.get("WALLET_CARD_WEB_SERVICE_URL", "").rstrip("/")
+# Registry database and latest version of every updatable pass
+app.config["PASSKIT_DIR"] = os.environ.get("WALLET_CARD_PASSKIT_DIR") or str(OUTPUT_FOLDER / ".passkit")
+# APNs endpoint (or a local stand-in) for update pushes; unset disables pushes
+app.config["APNS_URL"] = os.environ.get("WALLET_CARD_APNS_URL", "")
+_push_dispatcher = None
+
+# Prebuilt asset bundle (wallet-card assets build) supplying images not uploaded per card
+app.config["ASSET_BUNDLE"] = os.environ.get("WALLET_CARD_ASSET_BUNDLE", "")
+
+# Rendered /api/preview images, keyed by a fingerprint of config and images
+preview_cache = PreviewCache(max_entries=int(os.environ.get("WALLET_CARD_PREVIEW_CACHE_SIZE", 256)))
+
+# Generated archives, memoised by a fingerprint of config, images and signer;
+# kept in memory, and on disk when WALLET_CARD_RESULT_CACHE names a directory
+# ("1" uses <output>/.results)
+_result_cache_setting = os.environ.get("WALLET_CARD_RESULT_CACHE", "")
+if _result_cache_setting.lower() in ("1", "true", "yes"):
+    _result_cache_setting = str(OUTPUT_FOLDER / ".results")
+app.config["RESULT_CACHE_DIR"] = _result_cache_setting
+app.config["RESULT_CACHE_SIZE"] = int(os.environ.get("WALLET_CARD_RESULT_CACHE_SIZE", 64))
+_result_cache = None
+
+# Caps concurrent image processing and signing in request threads
+admission = AdmissionController(
+    max_concurrent=int(os.environ.get("WALLET_CARD_MAX_CONCURRENT", os.cpu_count() or 2)),
+    max_queue=int(os.environ.get("WALLET_CARD_MAX_QUEUE", 16)),
+    queue_timeout=float(os.environ.get("WALLET_CARD_QUEUE_TIMEOUT", 10)),
+)
+
+# Background generation jobs (see /api/jobs)
+job_queue = JobQueue(
+    max_workers=int(os.environ.get("WALLET_CARD_JOB_WORKERS", 2)),
+    max_pending=int(os.environ.get("WALLET_CARD_JOB_QUEUE_SIZE", 32)),
+)
+
+# Profile every generation (cProfile, tracemalloc and a Chrome trace per
+# request) into this directory; "1" picks a profiles/ folder next to the output
+_profile_setting = os.environ.get("WALLET_CARD_PROFILE", "")
+if _profile_setting.lower() in ("1", "true", "yes"):
+    _profile_setting = str(OUTPUT_FOLDER.parent / "profiles")
+app.config["PROFILE_DIR"] = _profile_setting
 
 # Ensure upload directory exists
 UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
@@ -68,113 +176,60 @@ def test_link():
 
 
 @app.route("/api/generate", methods=["POST"])
+@admission.limit
 def generate():
-    """Generate wallet card from form data."""
+    """Generate wallet card from form data.
+
+    With ``?inline=1`` the uploads are read straight from the request into
+    Pillow, the pass is built in memory and its bytes are returned in the
+    response, so nothing is written to disk.
+    """
+    uploads = {}
     try:
         # Get form data
         data = request.form.to_dict()
+        inline = _is_inline(request.args)
 
-        # Handle file uploads
-        assets = {}
-        for asset_type in ["icon", "logo", "photo"]:
-            if asset_type in request.files:
-                file = request.files[asset_type]
-                if file and file.filename and allowed_file(file.filename):
-                    filename = secure_filename(f"{asset_type}.{file.filename.rsplit('.', 1)[1].lower()}")
-                    filepath = UPLOAD_FOLDER / filename
-                    file.save(str(filepath))
-                    assets[asset_type] = str(filepath)
+        # Handle file uploads: inline requests read them straight from the
+        # request; otherwise they are deduplicated in the blob store
+        uploads = _read_uploads(in_memory=inline)
 
         # Build configuration
-        config = {
-            "pass": {
-                "passTypeIdentifier": data.get("passTypeIdentifier", "pass.com.example.businesscard"),
-                "serialNumber": data.get("serialNumber", "123456789"),
-                "organizationName": data.get("organizationName", "My Organization"),
-                "description": data.get("description", "Digital Business Card"),
-                "logoText": data.get("logoText", ""),
-                "foregroundColor": data.get("foregroundColor", "rgb(255,255,255)"),
-                "backgroundColor": data.get("backgroundColor", "rgb(0,77,153)"),
-                "labelColor": data.get("labelColor", "rgb(255,255,255)"),
-                "fields": {
-                    "primaryFields": [
-                        {"key": "name", "label": "Name", "value": data.get("name", "")}
-                    ],
-                    "secondaryFields": [
-                        {"key": "title", "label": "Title", "value": data.get("title", "")},
-                        {"key": "email", "label": "Email", "value": data.get("email", "")}
-                    ],
-                    "auxiliaryFields": [
-                        {"key": "phone", "label": "Phone", "value": data.get("phone", "")}
-                    ],
-                    "backFields": [
-                        {"key": "linkedin", "label": "LinkedIn", "value": data.get("linkedin", "")},
-                        {"key": "github", "label": "GitHub", "value": data.get("github", "")},
-                        {"key": "website", "label": "Website", "value": data.get("website", "")}
-                    ],
-                },
-            },
-            "assets": assets,
-            "qr_data": data.get("qr_data", data.get("website", "")),
-            "signing": {
-                "enabled": False,
-            },
-        }
-        
-        # Auto-detect and use certificate if available (use absolute paths)
-        cert_file = None
-        key_file = None
-        cert_path = PROJECT_ROOT / "signer.pem"
-        key_path = PROJECT_ROOT / "signer.key"
-
-        # For serverless environments, also allow /tmp for runtime-provided certs
-        if IS_SERVERLESS:
-            tmp_cert = Path("/tmp") / "signer.pem"
-            tmp_key = Path("/tmp") / "signer.key"
-            if tmp_cert.exists() and tmp_key.exists():
-                cert_path = tmp_cert
-                key_path = tmp_key
-        if cert_path.exists() and key_path.exists():
-            cert_file = str(cert_path)
-            key_file = str(key_path)
+        config = _build_config(data, {})
+        cert_file, key_file = _signing_files()
+        if cert_file and key_file:
             config["signing"]["enabled"] = True
             config["signing"]["cert_file"] = cert_file
             config["signing"]["key_file"] = key_file
 
-        # Validate
-        errors = Validator.validate_config(config)
+        # Get template style from form
+        template = _get_template(data.get("template_style", "classic-blue"), cert_file, key_file)
+
+        # Validate, with the form values filled into the template's fields
+        errors = Validator.validate_config(template.resolve_config(config))
         if errors:
             return jsonify({"success": False, "errors": errors}), 400
 
-        # Get template style from form
-        template_style = data.get("template_style", "classic-blue")
-        
-        # Select template based on style
-        template_classes = {
-            "classic-blue": ClassicBlueTemplate,
-            "modern-dark": ModernDarkTemplate,
-            "professional-green": ProfessionalGreenTemplate,
-            "elegant-purple": ElegantPurpleTemplate,
-            "bold-red": BoldRedTemplate,
-            "minimalist-light": MinimalistLightTemplate,
-        }
-        
-        template_class = template_classes.get(template_style, ClassicBlueTemplate)
-        # Pass absolute paths to template for Vercel compatibility
-        template = template_class(
-            assets_dir=str(UPLOAD_FOLDER),
-            output_dir=str(OUTPUT_FOLDER),
-            cert_file=cert_file,
-            key_file=key_file,
-        )
-        output_path = template.generate(config)
+        # Check if user wants QR code instead
+        output_type = data.get("output_type", "wallet")
+
+        if inline:
+            if output_type != "wallet":
+                return jsonify({"success": False, "errors": ["Inline mode only supports wallet output"]}), 400
+            with _profiled(template):
+                pass_bytes = template.generate_bytes(config, uploads)
+            filename = PassGenerator.default_filename(template.resolve_config(config))
+            return Response(
+                pass_bytes,
+                mimetype=PKPASS_MIMETYPE,
+                headers={"Content-Disposition": f'inline; filename="{filename}"'},
+            )
+
+        output_path = _store_pass(template, config, uploads)
         
         # Verify the file exists before generating QR code
         if not output_path.exists():
             return jsonify({"success": False, "errors": [f"Generated file not found: {output_path}"]}), 500
-        
-        # Check if user wants QR code instead
-        output_type = data.get("output_type", "wallet")
 
         if output_type == "qr":
             # Generate QR code that links to the Wallet pass file
@@ -205,7 +260,7 @@ def generate():
                 return jsonify({"success": False, "errors": [f"Generated pass file not found: {output_path}"]}), 500
 
             pass_url = f"http://{host}/api/download/{pass_filename}"
-            qr_path = _generate_qr_code_for_wallet(pass_url, data, OUTPUT_FOLDER)
+            qr_path = _generate_qr_code_for_wallet(pass_url, data)
             return jsonify({
                 "success": True,
                 "filename": qr_path.name,
@@ -226,169 +281,723 @@ def generate():
         return jsonify({"success": False, "errors": [str(e)]}), 400
     except Exception as e:
         return jsonify({"success": False, "errors": [str(e)]}), 500
+    finally:
+        _release_uploads(uploads)
+
+
+@app.route("/api/preview", methods=["POST"])
+@admission.limit
+def preview():
+    """Render a PNG approximation of the pass front from form data.
+
+    Takes the same fields and uploads as /api/generate. Nothing is written
+    to the output folder; previews are cached by a fingerprint of the
+    resolved configuration and images, so repeating one is a lookup.
+    """
+    try:
+        data = request.form.to_dict()
+        uploads = {}
+        for asset_type in ["icon", "logo", "photo"]:
+            file = request.files.get(asset_type)
+            if file and file.filename and allowed_file(file.filename):
+                uploads[asset_type] = file.read()
+
+        config = _build_config(data, {})
+        template = _get_template(data.get("template_style", "classic-blue"), None, None)
+        key = template.preview_key(config, uploads)
+        png, hit = preview_cache.get_or_render(key, lambda: template.preview(config, uploads))
+    except Exception as e:
+        return jsonify({"success": False, "errors": [str(e)]}), 500
+
+    response = Response(png, mimetype="image/png")
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@app.route("/api/jobs", methods=["POST"])
+def create_job():
+    """Queue wallet card generation and return a job id.
+
+    Accepts the same form as /api/generate. The pass is built on the job
+    queue's worker pool; poll /api/jobs/<id> or subscribe to
+    /api/jobs/<id>/events for progress and the download URL.
+    """
+    data = request.form.to_dict()
+    if data.get("output_type", "wallet") != "wallet":
+        return jsonify({"success": False, "errors": ["Jobs only support wallet output"]}), 400
+
+    config = _build_config(data, {})
+    cert_file, key_file = _signing_files()
+    if cert_file and key_file:
+        config["signing"].update(enabled=True, cert_file=cert_file, key_file=key_file)
+
+    template = _get_template(data.get("template_style", "classic-blue"), cert_file, key_file)
+    errors = Validator.validate_config(template.resolve_config(config))
+    if errors:
+        return jsonify({"success": False, "errors": errors}), 400
+
+    # Uploads are stored now; the request's file streams close when it returns
+    uploads = _read_uploads(in_memory=False)
+
+    def run(report):
+        try:
+            output_path = _store_pass(template, config, uploads, report)
+        finally:
+            _release_uploads(uploads)
+        return {
+            "filename": output_path.name,
+            "download_url": f"/api/download/{output_path.name}",
+        }
+
+    try:
+        job = job_queue.submit(run)
+    except QueueFullError as e:
+        _release_uploads(uploads)
+        response = jsonify({"success": False, "errors": [str(e)]})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+
+    return jsonify({
+        "success": True,
+        "job_id": job.id,
+        "status_url": f"/api/jobs/{job.id}",
+        "events_url": f"/api/jobs/{job.id}/events",
+    }), 202
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def job_status(job_id: str):
+    """Return the current state of a generation job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found", "job_id": job_id}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route("/api/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id: str):
+    """Stream job progress as Server-Sent Events."""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found", "job_id": job_id}), 404
+    return Response(
+        job_queue.events(job),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _get_output_store() -> OutputStore:
+    """Return the output store, starting its eviction janitor on first use."""
+    global _output_store
+    if _output_store is None:
+        with _singletons_lock:
+            if _output_store is None:
+                store = OutputStore(
+                    str(OUTPUT_FOLDER),
+                    ttl=float(os.environ.get("WALLET_CARD_OUTPUT_TTL", 7 * 24 * 3600)),
+                    max_bytes=int(os.environ.get("WALLET_CARD_OUTPUT_MAX_BYTES", 1024 ** 3)),
+                )
+                store.start_janitor(
+                    sweep=[(str(UPLOAD_FOLDER), float(os.environ.get("WALLET_CARD_UPLOAD_TTL", 3600)))],
+                    # Drop stored objects once their published names are evicted, and
+                    # uploads no request has referenced for a while
+                    tasks=[lambda: _get_pass_store().prune(), lambda: _get_blob_store().collect()],
+                )
+                _output_store = store
+    return _output_store
+
+
+def _get_pass_store() -> PassStore:
+    """Return the content-addressed pass store."""
+    global _pass_store
+    if _pass_store is None:
+        with _singletons_lock:
+            if _pass_store is None:
+                _pass_store = PassStore(os.environ.get("WALLET_CARD_PASS_STORE") or str(OUTPUT_FOLDER / ".objects"))
+    return _pass_store
+
+
+def _get_registry() -> PassRegistry:
+    """Return the PassKit web service registry."""
+    global _registry
+    if _registry is None:
+        with _singletons_lock:
+            if _registry is None:
+                _registry = PassRegistry(str(Path(app.config["PASSKIT_DIR"]) / "registry.sqlite3"))
+    return _registry
+
+
+def _get_blob_store() -> BlobStore:
+    """Return the deduplicating upload store."""
+    global _blob_store
+    if _blob_store is None:
+        with _singletons_lock:
+            if _blob_store is None:
+                _blob_store = BlobStore(str(UPLOAD_FOLDER / "blobs"))
+    return _blob_store
+
+
+def _get_result_cache() -> ResultCache:
+    """Return the generation result cache, creating it on first use."""
+    global _result_cache
+    if _result_cache is None:
+        with _singletons_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(
+                    root=app.config["RESULT_CACHE_DIR"] or None,
+                    max_entries=app.config["RESULT_CACHE_SIZE"],
+                )
+    return _result_cache
+
+
+def _get_serials() -> SerialAllocator:
+    """Return the serial allocator (block counter next to the registry)."""
+    return get_serial_allocator(str(Path(app.config["PASSKIT_DIR"]) / "serials.sqlite3"))
+
+
+def _read_uploads(in_memory: bool) -> dict:
+    """Collect allowed image uploads from the current request.
+
+    Args:
+        in_memory: Return the request streams as-is instead of storing them
+
+    Returns:
+        Mapping of asset type to image source
+    """
+    uploads = {}
+    for asset_type in ["icon", "logo", "photo"]:
+        file = request.files.get(asset_type)
+        if file and file.filename and allowed_file(file.filename):
+            if in_memory:
+                uploads[asset_type] = file.stream
+            else:
+                uploads[asset_type] = _get_blob_store().put_stream(file.stream)
+    return uploads
+
+
+def _release_uploads(uploads: dict) -> None:
+    """Drop references taken on stored uploads."""
+    for source in uploads.values():
+        if isinstance(source, Blob):
+            source.release()
+
+
+def _store_pass(template, config: dict, uploads=None, progress=None, auth_token=None) -> Path:
+    """Build a pass, store it by content and publish it in the output folder.
+
+    The published name carries a prefix of the content key, so different
+    passes with the same description never overwrite each other. With a
+    web service URL configured, the pass is also recorded as the latest
+    version of its serial number.
+
+    Args:
+        template: Template building the pass
+        config: Pass configuration
+        uploads: Uploaded images
+        progress: Optional progress callback
+        auth_token: Current token of the pass being updated, once the
+            caller has checked it; None issues a new pass
+    """
+    updatable = _attach_web_service(config, auth_token)
+    with _profiled(template):
+        pass_bytes = template.generate_bytes(config, uploads, progress)
+    pass_store = _get_pass_store()
+    key = pass_store.put(pass_bytes)
+    resolved = template.resolve_config(config)
+    filename = PassGenerator.default_filename(resolved, key)
+    output_path = pass_store.publish(key, OUTPUT_FOLDER / filename)
+    _get_output_store().record(filename, key, len(pass_bytes))
+    if updatable:
+        _record_update(resolved["pass"], key)
+    return output_path
+
+
+def _attach_web_service(config: dict, auth_token=None) -> bool:
+    """Point a pass at the PassKit web service, if one is configured.
+
+    A new pass always gets a serial number and token issued here: a
+    submitted serial is ignored, so nobody can claim the serial of a pass
+    issued to someone else and take over its devices. Updates keep the
+    serial and token, since registered devices authenticate with it.
+
+    Args:
+        config: Pass configuration, updated in place
+        auth_token: Token of the pass being updated, or None for a new pass
+
+    Returns:
+        Whether the pass will be updatable
+    """
+    url = app.config["WEB_SERVICE_URL"]
+    if not url:
+        return False
+    if auth_token is None:
+        config["pass"]["serialNumber"] = literal(_get_serials().allocate())
+        auth_token = secrets.token_urlsafe(24)
+    config["pass"]["webServiceURL"] = url
+    config["pass"]["authenticationToken"] = auth_token
+    return True
+
+
+def _record_update(pass_config: dict, key: str) -> None:
+    """Make a stored pass the latest version of its serial number."""
+    pass_type_id = pass_config["passTypeIdentifier"]
+    serial = pass_config["serialNumber"]
+    # A link of its own keeps the object alive after its output name is evicted
+    _get_pass_store().publish(key, _latest_pass_path(pass_type_id, serial))
+    _get_registry().update_pass(pass_type_id, serial, pass_config["authenticationToken"], key)
+    # Devices holding the pass fetch the new version once pushed
+    dispatcher = _get_push_dispatcher()
+    if dispatcher is not None:
+        dispatcher.submit(pass_type_id, [serial])
+
+
+def _get_push_dispatcher():
+    """Return the update push dispatcher, or None if pushes are disabled."""
+    global _push_dispatcher
+    if _push_dispatcher is None and app.config["APNS_URL"]:
+        from ..core.push import HTTPPushTransport, PushDispatcher, PushFanout
+
+        with _singletons_lock:
+            if _push_dispatcher is None:
+                cert_file, key_file = _signing_files()
+                transport = HTTPPushTransport(
+                    app.config["APNS_URL"],
+                    cert_file=os.environ.get("WALLET_CARD_APNS_CERT") or cert_file,
+                    key_file=os.environ.get("WALLET_CARD_APNS_KEY") or key_file,
+                )
+                fanout = PushFanout(
+                    _get_registry(),
+                    transport,
+                    connections=int(os.environ.get("WALLET_CARD_PUSH_CONNECTIONS", 4)),
+                    rate=float(os.environ.get("WALLET_CARD_PUSH_RATE", 0)) or None,
+                )
+                _push_dispatcher = PushDispatcher(fanout)
+    return _push_dispatcher
+
+
+def _latest_pass_path(pass_type_id: str, serial: str) -> Path:
+    """Return where the latest version of a pass is kept."""
+    name = hashlib.sha256(f"{pass_type_id}/{serial}".encode("utf-8")).hexdigest()[:32]
+    directory = Path(app.config["PASSKIT_DIR"]) / "passes"
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{name}.pkpass"
+
+
+@contextmanager
+def _profiled(template):
+    """Profile the block when WALLET_CARD_PROFILE is set.
+
+    Profiles are serialized (cProfile and tracemalloc are process-wide), so
+    only enable this while diagnosing.
+    """
+    profile_dir = app.config["PROFILE_DIR"]
+    if not profile_dir:
+        yield
+        return
+
+    profiler = Profiler()
+    try:
+        with profiler.activate():
+            yield
+    finally:
+        prefix = f"{time.strftime('%Y%m%d-%H%M%S')}-{template.template_name()}-{uuid.uuid4().hex[:8]}"
+        try:
+            profiler.write(profile_dir, prefix)
+        except OSError:
+            logger.exception("Failed to write profile %s", prefix)
+
+
+# Form fields filling the templates' placeholders ("{name}", "{email}", ...)
+FIELD_DATA_KEYS = ("name", "title", "email", "phone", "linkedin", "github", "website")
+
+
+def _build_config(data: dict, assets: dict) -> dict:
+    """Map submitted form fields to a pass configuration.
+
+    Personal values go to the ``data`` section and fill the template's
+    field placeholders; the other values are used verbatim.
+    """
+    config = {
+        "pass": {
+            "passTypeIdentifier": literal(data.get("passTypeIdentifier", "pass.com.example.businesscard")),
+            "serialNumber": literal(data.get("serialNumber", "")),
+            "organizationName": literal(data.get("organizationName", "My Organization")),
+            "description": literal(data.get("description", "Digital Business Card")),
+            "logoText": literal(data.get("logoText", "")),
+            "foregroundColor": literal(data.get("foregroundColor", "rgb(255,255,255)")),
+            "backgroundColor": literal(data.get("backgroundColor", "rgb(0,77,153)")),
+            "labelColor": literal(data.get("labelColor", "rgb(255,255,255)")),
+        },
+        "data": {key: data.get(key, "") for key in FIELD_DATA_KEYS},
+        "assets": assets,
+        "signing": {
+            "enabled": False,
+        },
+    }
+    if "qr_data" in data:
+        config["qr_data"] = literal(data["qr_data"])
+    return config
+
+
+def _signing_files():
+    """Auto-detect the signing certificate and key (absolute paths).
+
+    Returns:
+        Tuple of (cert_file, key_file), both None if not available
+    """
+    cert_path = PROJECT_ROOT / "signer.pem"
+    key_path = PROJECT_ROOT / "signer.key"
+
+    # For serverless environments, also allow /tmp for runtime-provided certs
+    if IS_SERVERLESS:
+        tmp_cert = Path("/tmp") / "signer.pem"
+        tmp_key = Path("/tmp") / "signer.key"
+        if tmp_cert.exists() and tmp_key.exists():
+            cert_path = tmp_cert
+            key_path = tmp_key
+    if cert_path.exists() and key_path.exists():
+        return str(cert_path), str(key_path)
+    return None, None
+
+
+def _get_template(template_style: str, cert_file, key_file):
+    """Instantiate the template for a style name."""
+    # Template modules are imported on first use of each style
+    template_class = TEMPLATES.get(template_style) or TEMPLATES["classic-blue"]
+    bundle_path = app.config["ASSET_BUNDLE"]
+    # Pass absolute paths to template for Vercel compatibility
+    return template_class(
+        assets_dir=str(UPLOAD_FOLDER),
+        output_dir=str(OUTPUT_FOLDER),
+        cert_file=cert_file,
+        key_file=key_file,
+        bundle=load_bundle(bundle_path) if bundle_path else None,
+        result_cache=_get_result_cache(),
+        serials=_get_serials(),
+    )
 
 
 @app.route("/api/download/<filename>")
 def download(filename: str):
     """Download generated .pkpass or QR code file."""
-    # Use absolute path from project root
-    filepath = OUTPUT_FOLDER / secure_filename(filename)
-    
-    # Debug: log the request
-    import logging
-    logger = logging.getLogger(__name__)
-    if not logger.handlers:
-        logging.basicConfig(level=logging.INFO)
-    logger.info(f"Download request: filename={filename}, path={filepath}, exists={filepath.exists()}, suffix={filepath.suffix}")
-    
-    if not filepath.exists():
-        # Try to find the file without secure_filename (in case it was already sanitized)
-        alt_filepath = OUTPUT_FOLDER / filename
-        if alt_filepath.exists():
-            filepath = alt_filepath
-        else:
-            # List available files for debugging
-            available_files = list(OUTPUT_FOLDER.glob("*.pkpass")) if OUTPUT_FOLDER.exists() else []
-            return jsonify({
-                "error": "File not found",
-                "searched_path": str(filepath),
-                "alt_path": str(alt_filepath),
-                "requested_filename": filename,
-                "available_files": [f.name for f in available_files]
-            }), 404
-    
-    # Handle .pkpass files
-    if filepath.suffix.lower() == ".pkpass" or filename.endswith(".pkpass"):
+    path = safe_join(str(OUTPUT_FOLDER), filename)
+    if path is None or not os.path.isfile(path):
+        return jsonify({"error": "File not found", "requested_filename": filename}), 404
+
+    filepath = Path(path)
+    response = _send_download(filepath, app.config["DOWNLOAD_MAX_AGE"])
+    if response.status_code < 400:
+        _get_output_store().touch(filepath.name)
+    return response
+
+
+@app.route("/api/passes/<key>")
+def download_by_key(key: str):
+    """Download a pass by its content key.
+
+    Stored objects never change, so responses may be cached indefinitely.
+    """
+    path = _get_pass_store().get(key)
+    if path is None:
+        return jsonify({"error": "Pass not found", "key": key}), 404
+    response = _send_download(path, IMMUTABLE_MAX_AGE)
+    response.cache_control.immutable = True
+    return response
+
+
+def _send_download(filepath: Path, max_age: int):
+    """Serve a stored file with conditional request and Range support."""
+    path = str(filepath)
+    suffix = filepath.suffix.lower()
+    if suffix == ".pkpass":
         # For Safari on iPhone: don't force download, let Safari handle it
         # Safari will automatically prompt "Add to Wallet" when it detects .pkpass
-        from flask import Response
-        try:
-            with open(filepath, 'rb') as f:
-                data = f.read()
-            
-            response = Response(
-                data,
-                mimetype="application/vnd.apple.pkpass",
-                headers={
-                    "Content-Disposition": f'inline; filename="{filename}"',
-                    "Content-Type": "application/vnd.apple.pkpass",
-                }
-            )
-            return response
-        except Exception as e:
-            logger.error(f"Error reading file: {e}")
-            return jsonify({"error": f"Error reading file: {str(e)}"}), 500
-    
-    # Handle image files (QR code)
-    if filepath.suffix.lower() in [".png", ".jpg", ".jpeg", ".gif"]:
-        return send_file(
-            str(filepath),
-            mimetype=f"image/{filepath.suffix[1:].lower()}",
-            as_attachment=True,
-            download_name=filename
+        mimetype = PKPASS_MIMETYPE
+        as_attachment = False
+    elif suffix in IMAGE_MIMETYPES:
+        mimetype = IMAGE_MIMETYPES[suffix]
+        as_attachment = True
+    else:
+        logger.warning("Unsupported download type %s for %s", suffix, filepath.name)
+        return jsonify({
+            "error": "Unsupported file type",
+            "filename": filepath.name,
+            "extension": filepath.suffix,
+        }), 400
+
+    stat = filepath.stat()
+    etag = _content_etag(path, stat.st_mtime_ns, stat.st_size)
+
+    accel_prefix = app.config["X_ACCEL_REDIRECT_PREFIX"]
+    try:
+        accel_name = filepath.relative_to(OUTPUT_FOLDER).as_posix()
+    except ValueError:
+        # Outside the location nginx maps; serve it ourselves
+        accel_name = None
+    if accel_prefix and accel_name:
+        # Hand the transfer off to the fronting nginx; it serves the body and
+        # any Range requests straight from disk.
+        response = Response(mimetype=mimetype)
+        response.headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{accel_name}"
+        response.headers["Content-Disposition"] = (
+            f'{"attachment" if as_attachment else "inline"}; filename="{filepath.name}"'
         )
-    
-    # If we get here, log what we're trying to serve
-    logger.warning(f"Unsupported file type: {filepath.suffix}, filename: {filename}, path: {filepath}")
-    return jsonify({
-        "error": "Unsupported file type",
-        "filename": filename,
-        "extension": filepath.suffix,
-        "path": str(filepath)
-    }), 400
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        return response.make_conditional(request)
+
+    # send_file streams through the WSGI file wrapper (sendfile where the
+    # server supports it) and handles If-None-Match / Range for us.
+    return send_file(
+        path,
+        mimetype=mimetype,
+        as_attachment=as_attachment,
+        download_name=filepath.name,
+        conditional=True,
+        etag=etag,
+        max_age=max_age,
+    )
+
+
+@lru_cache(maxsize=4096)
+def _content_etag(path: str, mtime_ns: int, size: int) -> str:
+    """Return a strong ETag for a file version.
 
+    The digest is keyed by path, mtime and size, so each version of a file
+    is hashed once and repeat downloads skip reading it entirely.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-def _generate_qr_code_for_wallet(pass_url: str, data: dict, output_dir: Path) -> Path:
+
+def _generate_qr_code_for_wallet(pass_url: str, data: dict) -> Path:
     """Generate QR code that links to Wallet pass file."""
+    # Pillow and qrcode load on the first QR request, not at startup
+    from ..core.share_card import get_share_card_renderer
+
     name = data.get("name", "")
-    title = data.get("title", "")
     email = data.get("email", "")
     phone = data.get("phone", "")
     website = data.get("website", "")
-    
-    # Generate QR code with the Wallet pass URL
+
     # When scanned, iPhone will open the .pkpass file
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_M,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(pass_url)
-    qr.make(fit=True)
-    
-    # Create QR code image
-    qr_img = qr.make_image(fill_color="black", back_color="white")
-    
-    # Create business card image
-    card_width = 800
-    card_height = 500
-    card = Image.new('RGB', (card_width, card_height), color='white')
-    draw = ImageDraw.Draw(card)
-    
-    # Try to use a nice font
-    try:
-        font_large = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 36)
-        font_medium = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 24)
-        font_small = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 18)
-        font_tiny = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 14)
-    except:
-        font_large = ImageFont.load_default()
-        font_medium = ImageFont.load_default()
-        font_small = ImageFont.load_default()
-        font_tiny = ImageFont.load_default()
-    
-    # Add QR code (left side)
-    qr_size = 300
-    qr_resized = qr_img.resize((qr_size, qr_size))
-    card.paste(qr_resized, (50, 100))
-    
-    # Add text (right side)
-    y_pos = 100
-    draw.text((400, y_pos), name, fill='black', font=font_large)
-    y_pos += 50
-    if title:
-        draw.text((400, y_pos), title, fill='gray', font=font_medium)
-        y_pos += 60
+    lines = []
     if email:
-        draw.text((400, y_pos), f"📧 {email}", fill='black', font=font_small)
-        y_pos += 40
+        lines.append((f"📧 {email}", "black"))
     if phone:
-        draw.text((400, y_pos), f"📱 {phone}", fill='black', font=font_small)
-        y_pos += 40
+        lines.append((f"📱 {phone}", "black"))
     if website:
-        draw.text((400, y_pos), f"🌐 {website}", fill='blue', font=font_small)
-        y_pos += 40
-    
-    # Add instruction text
-    y_pos += 20
-    draw.text((400, y_pos), "📱 Scan to add to Wallet", fill='green', font=font_small)
-    y_pos += 30
-    draw.text((400, y_pos), "Open in Safari on iPhone", fill='gray', font=font_tiny)
-    
+        lines.append((f"🌐 {website}", "blue"))
+    renderer = get_share_card_renderer()
+    with metrics.stage("qr_code"):
+        if data.get("qr_format") == "svg":
+            # Vector output: no rasterizing, a fraction of the bytes, prints at any size
+            extension = "svg"
+            content = renderer.render_svg(pass_url, name, data.get("title", ""), lines, layout="wallet").encode()
+        else:
+            extension = "png"
+            content = renderer.render_png(pass_url, name, data.get("title", ""), lines, layout="wallet")
+
     # Save
     safe_name = "".join(c if c.isalnum() or c in ("-", "_") else "_" for c in name) if name else "business_card"
-    output_file = output_dir / f"{safe_name}_qr.png"
-    card.save(output_file)
-    
-    return output_file
+    return _get_output_store().put(f"{safe_name}_qr.{extension}", content)
 
 
 @app.route("/api/files", methods=["GET"])
 def list_files():
-    """List available .pkpass files for debugging."""
-    output_dir = OUTPUT_FOLDER
-    
-    if not output_dir.exists():
-        return jsonify({"files": [], "error": "Output directory not found"})
-    
-    files = list(output_dir.glob("*.pkpass"))
+    """List generated files from the output index, newest first.
+
+    Query parameters ``limit`` (max 500) and ``cursor`` page through the
+    listing; pass the returned ``next_cursor`` to fetch the next page.
+    """
+    store = _get_output_store()
+    limit = min(max(request.args.get("limit", 100, type=int), 1), 500)
+    try:
+        entries, next_cursor = store.list(limit=limit, cursor=request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"success": False, "errors": [str(e)]}), 400
     return jsonify({
-        "files": [f.name for f in files],
-        "count": len(files)
+        "files": [entry["filename"] for entry in entries],
+        "entries": entries,
+        "count": store.stats()["count"],
+        "next_cursor": next_cursor,
     })
 
 
+@app.route("/api/admission", methods=["GET"])
+def admission_stats():
+    """Report request admission and job queue load."""
+    return jsonify({"admission": admission.stats(), "jobs": job_queue.stats()})
+
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Expose pipeline, cache and queue metrics in Prometheus text format."""
+    return Response(metrics.REGISTRY.expose(), mimetype="text/plain; version=0.0.4")
+
+
+def _gauges(stats: dict) -> dict:
+    """Turn a flat stats dictionary into (name,) -> value samples."""
+    return {(name,): value for name, value in stats.items()}
+
+
+metrics.REGISTRY.register(metrics.CallbackMetric(
+    "wallet_card_admission",
+    "Admission control gauges and counters for /api/generate.",
+    "gauge",
+    ("stat",),
+    lambda: _gauges(admission.stats()),
+))
+metrics.REGISTRY.register(metrics.CallbackMetric(
+    "wallet_card_jobs",
+    "Background job queue depth.",
+    "gauge",
+    ("stat",),
+    lambda: _gauges(job_queue.stats()),
+))
+metrics.REGISTRY.register(metrics.CallbackMetric(
+    "wallet_card_output_files",
+    "Indexed generated files (count and bytes).",
+    "gauge",
+    ("stat",),
+    lambda: _gauges(_get_output_store().stats()),
+))
+metrics.REGISTRY.register(metrics.CallbackMetric(
+    "wallet_card_preview_cache",
+    "Preview cache size and lookups.",
+    "gauge",
+    ("stat",),
+    lambda: _gauges(preview_cache.stats()),
+))
+metrics.REGISTRY.register(metrics.CallbackMetric(
+    "wallet_card_result_cache",
+    "Generation result cache hits, misses and size.",
+    "gauge",
+    ("stat",),
+    lambda: _gauges(_get_result_cache().stats()),
+))
+metrics.register_lru_cache("download_etag", _content_etag)
+
+
+@app.errorhandler(OverloadedError)
+def overloaded(error: OverloadedError):
+    """Reject requests quickly when the server is saturated."""
+    response = jsonify({"success": False, "errors": [str(error)]})
+    response.headers["Retry-After"] = str(error.retry_after)
+    return response, 503
+
+
+def _apple_pass_token():
+    """Return the token from an ``Authorization: ApplePass <token>`` header."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return token.strip() if scheme == "ApplePass" else None
+
+
+@app.route("/passkit/v1/devices/<device_id>/registrations/<pass_type_id>/<serial>", methods=["POST", "DELETE"])
+def passkit_registration(device_id: str, pass_type_id: str, serial: str):
+    """Register or unregister a device for updates to a pass."""
+    registry = _get_registry()
+    if registry.authenticate(pass_type_id, serial, _apple_pass_token()) is None:
+        return "", 401
+    if request.method == "DELETE":
+        registry.unregister_device(device_id, pass_type_id, serial)
+        return "", 200
+
+    push_token = (request.get_json(silent=True) or {}).get("pushToken")
+    if not push_token:
+        return "", 400
+    created = registry.register_device(device_id, push_token, pass_type_id, serial)
+    return "", 201 if created else 200
+
+
+@app.route("/passkit/v1/devices/<device_id>/registrations/<pass_type_id>", methods=["GET"])
+def passkit_updated_serials(device_id: str, pass_type_id: str):
+    """List serial numbers of a device's passes changed since a tag."""
+    since = request.args.get("passesUpdatedSince", type=int)
+    serials, last_updated = _get_registry().updated_serials(device_id, pass_type_id, since)
+    if not serials:
+        return "", 204
+    return jsonify({"serialNumbers": serials, "lastUpdated": str(last_updated)})
+
+
+@app.route("/passkit/v1/passes/<pass_type_id>/<serial>", methods=["GET"])
+def passkit_latest_pass(pass_type_id: str, serial: str):
+    """Send the latest version of a pass (304 if not modified)."""
+    entry = _get_registry().authenticate(pass_type_id, serial, _apple_pass_token())
+    if entry is None:
+        return "", 401
+    path = _latest_pass_path(pass_type_id, serial)
+    if not path.is_file():
+        return "", 404
+    return send_file(
+        path,
+        mimetype=PKPASS_MIMETYPE,
+        last_modified=entry["updated_at"] / 1e6,
+        conditional=True,
+        etag=False,
+        max_age=0,
+    )
+
+
+@app.route("/api/passes/<pass_type_id>/<serial>", methods=["POST"])
+@admission.limit
+def update_pass(pass_type_id: str, serial: str):
+    """Replace an updatable pass with a new version.
+
+    Takes the same form as /api/generate and the pass's current token in
+    an ``Authorization: ApplePass <token>`` header. The new version keeps
+    the serial number and token, becomes the latest pass and is pushed to
+    registered devices.
+    """
+    if not app.config["WEB_SERVICE_URL"]:
+        return jsonify({"success": False, "errors": ["Web service is not configured"]}), 404
+    entry = _get_registry().authenticate(pass_type_id, serial, _apple_pass_token())
+    if entry is None:
+        return jsonify({"success": False, "errors": ["Invalid pass or token"]}), 401
+
+    uploads = {}
+    try:
+        data = dict(request.form.to_dict(), passTypeIdentifier=pass_type_id, serialNumber=serial)
+        config = _build_config(data, {})
+        cert_file, key_file = _signing_files()
+        if cert_file and key_file:
+            config["signing"].update(enabled=True, cert_file=cert_file, key_file=key_file)
+
+        template = _get_template(data.get("template_style", "classic-blue"), cert_file, key_file)
+        errors = Validator.validate_config(template.resolve_config(config))
+        if errors:
+            return jsonify({"success": False, "errors": errors}), 400
+
+        uploads = _read_uploads(in_memory=False)
+        output_path = _store_pass(template, config, uploads, auth_token=entry["auth_token"])
+        return jsonify({
+            "success": True,
+            "filename": output_path.name,
+            "download_url": f"/api/download/{output_path.name}",
+            "type": "wallet",
+        })
+    except ValidationError as e:
+        return jsonify({"success": False, "errors": [str(e)]}), 400
+    except Exception as e:
+        return jsonify({"success": False, "errors": [str(e)]}), 500
+    finally:
+        _release_uploads(uploads)
+
+
+@app.route("/passkit/v1/log", methods=["POST"])
+def passkit_log():
+    """Record error messages reported by devices."""
+    for message in (request.get_json(silent=True) or {}).get("logs", []):
+        logger.warning("PassKit device log: %s", message)
+    return "", 200
+
+
 @app.route("/api/validate", methods=["POST"])
 def validate():
     """Validate configuration."""
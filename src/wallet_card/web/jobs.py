@@ -0,0 +1,227 @@
+"""In-process job queue for asynchronous pass generation."""
+
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional
+
+# A job body receives a progress callback: report(stage, fraction)
+ProgressCallback = Callable[[str, float], None]
+JobFunction = Callable[[ProgressCallback], Dict[str, Any]]
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more work."""
+
+    pass
+
+
+class Job:
+    """State of a single generation job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    def __init__(self, job_id: str):
+        """Initialize job.
+
+        Args:
+            job_id: Unique job identifier
+        """
+        self.id = job_id
+        self.status = self.QUEUED
+        self.stage = "queued"
+        self.progress = 0.0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.updated = self.created
+        # Incremented on every change so waiters can detect updates
+        self.version = 0
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job has reached a terminal state."""
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize job state for JSON responses.
+
+        Returns:
+            Job state dictionary
+        """
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": round(self.progress, 3),
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Bounded in-process job queue backed by a thread pool.
+
+    Jobs run on a fixed number of worker threads; at most ``max_pending``
+    jobs may be queued or running at once, after which submissions are
+    rejected with QueueFullError. Finished jobs are kept for ``retention``
+    seconds so clients can collect their results.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32, retention: float = 600.0):
+        """Initialize job queue.
+
+        Args:
+            max_workers: Number of worker threads
+            max_pending: Maximum number of unfinished jobs
+            retention: Seconds to keep finished jobs
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="wallet-card-job"
+        )
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending = 0
+        self._cond = threading.Condition()
+
+    def submit(self, fn: JobFunction) -> Job:
+        """Queue a job.
+
+        Args:
+            fn: Job body; called with a progress callback, returns the result
+
+        Returns:
+            The queued job
+
+        Raises:
+            QueueFullError: If max_pending jobs are already unfinished
+        """
+        with self._cond:
+            self._prune()
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({self.max_pending} pending jobs)")
+            job = Job(uuid.uuid4().hex)
+            self._jobs[job.id] = job
+            self._pending += 1
+
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            Job or None if unknown or expired
+        """
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def wait(self, job: Job, version: int, timeout: float) -> Dict[str, Any]:
+        """Block until the job changes past ``version`` or the timeout expires.
+
+        Args:
+            job: Job to watch
+            version: Last version seen by the caller
+            timeout: Maximum seconds to wait
+
+        Returns:
+            Snapshot of the job state including its version
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: job.version > version, timeout=timeout)
+            return dict(job.to_dict(), version=job.version)
+
+    def events(self, job: Job, heartbeat: float = 15.0) -> Iterator[str]:
+        """Stream job updates as Server-Sent Events.
+
+        Args:
+            job: Job to watch
+            heartbeat: Seconds between keep-alive comments
+
+        Yields:
+            SSE-formatted messages; the stream ends once the job finishes
+        """
+        version = -1
+        while True:
+            state = self.wait(job, version, heartbeat)
+            if state["version"] == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = state.pop("version")
+            event = "done" if state["status"] in (Job.SUCCEEDED, Job.FAILED) else "progress"
+            yield f"event: {event}\ndata: {json.dumps(state)}\n\n"
+            if event == "done":
+                return
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue depth counters.
+
+        Returns:
+            Dictionary with queued, running and pending job counts
+        """
+        with self._cond:
+            queued = sum(1 for job in self._jobs.values() if job.status == Job.QUEUED)
+            running = sum(1 for job in self._jobs.values() if job.status == Job.RUNNING)
+            return {
+                "queued": queued,
+                "running": running,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "workers": self.max_workers,
+            }
+
+    def _run(self, job: Job, fn: JobFunction) -> None:
+        """Execute a job on a worker thread."""
+
+        def report(stage: str, progress: float) -> None:
+            self._update(job, stage=stage, progress=progress)
+
+        self._update(job, status=Job.RUNNING, stage="started")
+        try:
+            result = fn(report)
+        except Exception as e:
+            self._finish(job, status=Job.FAILED, stage="failed", error=str(e))
+        else:
+            self._finish(job, status=Job.SUCCEEDED, stage="done", progress=1.0, result=result)
+
+    def _finish(self, job: Job, **changes: Any) -> None:
+        """Release the job's pending slot and publish its terminal state.
+
+        Both happen under one lock hold, so a waiter woken by the final
+        state never sees the job still counted as pending.
+        """
+        with self._cond:
+            self._pending -= 1
+            self._update(job, **changes)
+
+    def _update(self, job: Job, **changes: Any) -> None:
+        """Apply changes to a job and wake up waiters."""
+        with self._cond:
+            for name, value in changes.items():
+                setattr(job, name, value)
+            job.updated = time.time()
+            job.version += 1
+            self._cond.notify_all()
+
+    def _prune(self) -> None:
+        """Drop finished jobs older than the retention period.
+
+        Must be called with the lock held.
+        """
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self._jobs.items() if job.finished and job.updated < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,64 @@
+"""Tests for web admission control."""
+
+import threading
+
+import pytest
+from wallet_card.web.admission import AdmissionController, OverloadedError
+
+
+class TestAdmissionController:
+    """Test AdmissionController class."""
+
+    def test_admits_up_to_limit(self):
+        """Test that requests within the limit run immediately."""
+        controller = AdmissionController(max_concurrent=2, max_queue=0)
+
+        with controller.admit():
+            with controller.admit():
+                assert controller.stats()["active"] == 2
+
+        assert controller.stats()["active"] == 0
+        assert controller.stats()["admitted_total"] == 2
+
+    def test_rejects_when_queue_full(self):
+        """Test that excess requests fail fast with a retry hint."""
+        controller = AdmissionController(max_concurrent=1, max_queue=0)
+
+        with controller.admit():
+            with pytest.raises(OverloadedError) as excinfo:
+                with controller.admit():
+                    pass
+
+        assert excinfo.value.retry_after >= 1
+        assert controller.stats()["rejected_total"] == 1
+
+    def test_queue_deadline(self):
+        """Test that waiting requests give up after the queue timeout."""
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+
+        with controller.admit():
+            with pytest.raises(OverloadedError):
+                with controller.admit():
+                    pass
+
+        assert controller.stats()["timed_out_total"] == 1
+
+    def test_waiter_admitted_when_slot_frees(self):
+        """Test that a queued request runs once capacity is released."""
+        controller = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=5)
+        entered = threading.Event()
+        release = threading.Event()
+
+        def hold():
+            with controller.admit():
+                entered.set()
+                release.wait(5)
+
+        holder = threading.Thread(target=hold)
+        holder.start()
+        entered.wait(5)
+        threading.Timer(0.05, release.set).start()
+
+        with controller.admit():
+            assert controller.stats()["active"] == 1
+        holder.join()
@@ -0,0 +1,110 @@
+"""Tests for prebuilt asset bundles."""
+
+import io
+import json
+import zipfile
+
+import pytest
+from click.testing import CliRunner
+from PIL import Image
+
+from wallet_card.cli.commands import main
+from wallet_card.core.asset_bundle import AssetBundle, build_bundle
+from wallet_card.core.pass_generator import PassGenerator
+
+
+@pytest.fixture
+def logo(tmp_path):
+    """Write a source logo larger than the pass logo size."""
+    path = tmp_path / "logo.png"
+    Image.new("RGB", (900, 300), "red").save(path)
+    return str(path)
+
+
+def _config():
+    """Build a minimal valid configuration."""
+    return {
+        "pass": {
+            "description": "Bundled",
+            "organizationName": "Test Org",
+            "passTypeIdentifier": "pass.test.card",
+        },
+    }
+
+
+class TestAssetBundle:
+    """Test building and loading bundles."""
+
+    def test_build_is_versioned_by_content(self, tmp_path, logo):
+        """Test that identical inputs produce the same bundle version."""
+        first = build_bundle(str(tmp_path / "bundles"), "classic_blue", "Acme Inc", {"logo": logo})
+        second = build_bundle(str(tmp_path / "bundles"), "classic_blue", "Acme Inc", {"logo": logo})
+
+        assert first.version == second.version
+        assert first.path.parent == tmp_path / "bundles" / "acme-inc" / "classic_blue"
+        assert set(first.files) == {"icon.png", "logo.png", "strip.png"}
+        assert Image.open(io.BytesIO(first.files["logo.png"])).size == (320, 100)
+
+        other = build_bundle(
+            str(tmp_path / "bundles"), "classic_blue", "Acme Inc", {"logo": logo},
+            defaults={"pass": {"organizationName": "Acme"}},
+        )
+        assert other.version != first.version
+
+    def test_tampered_file_rejected(self, tmp_path, logo):
+        """Test that loading checks files against their digests."""
+        bundle = build_bundle(str(tmp_path), "classic_blue", "Acme", {"logo": logo})
+        (bundle.path / "logo.png").write_bytes(b"not the logo")
+
+        with pytest.raises(ValueError, match="logo.png"):
+            AssetBundle(str(bundle.path))
+
+
+class TestBundledGeneration:
+    """Test passes generated from a bundle."""
+
+    def test_bundle_replaces_image_work(self, tmp_path, logo, monkeypatch):
+        """Test that bundled images are used as-is, with their digests."""
+        bundle = build_bundle(str(tmp_path / "bundles"), "classic_blue", "Acme", {"logo": logo})
+        generator = PassGenerator(output_dir=str(tmp_path / "output"), bundle=bundle)
+
+        def fail(source=None):
+            raise AssertionError("asset prepared despite bundle")
+
+        for name in ("prepare_icon_bytes", "prepare_logo_bytes", "prepare_photo_bytes"):
+            monkeypatch.setattr(generator.asset_manager, name, fail)
+
+        with zipfile.ZipFile(io.BytesIO(generator.generate_bytes(_config()))) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            assert archive.read("logo.png") == bundle.files["logo.png"]
+        assert manifest["logo.png"] == bundle.digests["logo.png"]
+
+    def test_uploads_override_bundle(self, tmp_path, logo):
+        """Test that per-pass images still take precedence."""
+        bundle = build_bundle(str(tmp_path / "bundles"), "classic_blue", "Acme", {"logo": logo})
+        generator = PassGenerator(output_dir=str(tmp_path / "output"), bundle=bundle)
+        photo = io.BytesIO()
+        Image.new("RGB", (400, 400), "blue").save(photo, "PNG")
+
+        data = generator.generate_bytes(_config(), uploads={"photo": photo.getvalue()})
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            assert archive.read("logo.png") == bundle.files["logo.png"]
+            assert archive.read("strip.png") != bundle.files["strip.png"]
+
+    def test_cli_build_and_generate(self, tmp_path, logo, monkeypatch):
+        """Test wallet-card assets build and generate --bundle."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "org.json").write_text(json.dumps({"pass": {"organizationName": "Acme", "logoText": "Acme"}}))
+        runner = CliRunner()
+
+        result = runner.invoke(main, ["assets", "build", "--org", "Acme", "--logo", logo, "-c", "org.json"])
+        assert result.exit_code == 0, result.output
+        bundle_dir = next((tmp_path / "bundles" / "acme" / "classic_blue").iterdir())
+
+        result = runner.invoke(main, ["generate", "--bundle", str(bundle_dir), "-o", "card.pkpass"])
+        assert result.exit_code == 0, result.output
+        with zipfile.ZipFile(tmp_path / "output" / "card.pkpass") as archive:
+            data = json.loads(archive.read("pass.json"))
+        assert data["organizationName"] == "Acme"
+        assert data["logoText"] == "Acme"
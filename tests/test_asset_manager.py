@@ -65,6 +65,15 @@ class TestAssetManager:
         img = Image.open(qr_path)
         assert img.size == (200, 200)
 
+    def test_generate_qr_code_svg(self, tmp_path):
+        """Test that an .svg output name selects vector output."""
+        manager = AssetManager(str(tmp_path))
+        qr_path = manager.generate_qr_code("https://example.com", "test_qr.svg")
+
+        svg = qr_path.read_text()
+        assert svg.startswith("<svg")
+        assert 'width="200"' in svg
+
     def test_get_asset_path(self, tmp_path):
         """Test getting asset path."""
         manager = AssetManager(str(tmp_path))
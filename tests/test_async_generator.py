@@ -0,0 +1,169 @@
+"""Tests for the asyncio pass generator."""
+
+import asyncio
+import threading
+import time
+import zipfile
+from io import BytesIO
+
+import pytest
+
+from wallet_card.core.async_generator import AsyncPassGenerator
+from wallet_card.core.validator import ValidationError
+
+
+def _config(description="Async Card"):
+    """Build a minimal valid configuration."""
+    return {
+        "pass": {
+            "description": description,
+            "organizationName": "Test Org",
+            "passTypeIdentifier": "pass.test.card",
+        },
+        "qr_data": "https://example.com",
+    }
+
+
+@pytest.fixture
+def generator(tmp_path):
+    """Create an async generator writing to a temporary directory."""
+    return AsyncPassGenerator(
+        assets_dir=str(tmp_path / "assets"),
+        output_dir=str(tmp_path / "output"),
+        workers=2,
+        max_concurrency=2,
+    )
+
+
+def _slow(generator, delay, started=None):
+    """Make archive building take ``delay`` seconds, tracking concurrency."""
+    original = generator.generator.generate_bytes
+    state = {"running": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def generate_bytes(config, uploads=None, progress=None):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        if started is not None:
+            started.set()
+        time.sleep(delay)
+        try:
+            return original(config, uploads, progress)
+        finally:
+            with lock:
+                state["running"] -= 1
+
+    generator.generator.generate_bytes = generate_bytes
+    return state
+
+
+class TestAsyncPassGenerator:
+    """Test AsyncPassGenerator."""
+
+    def test_generate_writes_file(self, generator):
+        """Test that generate awaits the pipeline and writes the pass."""
+
+        async def run():
+            async with generator:
+                return await generator.generate(_config())
+
+        path = asyncio.run(run())
+
+        assert path.exists()
+        with zipfile.ZipFile(path) as archive:
+            assert "pass.json" in archive.namelist()
+
+    def test_event_loop_stays_responsive(self, generator):
+        """Test that the loop keeps running other tasks during generation."""
+        _slow(generator, 0.2)
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            task = asyncio.ensure_future(ticker())
+            async with generator:
+                await generator.generate_bytes(_config())
+            task.cancel()
+
+        asyncio.run(run())
+
+        assert len(ticks) >= 10
+
+    def test_generate_many_limits_concurrency(self, generator):
+        """Test that batches yield every pass without exceeding the limit."""
+        state = _slow(generator, 0.05)
+
+        async def run():
+            async with generator:
+                return [
+                    item
+                    async for item in generator.generate_many(
+                        (_config(f"Card {i}") for i in range(6)),
+                        output_filename=lambda index, config: f"card-{index}.pkpass",
+                    )
+                ]
+
+        results = asyncio.run(run())
+
+        assert sorted(index for index, _ in results) == list(range(6))
+        assert all(path.exists() for _, path in results)
+        assert state["peak"] <= 2
+
+    def test_generate_many_errors(self, generator):
+        """Test that failures raise, or are yielded with return_exceptions."""
+        configs = [_config(), {"pass": {}}]
+
+        async def collect(return_exceptions):
+            async with generator:
+                return [
+                    item
+                    async for item in generator.generate_many(
+                        configs, output_filename=lambda index, config: f"{index}.pkpass",
+                        return_exceptions=return_exceptions,
+                    )
+                ]
+
+        results = dict(asyncio.run(collect(True)))
+        assert isinstance(results[1], ValidationError)
+
+        with pytest.raises(ValidationError):
+            asyncio.run(collect(False))
+
+    def test_cancellation_skips_write(self, generator, tmp_path):
+        """Test that a cancelled generation does not write output."""
+        started = threading.Event()
+        _slow(generator, 0.2, started)
+
+        async def run():
+            async with generator:
+                task = asyncio.ensure_future(generator.generate(_config(), "cancelled.pkpass"))
+                while not started.is_set():
+                    await asyncio.sleep(0.01)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+        asyncio.run(run())
+
+        assert not (tmp_path / "output" / "cancelled.pkpass").exists()
+
+    def test_process_pool(self, tmp_path):
+        """Test that archives can be built in worker processes."""
+        generator = AsyncPassGenerator(
+            assets_dir=str(tmp_path / "assets"),
+            output_dir=str(tmp_path / "output"),
+            processes=True,
+            workers=2,
+        )
+
+        async def run():
+            async with generator:
+                return await asyncio.gather(*(generator.generate_bytes(_config()) for _ in range(3)))
+
+        for data in asyncio.run(run()):
+            assert "pass.json" in zipfile.ZipFile(BytesIO(data)).namelist()
@@ -0,0 +1,60 @@
+"""Tests for vCard QR badges."""
+
+import zipfile
+
+from click.testing import CliRunner
+from PIL import Image
+
+from wallet_card.cli.commands import main
+from wallet_card.core.badges import build_vcard, escape_vcard, generate_badges, normalize_contact, read_roster
+
+
+class TestVCard:
+    """Test vCard building."""
+
+    def test_escape(self):
+        """Test that vCard special characters are escaped."""
+        assert escape_vcard("Acme, Inc.; R&D\\Labs\nEU") == "Acme\\, Inc.\\; R&D\\\\Labs\\nEU"
+
+    def test_build_vcard(self):
+        """Test that properties are escaped and empty fields omitted."""
+        contact = normalize_contact({"Name": "Jane Doe", "Company": "Acme, Inc.", "Email": "jane@example.com"})
+
+        vcard = build_vcard(contact)
+
+        lines = vcard.split("\r\n")
+        assert lines[:4] == ["BEGIN:VCARD", "VERSION:3.0", "N:Doe;Jane;;;", "FN:Jane Doe"]
+        assert "ORG:Acme\\, Inc." in lines
+        assert "EMAIL;TYPE=INTERNET,WORK:jane@example.com" in lines
+        assert not any(line.startswith(("TEL", "URL", "TITLE")) for line in lines)
+        assert vcard.endswith("END:VCARD\r\n")
+
+
+class TestBadges:
+    """Test bulk badge rendering."""
+
+    def test_generate_zip_across_workers(self, tmp_path):
+        """Test that worker processes render every badge, in roster order."""
+        contacts = [normalize_contact({"name": f"Person {i}", "email": f"p{i}@example.com"}) for i in range(5)]
+        output = tmp_path / "badges.zip"
+
+        report = generate_badges(contacts, str(output), workers=2, chunk_size=2)
+
+        assert report["badges"] == 5
+        with zipfile.ZipFile(output) as archive:
+            names = archive.namelist()
+            assert names == [f"{i + 1:05d}-Person_{i}.png" for i in range(5)]
+            with archive.open(names[0]) as f:
+                assert Image.open(f).size == (800, 500)
+
+    def test_badges_command(self, tmp_path):
+        """Test that wallet-card badges renders a CSV roster to a directory."""
+        roster = tmp_path / "roster.csv"
+        roster.write_text("Name,Title,Email\nJane Doe,CTO,jane@example.com\n\"Roe, Rick\",,rick@example.com\n")
+
+        assert [contact["name"] for contact in read_roster(str(roster))] == ["Jane Doe", "Roe, Rick"]
+
+        result = CliRunner().invoke(main, ["badges", str(roster), "-o", str(tmp_path / "out"), "-w", "1"])
+
+        assert result.exit_code == 0, result.output
+        assert sorted(path.name for path in (tmp_path / "out").iterdir()) == ["00001-Jane_Doe.png", "00002-Roe__Rick.png"]
@@ -0,0 +1,47 @@
+"""Tests for the benchmark suite."""
+
+import io
+
+from PIL import Image
+from wallet_card.core.validator import Validator
+from wallet_card.perf.bench import compare, roster_config, run_benchmarks, synthetic_image, synthetic_roster
+
+
+class TestBench:
+    """Test benchmark helpers and reports."""
+
+    def test_synthetic_inputs_are_deterministic(self):
+        """Test that seeds reproduce rosters and images."""
+        assert synthetic_roster(3, seed=1) == synthetic_roster(3, seed=1)
+        assert synthetic_image(64, seed=1) == synthetic_image(64, seed=1)
+        assert Image.open(io.BytesIO(synthetic_image(64))).size == (64, 64)
+
+    def test_roster_configs_validate(self):
+        """Test that generated configurations pass validation."""
+        for serial, person in enumerate(synthetic_roster(10)):
+            assert Validator.validate_config(roster_config(person, serial)) == []
+
+    def test_run_benchmarks(self):
+        """Test a minimal single-pass and batch run."""
+        report = run_benchmarks(
+            templates=["classic-blue"], image_sizes=[64], repeat=1, batch_size=2, workers=[1]
+        )
+
+        names = [entry["name"] for entry in report["results"]]
+        assert names == ["single/classic-blue/64px", "batch/classic-blue/64px/1w"]
+        assert report["results"][0]["metrics"]["pkpass_bytes"] > 0
+        assert report["results"][1]["metrics"]["passes_per_sec"] > 0
+
+    def test_compare_flags_regressions(self):
+        """Test regression detection in both metric directions."""
+        baseline = {"results": [
+            {"name": "single", "metrics": {"median_ms": 10.0}},
+            {"name": "batch", "metrics": {"passes_per_sec": 100.0}},
+        ]}
+        current = {"results": [
+            {"name": "single", "metrics": {"median_ms": 13.0}},
+            {"name": "batch", "metrics": {"passes_per_sec": 70.0}},
+        ]}
+
+        assert len(compare(current, baseline, tolerance=0.2)) == 2
+        assert compare(current, baseline, tolerance=0.5) == []
@@ -0,0 +1,57 @@
+"""Tests for the deduplicating upload store."""
+
+import hashlib
+import io
+
+from wallet_card.core.blob_store import BlobStore
+
+
+class TestBlobStore:
+    """Test BlobStore class."""
+
+    def test_put_stream_hashes_content(self, tmp_path):
+        """Test that uploads are keyed by their SHA-256."""
+        store = BlobStore(str(tmp_path))
+        blob = store.put_stream(io.BytesIO(b"logo bytes"))
+
+        assert blob.digest == hashlib.sha256(b"logo bytes").hexdigest()
+        assert blob.path.read_bytes() == b"logo bytes"
+        assert store.refs(blob.digest) == 1
+
+    def test_repeat_upload_is_not_rewritten(self, tmp_path):
+        """Test that identical uploads share one object and count references."""
+        store = BlobStore(str(tmp_path))
+        first = store.put_stream(io.BytesIO(b"same"))
+        mtime = first.path.stat().st_mtime_ns
+
+        second = store.put_stream(io.BytesIO(b"same"))
+
+        assert second.digest == first.digest
+        assert second.path.stat().st_mtime_ns == mtime
+        assert store.refs(first.digest) == 2
+
+    def test_variant_cache(self, tmp_path):
+        """Test that derived images are rendered once per blob and size."""
+        store = BlobStore(str(tmp_path))
+        blob = store.put_bytes(b"source")
+        calls = []
+
+        def render():
+            calls.append(1)
+            return b"resized"
+
+        assert blob.variant((10, 10), render) == b"resized"
+        assert blob.variant((10, 10), render) == b"resized"
+        assert len(calls) == 1
+
+    def test_collect_unreferenced(self, tmp_path):
+        """Test that only released blobs are collected."""
+        store = BlobStore(str(tmp_path))
+        held = store.put_bytes(b"held")
+        released = store.put_bytes(b"released")
+        released.variant((1, 1), lambda: b"v")
+        released.release()
+
+        assert store.collect(grace=0, now=float("inf")) == [released.digest]
+        assert store.get(released.digest) is None
+        assert store.get(held.digest) is not None
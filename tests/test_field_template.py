@@ -0,0 +1,115 @@
+"""Tests for placeholder expressions in configurations."""
+
+import json
+import zipfile
+
+import pytest
+from click.testing import CliRunner
+
+from wallet_card.cli.commands import main
+from wallet_card.core.field_template import compile_config, compile_expression, literal
+from wallet_card.templates.classic_blue import ClassicBlueTemplate
+
+
+class TestExpressions:
+    """Test compiling and rendering expressions."""
+
+    def test_placeholders_and_formatters(self):
+        """Test substitution, formatters, defaults and escaped braces."""
+        row = {"first": "Jane", "last": "Doe", "email": "JANE@Example.com", "phone": "+1 (555) 010-0"}
+
+        assert compile_expression("{first} {last}")(row) == "Jane Doe"
+        assert compile_expression("mailto:{email|lower}")(row) == "mailto:jane@example.com"
+        assert compile_expression("tel:{phone|tel}")(row) == "tel:+15550100"
+        assert compile_expression("{title|default:Member}")(row) == "Member"
+        assert compile_expression("{{{first|upper}}}")(row) == "{JANE}"
+
+    def test_empty_placeholders_drop_the_expression(self):
+        """Test that prefixes disappear when all placeholders are empty."""
+        assert compile_expression("mailto:{email}")({}) == ""
+        assert compile_expression("{first} {last}")({"first": "Jane"}) == "Jane"
+
+    def test_unknown_formatter(self):
+        """Test that unknown formatters fail at compile time."""
+        with pytest.raises(ValueError, match="shout"):
+            compile_expression("{name|shout}")
+
+    def test_rendered_values_are_not_reparsed(self):
+        """Test that braces from data and literals survive a second render."""
+        render = compile_config({"pass": {"name": "{name}", "note": literal("{kept}")}, "n": [1]})
+
+        first = render({"name": "{x}"})
+        second = compile_config(first)({"x": "oops"})
+
+        assert first == second == {"pass": {"name": "{x}", "note": "{kept}"}, "n": [1]}
+        assert render({})["pass"] is not render({})["pass"]
+
+
+class TestTemplates:
+    """Test placeholders in pass templates."""
+
+    def test_resolve_fills_template_fields(self, tmp_path):
+        """Test that the data section fills the template's placeholders."""
+        template = ClassicBlueTemplate(assets_dir=str(tmp_path / "assets"), output_dir=str(tmp_path / "out"))
+
+        resolved = template.resolve_config({"data": {"name": "Jane Doe", "website": "https://example.com"}})
+
+        assert "data" not in resolved
+        assert resolved["pass"]["fields"]["primaryFields"][0]["value"] == "Jane Doe"
+        assert resolved["pass"]["fields"]["secondaryFields"][1]["value"] == ""
+        assert resolved["qr_data"] == "https://example.com"
+
+    def test_compiled_once_per_configuration(self, tmp_path, monkeypatch):
+        """Test that resolving new data with the same settings reuses the compiled config."""
+        from wallet_card.templates import base_template
+
+        compiled = []
+        original = base_template.compile_config
+        monkeypatch.setattr(base_template, "compile_config", lambda config: compiled.append(config) or original(config))
+        template = ClassicBlueTemplate(assets_dir=str(tmp_path / "assets"), output_dir=str(tmp_path / "out"))
+
+        first = template.resolve_config({"pass": {"logoText": "{name}"}, "data": {"name": "Jane"}})
+        second = template.resolve_config({"pass": {"logoText": "{name}"}, "data": {"name": "John"}})
+        literal_text = template.resolve_config({"pass": {"logoText": literal("{name}")}, "data": {"name": "John"}})
+
+        assert (first["pass"]["logoText"], second["pass"]["logoText"]) == ("Jane", "John")
+        assert literal_text["pass"]["logoText"] == "{name}"
+        assert len(compiled) == 2
+
+    def test_batch_command(self, tmp_path):
+        """Test wallet-card batch generating a pass per roster row."""
+        roster = tmp_path / "roster.csv"
+        roster.write_text("first,last,email\nJane,Doe,JANE@example.com\nJohn,Roe,\n")
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({
+            "pass": {"fields": {"primaryFields": [{"key": "name", "label": "Name", "value": "{first} {last}"}]}},
+        }))
+
+        result = CliRunner().invoke(main, [
+            "batch", str(roster), "-c", str(config), "-o", str(tmp_path / "out"), "--filename", "{last|lower}",
+        ])
+
+        assert result.exit_code == 0, result.output
+        assert sorted(path.name for path in (tmp_path / "out").iterdir()) == ["doe.pkpass", "roe.pkpass"]
+        with zipfile.ZipFile(tmp_path / "out" / "doe.pkpass") as archive:
+            data = json.loads(archive.read("pass.json"))
+        assert data["generic"]["primaryFields"][0]["value"] == "Jane Doe"
+        assert data["generic"]["secondaryFields"][1]["value"] == "JANE@example.com"
+
+    def test_batch_reports_bad_rows_and_profiles(self, tmp_path):
+        """Test that a corrupt image fails its row only, and --profile writes a report."""
+        (tmp_path / "broken.png").write_bytes(b"not an image")
+        roster = tmp_path / "roster.csv"
+        roster.write_text(f"name,photo\nJane,\nJohn,{tmp_path / 'broken.png'}\n")
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"assets": {"photo": "{photo}"}}))
+
+        result = CliRunner().invoke(main, [
+            "batch", str(roster), "-c", str(config), "-o", str(tmp_path / "out"),
+            "--profile", str(tmp_path / "profile"),
+        ])
+
+        assert result.exit_code == 1
+        assert "Row 2:" in result.output
+        assert [path.name for path in (tmp_path / "out").iterdir()] == ["pass-1.pkpass"]
+        assert any((tmp_path / "profile").iterdir())
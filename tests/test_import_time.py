@@ -0,0 +1,67 @@
+"""Cold-start budget for the web entry point."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from wallet_card.templates import TEMPLATES, ClassicBlueTemplate
+
+# Imported on first use only; none may load when the app module is imported
+LAZY_MODULES = ("PIL", "qrcode", "cryptography", "yaml", "wallet_card.templates.classic_blue")
+
+# Budgets in milliseconds (override for slow CI machines)
+OWN_BUDGET_MS = float(os.environ.get("WALLET_CARD_IMPORT_BUDGET_MS", 200))
+TOTAL_BUDGET_MS = float(os.environ.get("WALLET_CARD_IMPORT_TOTAL_BUDGET_MS", 1500))
+
+
+def _import_times(module: str) -> dict:
+    """Import a module in a fresh interpreter and parse -X importtime output.
+
+    Returns:
+        Mapping of module name to (self, cumulative) microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+@pytest.fixture(scope="module")
+def app_import_times():
+    return _import_times("wallet_card.web.app")
+
+
+class TestColdStart:
+    """Test import cost of wallet_card.web.app."""
+
+    def test_heavy_dependencies_are_lazy(self, app_import_times):
+        """Test that Pillow, qrcode, cryptography, PyYAML and templates load on demand."""
+        loaded = [
+            name for name in app_import_times
+            if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+        ]
+        assert loaded == []
+
+    def test_import_budget(self, app_import_times):
+        """Test that importing the app stays within the startup budget."""
+        own_ms = sum(t[0] for name, t in app_import_times.items() if name.startswith("wallet_card")) / 1000
+        total_ms = app_import_times["wallet_card.web.app"][1] / 1000
+
+        assert own_ms < OWN_BUDGET_MS, f"wallet_card modules took {own_ms:.0f} ms to import"
+        assert total_ms < TOTAL_BUDGET_MS, f"wallet_card.web.app took {total_ms:.0f} ms to import"
+
+    def test_templates_load_on_demand(self):
+        """Test that lazily loaded templates resolve to their classes."""
+        assert TEMPLATES["classic-blue"] is ClassicBlueTemplate
+        assert "business-card" in TEMPLATES
+        assert TEMPLATES.get("unknown") is None
@@ -0,0 +1,64 @@
+"""Tests for the web job queue."""
+
+import threading
+
+import pytest
+from wallet_card.web.jobs import Job, JobQueue, QueueFullError
+
+
+class TestJobQueue:
+    """Test JobQueue class."""
+
+    def test_job_succeeds(self):
+        """Test that a job runs and records its result."""
+        queue = JobQueue(max_workers=1)
+
+        def work(report):
+            report("halfway", 0.5)
+            return {"value": 42}
+
+        job = queue.submit(work)
+        state = queue.wait(job, -1, timeout=5)
+        while state["status"] != Job.SUCCEEDED:
+            state = queue.wait(job, state["version"], timeout=5)
+
+        assert state["result"] == {"value": 42}
+        assert state["progress"] == 1.0
+        assert queue.get(job.id) is job
+
+    def test_job_failure(self):
+        """Test that exceptions mark the job as failed."""
+        queue = JobQueue(max_workers=1)
+
+        def work(report):
+            raise ValueError("boom")
+
+        job = queue.submit(work)
+        events = list(queue.events(job, heartbeat=5))
+
+        assert events[-1].startswith("event: done")
+        assert job.status == Job.FAILED
+        assert job.error == "boom"
+
+    def test_queue_full(self):
+        """Test that submissions beyond max_pending are rejected."""
+        queue = JobQueue(max_workers=1, max_pending=1)
+        release = threading.Event()
+        job = queue.submit(lambda report: release.wait(5) and {})
+
+        with pytest.raises(QueueFullError):
+            queue.submit(lambda report: {})
+
+        release.set()
+        list(queue.events(job, heartbeat=5))
+        assert queue.stats()["pending"] == 0
+
+    def test_events_stream_progress(self):
+        """Test that SSE events end with a done event."""
+        queue = JobQueue(max_workers=1)
+        job = queue.submit(lambda report: {"ok": True})
+
+        events = list(queue.events(job, heartbeat=5))
+
+        assert all(event.endswith("\n\n") for event in events)
+        assert '"status": "succeeded"' in events[-1]
@@ -0,0 +1,59 @@
+"""Tests for the load-test harness."""
+
+import io
+import threading
+
+from werkzeug.formparser import parse_form_data
+from werkzeug.serving import make_server
+from wallet_card.perf.loadtest import EndpointStats, LoadTest, encode_multipart
+from wallet_card.web.app import app
+
+
+class TestLoadTest:
+    """Test LoadTest and its helpers."""
+
+    def test_encode_multipart(self):
+        """Test that encoded bodies parse as form data."""
+        body, content_type = encode_multipart(
+            {"name": "Ada"}, {"photo": ("photo.jpg", b"\xff\xd8data", "image/jpeg")}
+        )
+        environ = {
+            "REQUEST_METHOD": "POST",
+            "CONTENT_TYPE": content_type,
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": io.BytesIO(body),
+        }
+
+        _, form, files = parse_form_data(environ)
+
+        assert form["name"] == "Ada"
+        assert files["photo"].read() == b"\xff\xd8data"
+
+    def test_summary_percentiles(self):
+        """Test latency percentiles and error rate."""
+        stats = EndpointStats()
+        stats.latencies = [i / 1000 for i in range(1, 101)]
+        stats.statuses = {200: 99, 503: 1}
+
+        summary = stats.summary(elapsed=10)
+
+        assert summary["p50_ms"] == 50
+        assert summary["p99_ms"] == 99
+        assert summary["throughput_rps"] == 10
+        assert summary["error_rate"] == 0.01
+
+    def test_run_against_server(self):
+        """Test a short run against the app served in a thread."""
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            report = LoadTest(
+                f"http://127.0.0.1:{server.server_port}", concurrency=2, requests=6, mix={"validate": 1}
+            ).run()
+        finally:
+            server.shutdown()
+
+        assert report["endpoints"]["validate"]["requests"] == 6
+        assert report["endpoints"]["validate"]["statuses"] == {"200": 6}
+        assert report["overall"]["error_rate"] == 0
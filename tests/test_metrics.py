@@ -0,0 +1,80 @@
+"""Tests for pipeline metrics."""
+
+import pytest
+from wallet_card.core import metrics
+from wallet_card.core.metrics import Counter, Histogram, Registry
+from wallet_card.core.pass_generator import PassGenerator
+from wallet_card.core.validator import ValidationError
+
+
+class TestMetrics:
+    """Test metric types and exposition."""
+
+    def test_counter_exposition(self):
+        """Test counter samples and label escaping."""
+        registry = Registry()
+        counter = registry.register(Counter("test_total", "A counter.", ("name",)))
+        counter.inc(name='a"b')
+        counter.inc(2, name='a"b')
+
+        text = registry.expose()
+
+        assert "# TYPE test_total counter" in text
+        assert 'test_total{name="a\\"b"} 3' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram bucket, sum and count lines."""
+        registry = Registry()
+        histogram = registry.register(Histogram("test_seconds", "A histogram.", buckets=(0.1, 1.0)))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        text = registry.expose()
+
+        assert 'test_seconds_bucket{le="0.1"} 1' in text
+        assert 'test_seconds_bucket{le="1"} 2' in text
+        assert 'test_seconds_bucket{le="+Inf"} 3' in text
+        assert "test_seconds_count 3" in text
+
+    def test_wrong_labels_rejected(self):
+        """Test that label names must match the declaration."""
+        counter = Counter("test_total", "A counter.", ("name",))
+        with pytest.raises(ValueError):
+            counter.inc(other="x")
+
+
+class TestPipelineMetrics:
+    """Test instrumentation of PassGenerator."""
+
+    def test_stages_timed_per_template(self, tmp_path):
+        """Test that each stage is observed under the template label."""
+        generator = PassGenerator(
+            assets_dir=str(tmp_path / "assets"),
+            output_dir=str(tmp_path / "output"),
+            template_name="metrics_test",
+        )
+        config = {
+            "pass": {
+                "description": "Metrics",
+                "organizationName": "Test Org",
+                "passTypeIdentifier": "pass.test.card",
+            },
+            "qr_data": "https://example.com",
+        }
+        before = metrics.OUTPUT_BYTES.value(template="metrics_test")
+
+        data = generator.generate_bytes(config)
+
+        for stage in ("validate", "prepare_icon", "prepare_logo", "prepare_photo", "manifest", "zip"):
+            assert metrics.STAGE_SECONDS.count(template="metrics_test", stage=stage) >= 1
+        assert metrics.OUTPUT_BYTES.value(template="metrics_test") - before == len(data)
+
+    def test_errors_counted(self, tmp_path):
+        """Test that validation failures are counted per template."""
+        generator = PassGenerator(output_dir=str(tmp_path), template_name="metrics_errors")
+
+        with pytest.raises(ValidationError):
+            generator.generate_bytes({})
+
+        assert metrics.GENERATION_ERRORS.value(template="metrics_errors", error="validation") == 1
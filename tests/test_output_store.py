@@ -0,0 +1,96 @@
+"""Tests for the indexed output store."""
+
+import hashlib
+import os
+import time
+
+import pytest
+
+from wallet_card.core.output_store import OutputStore
+
+
+class TestOutputStore:
+    """Test OutputStore class."""
+
+    def test_put_indexes_file(self, tmp_path):
+        """Test that stored files are written and indexed."""
+        store = OutputStore(str(tmp_path))
+        path = store.put("card.pkpass", b"data")
+
+        assert path.read_bytes() == b"data"
+        entry = store.get("card.pkpass")
+        assert entry["digest"] == hashlib.sha1(b"data").hexdigest()
+        assert entry["size"] == 4
+        assert store.stats() == {"count": 1, "bytes": 4}
+
+    def test_reindex_adopts_existing_files(self, tmp_path):
+        """Test that the janitor picks up files already on disk for a new index."""
+        (tmp_path / "old.pkpass").write_bytes(b"old")
+
+        store = OutputStore(str(tmp_path))
+        assert store.get("old.pkpass") is None
+
+        store.start_janitor(interval=3600)
+        deadline = time.time() + 5
+        while store.reindex_pending and time.time() < deadline:
+            time.sleep(0.01)
+
+        entry = store.get("old.pkpass")
+        assert entry["size"] == 3
+        assert entry["created"] == os.stat(tmp_path / "old.pkpass").st_mtime
+
+    def test_list_pagination(self, tmp_path):
+        """Test cursor-based pagination, newest first."""
+        store = OutputStore(str(tmp_path))
+        for i in range(5):
+            store.put(f"card{i}.pkpass", b"x")
+
+        seen = []
+        cursor = None
+        while True:
+            entries, cursor = store.list(limit=2, cursor=cursor)
+            seen += [entry["filename"] for entry in entries]
+            if cursor is None:
+                break
+
+        assert sorted(seen) == [f"card{i}.pkpass" for i in range(5)]
+        assert len(seen) == 5
+
+    def test_list_rejects_malformed_cursor(self, tmp_path):
+        """Test that a cursor that is not from a previous page is rejected."""
+        store = OutputStore(str(tmp_path))
+
+        with pytest.raises(ValueError, match="cursor"):
+            store.list(cursor="x")
+
+    def test_evict_ttl(self, tmp_path):
+        """Test that idle files expire."""
+        store = OutputStore(str(tmp_path), ttl=60)
+        store.put("card.pkpass", b"data")
+
+        assert store.evict(now=time.time() + 120) == ["card.pkpass"]
+        assert not (tmp_path / "card.pkpass").exists()
+        assert store.get("card.pkpass") is None
+
+    def test_evict_size_lru(self, tmp_path):
+        """Test that the least recently used files go first over the cap."""
+        store = OutputStore(str(tmp_path), max_bytes=10)
+        store.put("a.pkpass", b"x" * 6)
+        store.put("b.pkpass", b"x" * 6)
+        store.touch("b.pkpass")
+
+        # Make "a" the least recently used
+        store._connect().execute("UPDATE files SET accessed = 0 WHERE filename = 'a.pkpass'")
+
+        assert store.evict() == ["a.pkpass"]
+        assert store.stats()["bytes"] == 6
+
+    def test_sweep_directory(self, tmp_path):
+        """Test sweeping old files from an unindexed directory."""
+        old = tmp_path / "old.png"
+        old.write_bytes(b"x")
+        os.utime(old, (0, 0))
+        (tmp_path / "new.png").write_bytes(b"x")
+
+        assert OutputStore.sweep_directory(str(tmp_path), max_age=60) == 1
+        assert not old.exists()
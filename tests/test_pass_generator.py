@@ -62,3 +62,73 @@ class TestPassGenerator:
         with pytest.raises(ValidationError):
             generator.generate(config)
 
+    def test_generate_bytes_in_memory(self, tmp_path):
+        """Test that generate_bytes builds the archive without writing output."""
+        import io
+        import json
+        import zipfile
+        from PIL import Image
+
+        output_dir = tmp_path / "output"
+        generator = PassGenerator(
+            assets_dir=str(tmp_path / "assets"),
+            output_dir=str(output_dir),
+        )
+        logo = io.BytesIO()
+        Image.new("RGB", (800, 200), "blue").save(logo, "PNG")
+
+        config = {
+            "pass": {
+                "description": "Test Card",
+                "organizationName": "Test Org",
+                "passTypeIdentifier": "pass.test.card",
+            },
+            "qr_data": "https://example.com",
+        }
+        data = generator.generate_bytes(config, uploads={"logo": logo.getvalue()})
+
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            pass_json = json.loads(archive.read("pass.json"))
+            logo_img = Image.open(io.BytesIO(archive.read("logo.png")))
+        assert set(manifest) == {"pass.json", "icon.png", "logo.png", "strip.png"}
+        assert pass_json["barcodes"][0]["message"] == "https://example.com"
+        assert logo_img.size == (320, 100)
+        assert list(output_dir.iterdir()) == []
+
+    def test_generate_with_store(self, tmp_path):
+        """Test that passes with the same description no longer collide."""
+        from wallet_card.core.pass_store import PassStore
+
+        generator = PassGenerator(
+            assets_dir=str(tmp_path / "assets"),
+            output_dir=str(tmp_path / "output"),
+            store=PassStore(str(tmp_path / "store")),
+        )
+        base = {
+            "description": "Digital Business Card",
+            "organizationName": "Test Org",
+            "passTypeIdentifier": "pass.test.card",
+        }
+
+        first = generator.generate({"pass": dict(base, serialNumber="1")})
+        second = generator.generate({"pass": dict(base, serialNumber="2")})
+
+        assert first != second
+        assert first.name.startswith("Digital_Business_Card-")
+        assert first.exists() and second.exists()
+
+    def test_same_description_without_store(self, tmp_path):
+        """Test that default names are unique even without a pass store."""
+        generator = PassGenerator(assets_dir=str(tmp_path / "assets"), output_dir=str(tmp_path / "output"))
+        base = {
+            "description": "Digital Business Card",
+            "organizationName": "Test Org",
+            "passTypeIdentifier": "pass.test.card",
+        }
+
+        first = generator.generate({"pass": dict(base, serialNumber="1")})
+        second = generator.generate({"pass": dict(base, serialNumber="2")})
+
+        assert first != second
+        assert first.read_bytes() != second.read_bytes()
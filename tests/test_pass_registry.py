@@ -0,0 +1,66 @@
+"""Tests for the PassKit web service registry."""
+
+import pytest
+from wallet_card.core.pass_registry import PassRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """Create a registry with one pass."""
+    registry = PassRegistry(str(tmp_path / "registry.sqlite3"))
+    registry.update_pass("pass.test", "S1", "token-0123456789abcdef", "a" * 64)
+    return registry
+
+
+class TestPassRegistry:
+    """Test PassRegistry class."""
+
+    def test_authenticate(self, registry):
+        """Test that only the pass's own token authenticates."""
+        assert registry.authenticate("pass.test", "S1", "token-0123456789abcdef")["pass_key"] == "a" * 64
+        assert registry.authenticate("pass.test", "S1", "wrong") is None
+        assert registry.authenticate("pass.test", "S2", "token-0123456789abcdef") is None
+        assert registry.authenticate("pass.test", "S1", None) is None
+
+    def test_update_tags_increase(self, registry):
+        """Test that every update gets a newer tag."""
+        first = registry.get_pass("pass.test", "S1")["updated_at"]
+        second = registry.update_pass("pass.test", "S1", "token-0123456789abcdef", "b" * 64)
+
+        assert second > first
+        assert registry.get_pass("pass.test", "S1")["pass_key"] == "b" * 64
+
+    def test_updated_serials(self, registry):
+        """Test the per-device change feed."""
+        registry.update_pass("pass.test", "S2", "token-0123456789abcdef", "c" * 64)
+        assert registry.register_device("dev", "push", "pass.test", "S1") is True
+        assert registry.register_device("dev", "push", "pass.test", "S1") is False
+        registry.register_device("dev", "push", "pass.test", "S2")
+
+        serials, tag = registry.updated_serials("dev", "pass.test")
+        assert serials == ["S1", "S2"]
+        assert registry.updated_serials("dev", "pass.test", tag) == ([], None)
+
+        new_tag = registry.update_pass("pass.test", "S2", "token-0123456789abcdef", "d" * 64)
+        assert registry.updated_serials("dev", "pass.test", tag) == (["S2"], new_tag)
+        assert registry.updated_serials("other", "pass.test") == ([], None)
+
+    def test_unregister_forgets_device(self, registry):
+        """Test that devices without registrations are removed."""
+        registry.register_device("dev", "push", "pass.test", "S1")
+
+        assert registry.unregister_device("dev", "pass.test", "S1") is True
+        assert registry.unregister_device("dev", "pass.test", "S1") is False
+        assert registry.stats() == {"passes": 1, "devices": 0, "registrations": 0}
+
+    def test_change_feed_uses_indexes(self, registry):
+        """Test that the change feed query never scans a table."""
+        conn = registry._connect()
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT p.serial, p.updated_at FROM registrations r "
+            "JOIN passes p ON p.pass_type_id = r.pass_type_id AND p.serial = r.serial "
+            "WHERE r.device_id = ? AND r.pass_type_id = ? AND p.updated_at > ?",
+            ("dev", "pass.test", 0),
+        ).fetchall()
+
+        assert not any(row[-1].startswith("SCAN") for row in plan)
@@ -0,0 +1,86 @@
+"""Tests for the content-addressed pass store."""
+
+import os
+
+import pytest
+from wallet_card.core.pass_store import PassStore
+
+
+class TestPassStore:
+    """Test PassStore class."""
+
+    def test_put_is_content_addressed(self, tmp_path):
+        """Test that objects are sharded by their SHA-256 key."""
+        store = PassStore(str(tmp_path))
+        key = store.put(b"pass bytes")
+
+        path = store.get(key)
+        assert key == PassStore.key_for(b"pass bytes")
+        assert path == tmp_path / key[:2] / key[2:4] / f"{key}.pkpass"
+        assert path.read_bytes() == b"pass bytes"
+
+    def test_put_deduplicates(self, tmp_path):
+        """Test that identical content is stored once."""
+        store = PassStore(str(tmp_path))
+
+        assert store.put(b"same") == store.put(b"same")
+        assert len(list(store._iter_files())) == 1
+
+    def test_publish_hardlinks(self, tmp_path):
+        """Test that published names share the object's inode."""
+        store = PassStore(str(tmp_path / "store"))
+        key = store.put(b"data")
+        out = tmp_path / "out"
+        out.mkdir()
+
+        first = store.publish(key, out / "a.pkpass")
+        second = store.publish(key, out / "b.pkpass")
+        store.publish(key, out / "a.pkpass")
+
+        assert os.path.samefile(first, second)
+        assert sorted(p.name for p in out.iterdir()) == ["a.pkpass", "b.pkpass"]
+
+    def test_prune_unreferenced(self, tmp_path):
+        """Test that only unpublished objects are pruned."""
+        store = PassStore(str(tmp_path / "store"))
+        kept = store.put(b"kept")
+        dropped = store.put(b"dropped")
+        store.publish(kept, tmp_path / "kept.pkpass")
+
+        assert store.prune(grace=0, now=float("inf")) == 1
+        assert store.get(kept) is not None
+        assert store.get(dropped) is None
+
+    def test_put_hit_defers_prune(self, tmp_path):
+        """Test that storing existing content again refreshes its age."""
+        store = PassStore(str(tmp_path / "store"))
+        key = store.put(b"data")
+        os.utime(store.path_for(key), (0, 0))
+
+        store.put(b"data")
+
+        assert store.prune(grace=3600) == 0
+        assert store.get(key) is not None
+
+    def test_prune_keeps_copied_objects(self, tmp_path, monkeypatch):
+        """Test that objects are kept when publishing had to copy them."""
+        store = PassStore(str(tmp_path / "store"))
+        key = store.put(b"data")
+
+        def no_link(src, dst):
+            raise OSError("hardlinks not supported")
+
+        monkeypatch.setattr(os, "link", no_link)
+        published = store.publish(key, tmp_path / "card.pkpass")
+
+        assert published.read_bytes() == b"data"
+        assert store.prune(grace=0, now=float("inf")) == 0
+        assert store.get(key) is not None
+
+    def test_invalid_key(self, tmp_path):
+        """Test that malformed keys are rejected."""
+        store = PassStore(str(tmp_path))
+
+        assert store.get("../etc/passwd") is None
+        with pytest.raises(ValueError):
+            store.path_for("not-a-key")
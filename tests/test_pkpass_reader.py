@@ -0,0 +1,157 @@
+"""Tests for the pkpass reader and bulk verifier."""
+
+import hashlib
+import io
+import json
+import zipfile
+
+import pytest
+from click.testing import CliRunner
+
+from wallet_card.cli.commands import main
+from wallet_card.core.pass_generator import PassGenerator
+from wallet_card.core.pkpass_reader import PKPassReader, verify_file, verify_many
+
+
+@pytest.fixture
+def pkpass(tmp_path):
+    """Generate an unsigned pass archive."""
+    generator = PassGenerator(assets_dir=str(tmp_path / "assets"), output_dir=str(tmp_path / "output"))
+    config = {
+        "pass": {
+            "description": "Reader",
+            "organizationName": "Test Org",
+            "passTypeIdentifier": "pass.test.card",
+        },
+        "qr_data": "https://example.com",
+    }
+    return generator.generate_bytes(config)
+
+
+def _rewrite(data, replace=None, drop=(), rehash=True):
+    """Rebuild an archive with some files replaced or removed."""
+    files = {}
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        for name in archive.namelist():
+            if name not in drop:
+                files[name] = archive.read(name)
+    files.update(replace or {})
+    if rehash:
+        manifest = {
+            name: hashlib.sha1(content).hexdigest()
+            for name, content in files.items()
+            if name not in ("manifest.json", "signature")
+        }
+        files["manifest.json"] = json.dumps(manifest).encode()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+class TestPKPassReader:
+    """Test PKPassReader verification."""
+
+    def test_generated_pass_verifies(self, pkpass):
+        """Test that a freshly generated pass has no errors."""
+        with PKPassReader(pkpass) as reader:
+            report = reader.verify()
+
+        assert report["ok"], report["errors"]
+        assert report["signature"] == "unsigned"
+        assert report["files"] > 0
+
+    def test_hash_mismatch(self, pkpass):
+        """Test that a file changed after signing is reported."""
+        with PKPassReader(pkpass) as reader:
+            data = json.loads(reader.read("pass.json"))
+        data["description"] = "Tampered"
+        tampered = _rewrite(pkpass, {"pass.json": json.dumps(data).encode()}, rehash=False)
+
+        report = PKPassReader(tampered).verify()
+
+        assert not report["ok"]
+        assert "Hash mismatch: pass.json" in report["errors"]
+
+    def test_missing_icon_and_bad_pass_json(self, pkpass):
+        """Test that a missing icon and schema errors are reported."""
+        with PKPassReader(pkpass) as reader:
+            data = json.loads(reader.read("pass.json"))
+        del data["serialNumber"]
+        data["backgroundColor"] = "blue"
+        broken = _rewrite(
+            pkpass,
+            {"pass.json": json.dumps(data).encode()},
+            drop=("icon.png", "icon@2x.png", "icon@3x.png"),
+        )
+
+        errors = PKPassReader(broken).verify()["errors"]
+
+        assert "Missing icon.png" in errors
+        assert "pass.json missing serialNumber" in errors
+        assert "pass.json backgroundColor is not an rgb() color" in errors
+
+
+    def test_malformed_structures(self, pkpass):
+        """Test that wrongly typed manifest, fields and barcodes are errors, not crashes."""
+        with PKPassReader(pkpass) as reader:
+            data = json.loads(reader.read("pass.json"))
+        data["generic"]["primaryFields"] = [{"key": ["name"], "value": "Jane"}]
+        data["generic"]["backFields"] = "none"
+        data["barcodes"] = [1]
+        broken = _rewrite(pkpass, {"pass.json": json.dumps(data).encode()})
+        list_manifest = _rewrite(pkpass, {"manifest.json": b"[]"}, rehash=False)
+
+        errors = PKPassReader(broken).verify()["errors"]
+
+        assert "pass.json primaryFields field keys must be strings" in errors
+        assert "pass.json backFields must be a list" in errors
+        assert "pass.json barcodes entries must be objects" in errors
+        assert "manifest.json must be an object" in PKPassReader(list_manifest).verify()["errors"]
+
+
+class TestVerifyMany:
+    """Test bulk verification."""
+
+    def test_parallel_verification(self, tmp_path, pkpass):
+        """Test that worker processes verify a directory and report bad files."""
+        for i in range(6):
+            (tmp_path / f"pass_{i}.pkpass").write_bytes(pkpass)
+        (tmp_path / "junk.pkpass").write_bytes(b"junk")
+
+        report = verify_many([str(tmp_path)], workers=2)
+
+        assert report["total"] == 7
+        assert report["ok"] == 6
+        assert report["failed"] == 1
+        assert report["results"][0]["path"].endswith("junk.pkpass")
+
+    def test_corrupt_member_is_reported(self, tmp_path):
+        """Test that a member with a corrupt deflate stream fails only its archive."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("pass.json", json.dumps({"description": "x" * 200}))
+        data = bytearray(buffer.getvalue())
+        start = 30 + len("pass.json")  # first local header is at offset 0
+        data[start:start + 8] = b"\xff" * 8
+        path = tmp_path / "corrupt.pkpass"
+        path.write_bytes(bytes(data))
+
+        report = verify_file(str(path))
+
+        assert report["ok"] is False
+        assert report["errors"][0].startswith("Unreadable archive")
+
+    def test_verify_command(self, tmp_path, pkpass):
+        """Test that wallet-card verify exits non-zero when a pass fails."""
+        (tmp_path / "good.pkpass").write_bytes(pkpass)
+        runner = CliRunner()
+
+        result = runner.invoke(main, ["verify", str(tmp_path), "-w", "1"])
+        assert result.exit_code == 0, result.output
+
+        (tmp_path / "bad.pkpass").write_bytes(_rewrite(pkpass, drop=("pass.json",)))
+        result = runner.invoke(main, ["verify", str(tmp_path), "-w", "1"])
+        assert result.exit_code == 1
+        assert "bad.pkpass" in result.output
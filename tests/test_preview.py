@@ -0,0 +1,47 @@
+"""Tests for pass previews and their cache."""
+
+import io
+
+from wallet_card.core.fingerprint import fingerprint, source_digest
+from wallet_card.core.preview import PreviewCache
+from wallet_card.templates.classic_blue import ClassicBlueTemplate
+
+
+class TestPreviewCache:
+    """Test the preview LRU."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the entry limit evicts the oldest unused preview."""
+        cache = PreviewCache(max_entries=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        assert cache.get("a") == b"1"
+        cache.put("c", b"3")
+
+        assert cache.get("b") is None
+        assert cache.get_or_render("c", lambda: b"new") == (b"3", True)
+        assert cache.stats() == {"entries": 2, "bytes": 2, "hits": 2, "misses": 1}
+
+
+class TestFingerprint:
+    """Test preview fingerprints."""
+
+    def test_key_order_does_not_matter(self):
+        """Test that equal configurations give equal fingerprints."""
+        assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+        assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+    def test_preview_key_follows_image_content(self, tmp_path):
+        """Test that uploads are keyed by content and streams are rewound."""
+        template = ClassicBlueTemplate(assets_dir=str(tmp_path / "assets"), output_dir=str(tmp_path / "out"))
+        config = {"pass": {"description": "Preview"}}
+        stream = io.BytesIO(b"logo bytes")
+        stream.seek(0)
+
+        key = template.preview_key(config, {"logo": stream})
+
+        assert stream.tell() == 0
+        assert source_digest(stream) == source_digest(b"logo bytes")
+        assert key == template.preview_key(config, {"logo": b"logo bytes"})
+        assert key != template.preview_key(config, {"logo": b"other logo"})
+        assert key != template.preview_key(config)
@@ -0,0 +1,61 @@
+"""Tests for pipeline profiling."""
+
+import json
+
+from wallet_card.core import metrics
+from wallet_card.core.pass_generator import PassGenerator
+from wallet_card.core.profiling import Profiler
+
+
+def _config():
+    return {
+        "pass": {
+            "description": "Profiled",
+            "organizationName": "Test Org",
+            "passTypeIdentifier": "pass.test.card",
+        },
+    }
+
+
+class TestProfiler:
+    """Test Profiler class."""
+
+    def test_stages_profiled(self, tmp_path):
+        """Test that each pipeline stage gets timings and memory figures."""
+        generator = PassGenerator(output_dir=str(tmp_path / "output"))
+        profiler = Profiler()
+
+        with profiler.activate():
+            generator.generate_bytes(_config())
+
+        stages = {stage["stage"]: stage for stage in profiler.summary()}
+        assert {"validate", "prepare_icon", "manifest", "zip"} <= set(stages)
+        assert stages["prepare_icon"]["peak_kb"] > 0
+
+    def test_write_artefacts(self, tmp_path):
+        """Test the Chrome trace, pstats files and report."""
+        generator = PassGenerator(output_dir=str(tmp_path / "output"))
+        profiler = Profiler(memory=False)
+        with profiler.activate():
+            generator.generate_bytes(_config())
+
+        written = profiler.write(str(tmp_path / "profile"), prefix="run")
+
+        trace = json.loads(written["trace"].read_text())
+        names = [event["name"] for event in trace["traceEvents"]]
+        assert names[0] == "generate"
+        assert "prepare_photo" in names
+        assert all(event["ph"] == "X" for event in trace["traceEvents"])
+        assert written["prof:validate"].exists()
+        assert "== zip:" in written["report"].read_text()
+
+    def test_inactive_outside_block(self):
+        """Test that stages are not recorded without an active profiler."""
+        profiler = Profiler()
+        with profiler.activate():
+            pass
+
+        with metrics.stage("validate"):
+            pass
+
+        assert profiler.stages == []
@@ -0,0 +1,88 @@
+"""Tests for push fan-out."""
+
+import pytest
+from wallet_card.core.pass_registry import PassRegistry
+from wallet_card.core.push import HTTPPushTransport, PushDispatcher, PushFanout, RateLimiter
+from wallet_card.perf.mock_apns import MockAPNsServer
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """Create a registry with 50 devices over 10 passes."""
+    registry = PassRegistry(str(tmp_path / "registry.sqlite3"))
+    for i in range(50):
+        registry.register_device(f"dev{i}", f"token{i}", "pass.test", f"S{i % 10}")
+    return registry
+
+
+@pytest.fixture
+def apns():
+    """Run a local APNs stand-in."""
+    with MockAPNsServer() as server:
+        yield server
+
+
+class TestPushFanout:
+    """Test PushFanout against the APNs stand-in."""
+
+    def test_notify_reaches_registered_devices(self, registry, apns):
+        """Test that each device holding an updated pass gets one push."""
+        fanout = PushFanout(registry, HTTPPushTransport(apns.url), connections=2, batch_size=4)
+
+        report = fanout.notify("pass.test", ["S1", "S2"])
+
+        assert report["sent"] == 10
+        assert sorted(token for _, token in apns.received) == sorted(
+            f"token{i}" for i in range(50) if i % 10 in (1, 2)
+        )
+        assert {topic for topic, _ in apns.received} == {"pass.test"}
+        # One persistent connection per worker
+        assert apns.connections == 2
+
+    def test_retries_throttled_pushes(self, registry, apns):
+        """Test that 429 responses are retried with backoff."""
+        apns.throttle(5)
+        fanout = PushFanout(registry, HTTPPushTransport(apns.url), connections=1, backoff=0.01)
+
+        report = fanout.notify("pass.test")
+
+        assert report["sent"] == 50
+        assert report["retried"] == 5
+        assert report["failed"] == 0
+
+    def test_unregistered_tokens_forgotten(self, registry, apns):
+        """Test that tokens rejected with 410 are removed from the registry."""
+        apns.unregistered.add("token3")
+        fanout = PushFanout(registry, HTTPPushTransport(apns.url))
+
+        report = fanout.notify("pass.test", ["S3"])
+
+        assert report["invalid"] == 1
+        assert "token3" not in registry.push_tokens("pass.test")
+
+    def test_dispatcher_coalesces(self, registry, apns):
+        """Test that queued updates are sent as one fan-out per pass type."""
+        dispatcher = PushDispatcher(PushFanout(registry, HTTPPushTransport(apns.url)), delay=60)
+        dispatcher.submit("pass.test", ["S1"])
+        dispatcher.submit("pass.test", ["S1", "S2"])
+
+        reports = dispatcher.flush()
+
+        assert len(reports) == 1
+        assert reports[0]["sent"] == 10
+
+
+class TestRateLimiter:
+    """Test RateLimiter class."""
+
+    def test_limits_rate(self, monkeypatch):
+        """Test that acquiring beyond the burst sleeps."""
+        sleeps = []
+        monkeypatch.setattr("wallet_card.core.push.time.sleep", sleeps.append)
+        limiter = RateLimiter(rate=100)
+
+        limiter.acquire(100)
+        limiter.acquire(50)
+
+        assert len(sleeps) == 1
+        assert sleeps[0] == pytest.approx(0.5, abs=0.05)
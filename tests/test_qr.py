@@ -0,0 +1,40 @@
+"""Tests for QR encoding and SVG rendering."""
+
+import re
+import xml.etree.ElementTree as ET
+
+from wallet_card.core.qr import qr_matrix, render_qr_svg, svg_path
+
+
+def _rasterize(path, modules):
+    """Fill a module grid from merged-rectangle path data."""
+    grid = [[False] * modules for _ in range(modules)]
+    for x, y, width, height in re.findall(r"M(\d+) (\d+)h(\d+)v(\d+)h-\d+z", path):
+        for row in range(int(y), int(y) + int(height)):
+            for col in range(int(x), int(x) + int(width)):
+                assert not grid[row][col], "rectangles overlap"
+                grid[row][col] = True
+    return grid
+
+
+class TestSVG:
+    """Test vector QR output."""
+
+    def test_path_covers_exactly_the_dark_modules(self):
+        """Test that merged rectangles reproduce the matrix."""
+        matrix = qr_matrix("https://example.com/api/download/card.pkpass", "L")
+
+        path = svg_path(matrix)
+
+        assert _rasterize(path, len(matrix)) == [list(row) for row in matrix]
+        dark = sum(sum(row) for row in matrix)
+        assert path.count("M") < dark / 2
+
+    def test_render_qr_svg(self):
+        """Test that the SVG document is well formed and sized."""
+        matrix = qr_matrix("hello")
+
+        root = ET.fromstring(render_qr_svg(matrix, size=200))
+
+        assert root.get("viewBox") == f"0 0 {len(matrix)} {len(matrix)}"
+        assert root.get("width") == "200"
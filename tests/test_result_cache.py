@@ -0,0 +1,67 @@
+"""Tests for memoised generation results."""
+
+import pytest
+
+from wallet_card.core.result_cache import MemoryCache, ResultCache
+from wallet_card.templates.classic_blue import ClassicBlueTemplate
+
+
+def _config(name="Jane Doe"):
+    """Build a minimal valid configuration."""
+    return {
+        "pass": {
+            "serialNumber": "cached-1",
+            "description": "Cached Card",
+            "fields": {"primaryFields": [{"key": "name", "label": "Name", "value": name}]},
+        },
+    }
+
+
+@pytest.fixture
+def template(tmp_path):
+    """Create a template with a disk-backed result cache."""
+    cache = ResultCache(root=str(tmp_path / "results"))
+    return ClassicBlueTemplate(assets_dir=str(tmp_path / "assets"), output_dir=str(tmp_path / "out"), result_cache=cache)
+
+
+class TestResultCache:
+    """Test generation memoisation."""
+
+    def test_repeat_skips_pipeline(self, template, monkeypatch):
+        """Test that an identical generation is served from the cache."""
+        first = template.generate_bytes(_config())
+
+        def fail(*args, **kwargs):
+            raise AssertionError("pipeline ran on a cache hit")
+
+        monkeypatch.setattr(template.generator, "prepare_assets", fail)
+        assert template.generate_bytes(_config()) == first
+        with pytest.raises(AssertionError):
+            template.generate_bytes(_config("John Roe"))
+        with pytest.raises(AssertionError):
+            template.generate_bytes(_config(), uploads={"logo": b"new logo"})
+
+        stats = template.generator.result_cache.stats()
+        assert (stats["memory_hits"], stats["misses"], stats["memory_entries"]) == (1, 3, 1)
+
+    def test_disk_level_and_invalidation(self, template, tmp_path):
+        """Test that archives survive on disk and can be invalidated."""
+        data = template.generate_bytes(_config())
+
+        fresh = ResultCache(root=str(tmp_path / "results"))
+        template.generator.result_cache = fresh
+        assert template.generate_bytes(_config()) == data
+        assert fresh.stats()["disk_hits"] == 1
+
+        assert template.invalidate(_config()) is True
+        assert template.invalidate(_config()) is False
+        assert fresh.stats()["disk_entries"] == 0
+
+    def test_memory_cache_byte_cap(self):
+        """Test that the memory level evicts to stay under its byte cap."""
+        cache = MemoryCache(max_entries=10, max_bytes=5)
+        cache.put("a", b"123")
+        cache.put("b", b"456")
+
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] == 3
@@ -0,0 +1,106 @@
+"""Tests for serial number allocation."""
+
+import io
+import json
+import multiprocessing
+import zipfile
+
+import pytest
+
+from wallet_card.core.pass_generator import PassGenerator
+from wallet_card.core.result_cache import ResultCache
+from wallet_card.core.serials import BlockSerialAllocator, RandomSerialAllocator, create_serial_allocator
+
+
+def _serial(pkpass):
+    """Read the serial number from archive bytes."""
+    with zipfile.ZipFile(io.BytesIO(pkpass)) as archive:
+        return json.loads(archive.read("pass.json"))["serialNumber"]
+
+
+def _allocate_in_child(path, count, queue):
+    """Allocate serials from a separate process sharing the database."""
+    queue.put(BlockSerialAllocator(path, block_size=4).allocate_many(count))
+
+
+class TestRandomSerials:
+    """Test sortable random IDs."""
+
+    def test_format_and_order(self, monkeypatch):
+        """Test that IDs are unique, fixed-width and sort by time."""
+        allocator = RandomSerialAllocator(prefix="wc-")
+        monkeypatch.setattr("time.time_ns", lambda: 1_000_000_000_000_000)
+        early = allocator.allocate_many(100)
+        monkeypatch.setattr("time.time_ns", lambda: 1_000_000_001_000_000)
+        late = allocator.allocate()
+
+        assert len(set(early)) == 100
+        assert all(serial.startswith("wc-") and len(serial) == 29 for serial in early)
+        assert max(early) < late
+
+
+class TestBlockSerials:
+    """Test the SQLite block counter."""
+
+    def test_leases_blocks(self, tmp_path):
+        """Test that numbers come from memory until a block runs out."""
+        allocator = BlockSerialAllocator(str(tmp_path / "serials.sqlite3"), block_size=3, width=4)
+
+        assert allocator.allocate_many(4) == ["0001", "0002", "0003", "0004"]
+        assert allocator.stats() == {"leases": 2, "remaining": 2}
+
+    def test_allocators_share_the_counter(self, tmp_path):
+        """Test that allocators and processes on one database never overlap."""
+        path = str(tmp_path / "serials.sqlite3")
+        first = BlockSerialAllocator(path, block_size=4)
+        second = BlockSerialAllocator(path, block_size=4)
+        serials = [first.allocate(), second.allocate(), first.allocate()]
+
+        queue = multiprocessing.get_context("spawn").Queue()
+        child = multiprocessing.get_context("spawn").Process(target=_allocate_in_child, args=(path, 6, queue))
+        child.start()
+        serials += queue.get(timeout=30)
+        child.join()
+
+        assert serials[:3] == ["0000000001", "0000000005", "0000000002"]
+        assert len(set(serials)) == len(serials) == 9
+
+    def test_unknown_strategy(self):
+        """Test that an unknown strategy name is rejected."""
+        with pytest.raises(ValueError, match="sequential"):
+            create_serial_allocator("sequential")
+
+
+class TestGeneratorSerials:
+    """Test serial assignment during generation."""
+
+    def test_missing_serial_is_allocated(self, tmp_path):
+        """Test that configured serials are kept and missing ones allocated."""
+        allocator = BlockSerialAllocator(str(tmp_path / "serials.sqlite3"), prefix="S")
+        generator = PassGenerator(str(tmp_path / "assets"), str(tmp_path / "out"), serials=allocator)
+
+        assert generator.assign_serial({"pass": {"serialNumber": "fixed"}})["pass"]["serialNumber"] == "fixed"
+        config = {"pass": {"description": "Card"}}
+        assert generator.assign_serial(config)["pass"]["serialNumber"] == "S0000000001"
+        assert generator.assign_serial(config)["pass"]["serialNumber"] == "S0000000002"
+        assert "serialNumber" not in config["pass"]
+
+    def test_repeat_is_served_from_cache(self, tmp_path):
+        """Test that a repeated pass without a serial is served its first archive."""
+        cache = ResultCache(root=str(tmp_path / "results"))
+        generator = PassGenerator(
+            str(tmp_path / "assets"), str(tmp_path / "out"), result_cache=cache,
+            serials=BlockSerialAllocator(str(tmp_path / "serials.sqlite3")),
+        )
+        base = {"passTypeIdentifier": "pass.test", "organizationName": "Org"}
+        config = {"pass": dict(base, description="Card")}
+
+        first = generator.generate_bytes(config)
+        assert generator.generate_bytes(config) == first
+        other = generator.generate_bytes({"pass": dict(base, description="Other Card")})
+        assert _serial(first) == "0000000001"
+        assert _serial(other) == "0000000002"
+
+        assert generator.invalidate(config) is True
+        assert cache.stats()["memory_hits"] == 1
+        assert cache.stats()["misses"] == 2
@@ -0,0 +1,57 @@
+"""Tests for the QR share-card renderer."""
+
+from wallet_card.core.share_card import (
+    ShareCardRenderer,
+    load_font,
+    qr_matrix,
+    render_qr_image,
+)
+
+
+class TestShareCardRenderer:
+    """Test ShareCardRenderer and its helpers."""
+
+    def test_fonts_are_cached(self):
+        """Test that fonts are only loaded once per size."""
+        assert load_font(18) is load_font(18)
+
+    def test_qr_matrix_cached(self):
+        """Test that repeat payloads reuse the encoded matrix."""
+        matrix = qr_matrix("https://example.com/pass.pkpass")
+        assert matrix is qr_matrix("https://example.com/pass.pkpass")
+        assert len(matrix) == len(matrix[0])
+
+    def test_render_qr_image_size(self):
+        """Test that QR images are rendered at the exact requested size."""
+        img = render_qr_image(qr_matrix("hello"), 300)
+        assert img.size == (300, 300)
+        # Pixels are pure black or white: no resampling blur
+        histogram = img.histogram()
+        assert sum(histogram[1:255]) == 0
+
+    def test_render_card(self):
+        """Test rendering a full share card."""
+        renderer = ShareCardRenderer()
+        card = renderer.render(
+            "https://example.com", "Test User", "Engineer", [("test@example.com", "black")]
+        )
+
+        assert card.size == (ShareCardRenderer.WIDTH, ShareCardRenderer.HEIGHT)
+        # The cached background is not modified by rendering
+        assert renderer._background("wallet").getpixel((60, 110)) == (255, 255, 255)
+
+    def test_render_png(self):
+        """Test PNG encoding of a share card."""
+        png = ShareCardRenderer().render_png("data", "Name", layout="vcard")
+        assert png.startswith(b"\x89PNG")
+
+    def test_render_svg(self):
+        """Test that SVG cards are well formed and escape their text."""
+        import xml.etree.ElementTree as ET
+
+        svg = ShareCardRenderer().render_svg("data", "Jane <Doe> & Co", "CTO", [("a@example.com", "black")])
+
+        root = ET.fromstring(svg)
+        texts = [element.text for element in root.iter("{http://www.w3.org/2000/svg}text")]
+        assert texts[:3] == ["Jane <Doe> & Co", "CTO", "a@example.com"]
+        assert len(svg) < len(ShareCardRenderer().render_png("data", "Jane <Doe> & Co", "CTO"))
@@ -0,0 +1,116 @@
+"""Tests for the on-disk warm cache."""
+
+import os
+
+import pytest
+from click.testing import CliRunner
+from PIL import Image
+
+from wallet_card.cli.commands import main
+from wallet_card.core import warm_cache
+from wallet_card.core.asset_manager import AssetManager, _placeholder_png
+from wallet_card.core.warm_cache import WarmCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Install a warm cache for the duration of a test."""
+    instance = WarmCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(warm_cache, "_cache", instance)
+    monkeypatch.setattr(warm_cache, "_configured", True)
+    return instance
+
+
+class TestWarmCache:
+    """Test WarmCache storage, versioning and eviction."""
+
+    def test_get_or_create_renders_once(self, tmp_path):
+        """Test that a stored artifact is served without rendering again."""
+        cache = WarmCache(str(tmp_path))
+        calls = []
+
+        def render():
+            calls.append(1)
+            return b"artifact"
+
+        assert cache.get_or_create("test", ("a", 1), render) == b"artifact"
+        assert cache.get_or_create("test", ("a", 1), render) == b"artifact"
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1
+
+    def test_survives_new_instance(self, tmp_path):
+        """Test that entries are shared by processes using the same directory."""
+        WarmCache(str(tmp_path)).put("test", ("key",), b"data")
+
+        assert WarmCache(str(tmp_path)).get("test", ("key",)) == b"data"
+
+    def test_version_change_invalidates(self, tmp_path):
+        """Test that a new version misses and prune removes old versions."""
+        WarmCache(str(tmp_path), version="old").put("test", ("key",), b"data")
+        cache = WarmCache(str(tmp_path), version="new")
+
+        assert cache.get("test", ("key",)) is None
+        cache.prune()
+        assert not (tmp_path / "vold").exists()
+
+    def test_size_cap_evicts_least_recently_used(self, tmp_path):
+        """Test that the oldest entries are evicted over the size cap."""
+        cache = WarmCache(str(tmp_path), max_bytes=250)
+        cache.put("test", ("first",), b"x" * 100)
+        os.utime(cache.path_for("test", ("first",)), (1, 1))
+        cache.put("test", ("second",), b"x" * 100)
+        cache.put("test", ("third",), b"x" * 100)
+
+        assert cache.get("test", ("first",)) is None
+        assert cache.get("test", ("third",)) is not None
+        assert cache.stats()["bytes"] <= 250
+
+    def test_overwrite_keeps_size_accurate(self, tmp_path):
+        """Test that overwriting an entry does not count its bytes twice."""
+        cache = WarmCache(str(tmp_path), max_bytes=250)
+        for _ in range(3):
+            cache.put("test", ("same",), b"x" * 100)
+
+        assert cache.stats()["bytes"] == 100
+        assert cache.get("test", ("same",)) is not None
+
+    def test_disabled_by_default(self, monkeypatch):
+        """Test that the cache is off unless configured."""
+        monkeypatch.delenv("WALLET_CARD_WARM_CACHE", raising=False)
+        monkeypatch.setattr(warm_cache, "_configured", False)
+        monkeypatch.setattr(warm_cache, "_cache", None)
+
+        assert warm_cache.get_warm_cache() is None
+        assert warm_cache.cached("test", ("key",), lambda: b"direct") == b"direct"
+
+
+class TestWarmCacheIntegration:
+    """Test artifacts routed through the warm cache."""
+
+    def test_resized_file_cached_by_mtime(self, tmp_path, cache):
+        """Test that resized logos are cached and refreshed when the file changes."""
+        logo = tmp_path / "logo.png"
+        Image.new("RGB", (640, 200), "red").save(logo)
+        manager = AssetManager(str(tmp_path / "assets"))
+
+        first = manager.prepare_logo_bytes(str(logo))
+        assert manager.prepare_logo_bytes(str(logo)) == first
+        assert cache.stats()["hits"] == 1
+
+        Image.new("RGB", (640, 200), "blue").save(logo)
+        os.utime(logo, ns=(0, os.stat(logo).st_mtime_ns + 1))
+        assert manager.prepare_logo_bytes(str(logo)) != first
+
+    def test_warm_command_populates_cache(self, tmp_path, monkeypatch):
+        """Test that wallet-card warm fills the cache directory."""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(warm_cache, "_configured", False)
+        monkeypatch.setattr(warm_cache, "_cache", None)
+        # Placeholders rendered by earlier tests would be served from memory
+        _placeholder_png.cache_clear()
+
+        result = CliRunner().invoke(main, ["warm", "-t", "classic-blue", "--cache-dir", str(tmp_path / "cache")])
+
+        assert result.exit_code == 0, result.output
+        assert "Warmed classic-blue" in result.output
+        assert warm_cache.get_warm_cache().stats()["entries"] > 0
@@ -0,0 +1,440 @@
+"""Tests for the Flask web application."""
+
+import hashlib
+import io
+import json
+import threading
+import zipfile
+
+import pytest
+from PIL import Image
+from wallet_card.core.blob_store import BlobStore
+from wallet_card.core.output_store import OutputStore
+from wallet_card.core.pass_store import PassStore
+from wallet_card.core.preview import PreviewCache
+from wallet_card.core.result_cache import ResultCache
+from wallet_card.perf.mock_apns import MockAPNsServer
+from wallet_card.web import app as web_app
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    """Point the app's output folder at a temporary directory."""
+    output = tmp_path / "output"
+    output.mkdir()
+    monkeypatch.setattr(web_app, "OUTPUT_FOLDER", output)
+    store = OutputStore(str(output), index_path=str(tmp_path / "index.sqlite3"))
+    monkeypatch.setattr(web_app, "_output_store", store)
+    monkeypatch.setattr(web_app, "_pass_store", PassStore(str(tmp_path / "store")))
+    monkeypatch.setattr(web_app, "_blob_store", BlobStore(str(tmp_path / "blobs")))
+    return output
+
+
+@pytest.fixture
+def client(output_dir):
+    """Create a Flask test client."""
+    web_app.app.config["TESTING"] = True
+    with web_app.app.test_client() as client:
+        yield client
+
+
+class TestDownload:
+    """Test the /api/download endpoint."""
+
+    def test_download_pkpass(self, client, output_dir):
+        """Test that passes are served inline with the pkpass MIME type."""
+        payload = b"PK\x03\x04 fake pass"
+        (output_dir / "card.pkpass").write_bytes(payload)
+
+        response = client.get("/api/download/card.pkpass")
+
+        assert response.status_code == 200
+        assert response.data == payload
+        assert response.mimetype == "application/vnd.apple.pkpass"
+        assert response.headers["Content-Disposition"].startswith("inline")
+        assert response.headers["ETag"] == f'"{hashlib.sha1(payload).hexdigest()}"'
+        assert response.cache_control.max_age == web_app.app.config["DOWNLOAD_MAX_AGE"]
+
+    def test_download_if_none_match(self, client, output_dir):
+        """Test that a matching ETag returns 304 without a body."""
+        (output_dir / "card.pkpass").write_bytes(b"pass bytes")
+        etag = client.get("/api/download/card.pkpass").headers["ETag"]
+
+        response = client.get("/api/download/card.pkpass", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.data == b""
+
+    def test_download_range(self, client, output_dir):
+        """Test that byte ranges are honoured."""
+        (output_dir / "card.pkpass").write_bytes(b"0123456789")
+
+        response = client.get("/api/download/card.pkpass", headers={"Range": "bytes=2-5"})
+
+        assert response.status_code == 206
+        assert response.data == b"2345"
+
+    def test_download_x_accel_redirect(self, client, output_dir, monkeypatch):
+        """Test the nginx X-Accel-Redirect hand-off."""
+        (output_dir / "card.pkpass").write_bytes(b"pass bytes")
+        monkeypatch.setitem(web_app.app.config, "X_ACCEL_REDIRECT_PREFIX", "/protected/")
+
+        response = client.get("/api/download/card.pkpass")
+
+        assert response.status_code == 200
+        assert response.headers["X-Accel-Redirect"] == "/protected/card.pkpass"
+        assert response.data == b""
+
+    def test_download_by_key(self, client):
+        """Test immutable downloads by content key."""
+        key = web_app._get_pass_store().put(b"stored pass")
+
+        response = client.get(f"/api/passes/{key}")
+
+        assert response.status_code == 200
+        assert response.data == b"stored pass"
+        assert response.cache_control.immutable
+        assert client.get(f"/api/passes/{'0' * 64}").status_code == 404
+
+    def test_download_missing(self, client):
+        """Test that missing files return 404."""
+        response = client.get("/api/download/missing.pkpass")
+        assert response.status_code == 404
+
+    def test_download_rejects_traversal(self, client):
+        """Test that paths outside the output folder are rejected."""
+        response = client.get("/api/download/..")
+        assert response.status_code == 404
+
+
+class TestGenerate:
+    """Test the /api/generate endpoint."""
+
+    def test_generate_inline(self, client, output_dir):
+        """Test that inline mode returns the pass bytes and writes nothing."""
+        photo = io.BytesIO()
+        Image.new("RGB", (640, 480), "red").save(photo, "PNG")
+        photo.seek(0)
+
+        response = client.post(
+            "/api/generate?inline=1",
+            data={
+                "name": "Test User",
+                "description": "Test Card",
+                "photo": (photo, "photo.png"),
+            },
+            content_type="multipart/form-data",
+        )
+
+        assert response.status_code == 200
+        assert response.mimetype == "application/vnd.apple.pkpass"
+        with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+            names = set(archive.namelist())
+            strip = Image.open(io.BytesIO(archive.read("strip.png")))
+        assert {"pass.json", "manifest.json", "signature", "strip.png"} <= names
+        assert strip.size == (320, 320)
+        assert list(output_dir.iterdir()) == []
+
+    def test_generate_deduplicates_uploads(self, client):
+        """Test that repeat uploads are stored once and released afterwards."""
+        logo = io.BytesIO()
+        Image.new("RGB", (640, 200), "blue").save(logo, "PNG")
+        payload = logo.getvalue()
+
+        for _ in range(2):
+            response = client.post(
+                "/api/generate",
+                data={"description": "Logo Card", "logo": (io.BytesIO(payload), "logo.png")},
+                content_type="multipart/form-data",
+            )
+            assert response.status_code == 200
+
+        filename = response.get_json()["filename"]
+        with zipfile.ZipFile(io.BytesIO(client.get(f"/api/download/{filename}").data)) as archive:
+            archived = Image.open(io.BytesIO(archive.read("logo.png"))).convert("RGB")
+        assert archived.getpixel((archived.width // 2, archived.height // 2)) == (0, 0, 255)
+
+        store = web_app._get_blob_store()
+        digest = hashlib.sha256(payload).hexdigest()
+        assert store.get(digest) is not None
+        assert store.refs(digest) == 0
+        assert len(list((store.root / "objects").rglob("*"))) == 2  # shard dir + blob
+
+    def test_generate_assigns_serials(self, client, monkeypatch):
+        """Test that distinct passes get distinct serials and repeats hit the cache."""
+        cache = ResultCache()
+        monkeypatch.setattr(web_app, "_result_cache", cache)
+
+        def post(name):
+            response = client.post("/api/generate", data={"description": "Serial Card", "name": name})
+            filename = response.get_json()["filename"]
+            with zipfile.ZipFile(io.BytesIO(client.get(f"/api/download/{filename}").data)) as archive:
+                return filename, json.loads(archive.read("pass.json"))["serialNumber"]
+
+        first, repeat, other = post("Jane"), post("Jane"), post("John")
+
+        assert first == repeat
+        assert first[1] and other[1] and first[1] != other[1]
+        stats = cache.stats()
+        assert (stats["memory_hits"], stats["misses"]) == (1, 2)
+
+    def test_generate_qr_svg(self, client, output_dir):
+        """Test that the QR share card can be requested as SVG."""
+        response = client.post(
+            "/api/generate",
+            data={"name": "Test User", "description": "QR Card", "output_type": "qr", "qr_format": "svg"},
+        )
+
+        body = response.get_json()
+        assert body["filename"].endswith("_qr.svg")
+        download = client.get(body["download_url"])
+        assert download.mimetype == "image/svg+xml"
+        assert download.data.startswith(b"<svg")
+
+
+class TestPreview:
+    """Test the /api/preview endpoint."""
+
+    def test_preview_is_cached_by_fingerprint(self, client, output_dir, monkeypatch):
+        """Test that previews render without output and repeat from cache."""
+        monkeypatch.setattr(web_app, "preview_cache", PreviewCache())
+        form = {"name": "Test User", "description": "Preview Card", "backgroundColor": "rgb(200,0,0)", "qr_data": "x"}
+
+        first = client.post("/api/preview", data=form)
+        second = client.post("/api/preview", data=form)
+        changed = client.post("/api/preview", data={**form, "name": "Other User"})
+
+        assert first.mimetype == "image/png"
+        assert [r.headers["X-Cache"] for r in (first, second, changed)] == ["MISS", "HIT", "MISS"]
+        assert first.data == second.data != changed.data
+        image = Image.open(io.BytesIO(first.data))
+        assert image.size[0] == 640
+        assert image.getpixel((320, 150))[:3] == (200, 0, 0)
+        assert list(output_dir.iterdir()) == []
+
+
+class TestJobs:
+    """Test the /api/jobs endpoints."""
+
+    def test_job_lifecycle(self, client, output_dir):
+        """Test that a queued job produces a downloadable pass."""
+        response = client.post("/api/jobs", data={"name": "Test User", "description": "Job Card"})
+        assert response.status_code == 202
+        job = response.get_json()
+
+        events = client.get(job["events_url"]).get_data(as_text=True)
+        assert "event: done" in events
+
+        status = client.get(job["status_url"]).get_json()
+        assert status["status"] == "succeeded"
+        assert (output_dir / status["result"]["filename"]).exists()
+
+    def test_unknown_job(self, client):
+        """Test that unknown job ids return 404."""
+        assert client.get("/api/jobs/missing").status_code == 404
+
+
+class TestListFiles:
+    """Test the /api/files endpoint."""
+
+    def test_paginated_listing(self, client):
+        """Test that listing pages through the output index."""
+        store = web_app._get_output_store()
+        for i in range(3):
+            store.put(f"card{i}.pkpass", b"pass %d" % i)
+
+        first = client.get("/api/files?limit=2").get_json()
+        second = client.get(f"/api/files?limit=2&cursor={first['next_cursor']}").get_json()
+
+        assert first["count"] == 3
+        assert len(first["files"]) == 2
+        assert second["next_cursor"] is None
+        assert sorted(first["files"] + second["files"]) == ["card0.pkpass", "card1.pkpass", "card2.pkpass"]
+
+    def test_malformed_cursor(self, client):
+        """Test that a malformed cursor is a client error."""
+        response = client.get("/api/files?cursor=x")
+
+        assert response.status_code == 400
+
+
+class TestAdmission:
+    """Test overload handling in the web app."""
+
+    def test_overload_returns_503(self, client, monkeypatch):
+        """Test that saturated generate requests get 503 with Retry-After."""
+        monkeypatch.setattr(web_app.admission, "max_concurrent", 0)
+        monkeypatch.setattr(web_app.admission, "max_queue", 0)
+
+        response = client.post("/api/generate", data={"description": "Busy"})
+
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) >= 1
+        assert client.get("/api/admission").get_json()["admission"]["rejected_total"] >= 1
+
+
+class TestSingletons:
+    """Test lazily created app-wide objects."""
+
+    def test_concurrent_first_use_creates_one_instance(self, monkeypatch):
+        """Test that racing first requests share a single result cache."""
+        monkeypatch.setattr(web_app, "_result_cache", None)
+        created = []
+        original = web_app.ResultCache
+
+        def slow_cache(*args, **kwargs):
+            threading.Event().wait(0.05)
+            created.append(original(*args, **kwargs))
+            return created[-1]
+
+        monkeypatch.setattr(web_app, "ResultCache", slow_cache)
+        seen = []
+        threads = [threading.Thread(target=lambda: seen.append(web_app._get_result_cache())) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(created) == 1
+        assert all(cache is created[0] for cache in seen)
+
+
+class TestMetricsEndpoint:
+    """Test the Prometheus endpoint."""
+
+    def test_metrics_after_generate(self, client):
+        """Test that generation shows up in /metrics."""
+        client.post("/api/generate?inline=1", data={"description": "Metrics"})
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+        text = response.get_data(as_text=True)
+        assert 'wallet_card_stage_seconds_count{template="classic_blue",stage="validate"}' in text
+        assert 'wallet_card_admission{stat="admitted_total"}' in text
+        assert "wallet_card_memory_cache_requests_total" in text
+
+
+class TestProfiling:
+    """Test the WALLET_CARD_PROFILE switch."""
+
+    def test_profiling_switch(self, client, tmp_path, monkeypatch):
+        """Test that WALLET_CARD_PROFILE writes a trace per generation."""
+        monkeypatch.setitem(web_app.app.config, "PROFILE_DIR", str(tmp_path / "profiles"))
+
+        response = client.post("/api/generate?inline=1", data={"description": "Profiled"})
+
+        assert response.status_code == 200
+        assert list((tmp_path / "profiles").glob("*-classic_blue-*.trace.json"))
+
+
+class TestPassKitWebService:
+    """Test the PassKit web service endpoints."""
+
+    @pytest.fixture
+    def service(self, client, output_dir, tmp_path, monkeypatch):
+        """Enable the web service and issue one updatable pass."""
+        monkeypatch.setitem(web_app.app.config, "WEB_SERVICE_URL", "https://cards.example.com/passkit")
+        monkeypatch.setitem(web_app.app.config, "PASSKIT_DIR", str(tmp_path / "passkit"))
+        monkeypatch.setattr(web_app, "_registry", None)
+
+        response = client.post("/api/generate", data={"description": "Updatable"})
+        assert response.status_code == 200
+        with zipfile.ZipFile(output_dir / response.get_json()["filename"]) as archive:
+            pass_json = json.loads(archive.read("pass.json"))
+        return {
+            "serial": pass_json["serialNumber"],
+            "headers": {"Authorization": f"ApplePass {pass_json['authenticationToken']}"},
+        }
+
+    def test_pass_carries_web_service(self, client, service):
+        """Test that stored passes embed the service URL and registered token."""
+        entry = web_app._get_registry().get_pass("pass.com.example.businesscard", service["serial"])
+
+        assert entry is not None
+        assert service["headers"]["Authorization"] == f"ApplePass {entry['auth_token']}"
+
+    def test_registration_and_change_feed(self, client, service):
+        """Test device registration, passesUpdatedSince and unregistration."""
+        path = "/passkit/v1/devices/dev1/registrations/pass.com.example.businesscard"
+        serial, headers = service["serial"], service["headers"]
+
+        assert client.post(f"{path}/{serial}", json={"pushToken": "t"}).status_code == 401
+        assert client.post(f"{path}/{serial}", json={"pushToken": "t"}, headers=headers).status_code == 201
+        assert client.post(f"{path}/{serial}", json={"pushToken": "t"}, headers=headers).status_code == 200
+
+        feed = client.get(path).get_json()
+        assert feed["serialNumbers"] == [serial]
+        assert client.get(f"{path}?passesUpdatedSince={feed['lastUpdated']}").status_code == 204
+
+        # Updating the pass keeps the token and shows up in the feed
+        response = client.post(
+            f"/api/passes/pass.com.example.businesscard/{serial}", data={"description": "Updated"}, headers=headers
+        )
+        assert response.status_code == 200
+        updated = client.get(f"{path}?passesUpdatedSince={feed['lastUpdated']}").get_json()
+        assert updated["serialNumbers"] == [serial]
+
+        assert client.delete(f"{path}/{serial}", headers=headers).status_code == 200
+        assert client.get(path).status_code == 204
+
+    def test_latest_pass_last_modified(self, client, service):
+        """Test that the latest pass is sent with Last-Modified and 304."""
+        path = f"/passkit/v1/passes/pass.com.example.businesscard/{service['serial']}"
+
+        assert client.get(path).status_code == 401
+        response = client.get(path, headers=service["headers"])
+        assert response.status_code == 200
+        assert response.mimetype == "application/vnd.apple.pkpass"
+
+        headers = dict(service["headers"], **{"If-Modified-Since": response.headers["Last-Modified"]})
+        assert client.get(path, headers=headers).status_code == 304
+
+    def test_regeneration_pushes_to_devices(self, client, service, monkeypatch):
+        """Test that updating a pass pushes to its registered devices."""
+        serial = service["serial"]
+        client.post(
+            f"/passkit/v1/devices/dev1/registrations/pass.com.example.businesscard/{serial}",
+            json={"pushToken": "push-token-1"},
+            headers=service["headers"],
+        )
+        with MockAPNsServer() as apns:
+            monkeypatch.setitem(web_app.app.config, "APNS_URL", apns.url)
+            monkeypatch.setattr(web_app, "_push_dispatcher", None)
+            dispatcher = web_app._get_push_dispatcher()
+            dispatcher.delay = 60  # flushed below instead
+
+            client.post(
+                f"/api/passes/pass.com.example.businesscard/{serial}",
+                data={"description": "Updated"},
+                headers=service["headers"],
+            )
+            dispatcher.flush()
+
+        assert apns.received == [("pass.com.example.businesscard", "push-token-1")]
+
+    def test_submitted_serial_cannot_take_over_a_pass(self, client, output_dir, service):
+        """Test that another pass's serial gets neither its token nor its devices."""
+        serial = service["serial"]
+        latest = client.get(f"/passkit/v1/passes/pass.com.example.businesscard/{serial}", headers=service["headers"])
+
+        response = client.post("/api/generate", data={"description": "Hijack", "serialNumber": serial})
+        assert response.status_code == 200
+        with zipfile.ZipFile(output_dir / response.get_json()["filename"]) as archive:
+            pass_json = json.loads(archive.read("pass.json"))
+        assert pass_json["serialNumber"] != serial
+        assert service["headers"]["Authorization"] != f"ApplePass {pass_json['authenticationToken']}"
+
+        # Updates need the pass's current token
+        update = f"/api/passes/pass.com.example.businesscard/{serial}"
+        assert client.post(update, data={"description": "Hijack"}).status_code == 401
+        wrong = {"Authorization": f"ApplePass {pass_json['authenticationToken']}"}
+        assert client.post(update, data={"description": "Hijack"}, headers=wrong).status_code == 401
+
+        after = client.get(f"/passkit/v1/passes/pass.com.example.businesscard/{serial}", headers=service["headers"])
+        assert after.data == latest.data
+
+    def test_log(self, client):
+        """Test that device logs are accepted."""
+        assert client.post("/passkit/v1/log", json={"logs": ["error"]}).status_code == 200